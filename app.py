@@ -1,16 +1,142 @@
 # app.py
 # Complete RCM Benchmark Report Generator Web Application with Clay Integration
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, Response
 from datetime import datetime
+from urllib.parse import quote
 import os
 
-# Import your enhanced report generator with data
-from generate_report_enhanced_v2 import DataEnhancedRCMReportGenerator
+# Report rendering runs in worker processes - see render_pool.py. Nothing
+# imported here may pull in ReportLab, matplotlib, numpy, pandas or requests;
+# test_import_budget() below guards the web process's cold start.
+from artifact_store import download_name, get_artifact_store, publish_report
+from benchmark_dataset import dataset_watcher
+from chart_cache import CHART_BACKENDS
+from chart_profiles import CHART_PROFILES, CLAY_CHART_PROFILE, DEFAULT_CHART_PROFILE
+from render_pool import render_pool, RenderQueueFull, RENDER_WARM_UP
+from report_cache import report_cache, render_report_cached
+from jobs import JobStore, JobRunner, describe_job
+from http_client import async_http
+from instrumentation import PROMETHEUS_CONTENT_TYPE, metric_family, render_metrics
+from outbox import OutboxStore, OutboxDispatcher, make_idempotency_key
+
+# Clay webhook that receives report data for email delivery
+CLAY_WEBHOOK_URL = os.environ.get(
+    "CLAY_WEBHOOK_URL",
+    "https://api.clay.com/v3/sources/webhook/pull-in-data-from-a-webhook-7c4d6c32-6127-42df-958a-bf6c54f13b71"
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume any report jobs left over from a previous process
+    app.state.job_store = JobStore()
+    app.state.job_runner = JobRunner(app.state.job_store)
+    app.state.job_runner.start()
+    # Deliver any Clay messages still waiting in the outbox
+    app.state.outbox_store = OutboxStore()
+    app.state.outbox_dispatcher = OutboxDispatcher(app.state.outbox_store)
+    app.state.outbox_dispatcher.start()
+    # Load the render workers in the background - /health answers straight away
+    warm_up = asyncio.create_task(render_pool.warm_up()) if RENDER_WARM_UP else None
+    yield
+    # Stop background work and render workers when the server shuts down
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    await app.state.job_runner.stop()
+    await app.state.outbox_dispatcher.stop()
+    await async_http.aclose()
+    await asyncio.to_thread(dataset_watcher.stop)
+    render_pool.shutdown()
+
 
 # Create FastAPI app
-app = FastAPI(title="RCM Benchmark Report Generator")
+app = FastAPI(title="RCM Benchmark Report Generator", lifespan=lifespan)
+
+
+def check_chart_backend(chart_backend: str):
+    """Reject unknown chart backends before any work is queued"""
+    if chart_backend not in CHART_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"chart_backend must be one of: {', '.join(CHART_BACKENDS)}"
+        )
+
+
+def check_chart_profile(chart_profile: str):
+    """Reject unknown chart output profiles before any work is queued"""
+    if chart_profile not in CHART_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"chart_profile must be one of: {', '.join(CHART_PROFILES)}"
+        )
+
+
+async def render_report(**report_kwargs):
+    """Render a report in the worker pool without blocking the event loop
+
+    Identical requests (retries, double-submits) share one render and reuse
+    the finished PDF.
+    """
+    check_chart_backend(report_kwargs.get('chart_backend', 'matplotlib'))
+    check_chart_profile(report_kwargs.get('chart_profile', DEFAULT_CHART_PROFILE))
+    try:
+        return await render_report_cached(**report_kwargs)
+    except RenderQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+
+async def render_stored_report(**report_kwargs):
+    """Render a report and keep it in the artifact store for /reports downloads
+
+    Returns the ReportResult and the stored Artifact, whose unique name is
+    what /reports links must use.
+    """
+    result = await render_report(in_memory=True, **report_kwargs)
+    artifact = await publish_report(result)
+    return result, artifact
+
+
+def content_disposition(name: str) -> str:
+    quoted = quote(name)
+    if quoted == name:
+        return f'attachment; filename="{name}"'
+    return f"attachment; filename*=utf-8''{quoted}"
+
+
+def pdf_response(result) -> Response:
+    """Send a report built in memory straight to the client - nothing touches disk"""
+    return Response(
+        content=result.pdf_bytes,
+        media_type='application/pdf',
+        headers={"Content-Disposition": content_disposition(os.path.basename(result.filename))}
+    )
+
+
+def parse_byte_range(header: str, size: int):
+    """(start, end) of a single 'bytes=' Range header, or None to send the whole file
+
+    Multi-range and malformed headers are ignored, as RFC 9110 allows.
+    Raises ValueError when the range lies outside the file.
+    """
+    if not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        if first == '':
+            suffix = int(last)
+            if suffix <= 0:
+                raise ValueError("empty suffix range")
+            return max(size - suffix, 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
 
 # HTML form for the web interface
 @app.get("/", response_class=HTMLResponse)
@@ -285,28 +411,29 @@ async def generate_report(
     hospital_beds: int = Form(...),
     recipient_name: str = Form(...),
     recipient_email: str = Form(...),
-    state: str = Form(...)
+    state: str = Form(...),
+    chart_backend: str = Form("matplotlib"),
+    chart_profile: str = Form(DEFAULT_CHART_PROFILE)
 ):
     try:
-        # Create enhanced generator with data sources
-        generator = DataEnhancedRCMReportGenerator()
-        
-        # Generate the enhanced report with real data
-        filename = generator.generate_report(
+        # Generate the enhanced report with real data in the render pool,
+        # building the PDF in memory since it is only downloaded once
+        result = await render_report(
             hospital_name=hospital_name,
             hospital_beds=hospital_beds,
             recipient_name=recipient_name,
             recipient_email=recipient_email,
-            state=state
+            state=state,
+            chart_backend=chart_backend,
+            chart_profile=chart_profile,
+            in_memory=True
         )
         
-        # Return the file for download
-        return FileResponse(
-            filename,
-            media_type='application/pdf',
-            filename=filename
-        )
+        # Return the PDF for download
+        return pdf_response(result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -317,7 +444,8 @@ async def health_check():
         "status": "healthy", 
         "service": "Enhanced RCM Benchmark Report Generator", 
         "version": "3.0",
-        "features": ["real_data", "charts", "roi_analysis", "clay_integration"]
+        "features": ["real_data", "charts", "roi_analysis", "clay_integration"],
+        "render_pool": render_pool.stats()
     }
 
 # API endpoint for N8N integration
@@ -327,37 +455,94 @@ async def api_generate_report(
     hospital_beds: int = Form(...),
     recipient_name: str = Form(...),
     recipient_email: str = Form(...),
-    state: str = Form(...)
+    state: str = Form(...),
+    chart_backend: str = Form("matplotlib"),
+    chart_profile: str = Form(DEFAULT_CHART_PROFILE),
+    stream: bool = Form(False)
 ):
-    """API endpoint for programmatic access (N8N, webhooks, etc.)"""
+    """API endpoint for programmatic access (N8N, webhooks, etc.)
+
+    With stream=true the PDF itself is returned instead of a JSON summary,
+    and no copy is kept under /reports.
+    """
     try:
-        generator = DataEnhancedRCMReportGenerator()
-        filename = generator.generate_report(
+        report_kwargs = dict(
             hospital_name=hospital_name,
             hospital_beds=hospital_beds,
             recipient_name=recipient_name,
             recipient_email=recipient_email,
-            state=state
+            state=state,
+            chart_backend=chart_backend,
+            chart_profile=chart_profile
         )
+        if stream:
+            return pdf_response(await render_report(in_memory=True, **report_kwargs))
+        
+        result, artifact = await render_stored_report(**report_kwargs)
         
         return {
             "status": "success",
-            "filename": filename,
+            "filename": artifact.name,
             "message": f"Enhanced report generated for {hospital_name}",
             "location": f"{hospital_name}, {state}",
-            "features": ["real_wage_data", "regional_adjustments", "industry_benchmarks"]
+            "features": ["real_wage_data", "regional_adjustments", "industry_benchmarks"],
+            "dataset_version": result.data_sources.get("dataset_version"),
+            "timings": {stage: round(seconds, 4) for stage, seconds in result.timings.items()}
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "status": "error",
             "error": str(e)
         }
 
+# Asynchronous job API - returns immediately, poll for the finished report
+@app.post("/api/jobs")
+async def create_report_job(
+    request: Request,
+    hospital_name: str = Form(...),
+    hospital_beds: int = Form(...),
+    recipient_name: str = Form(...),
+    recipient_email: str = Form(...),
+    state: str = Form(...),
+    chart_backend: str = Form("matplotlib"),
+    chart_profile: str = Form(DEFAULT_CHART_PROFILE)
+):
+    """Queue a report for background rendering and return its job ID"""
+    check_chart_backend(chart_backend)
+    check_chart_profile(chart_profile)
+    job_id = await asyncio.to_thread(request.app.state.job_store.create, {
+        "hospital_name": hospital_name,
+        "hospital_beds": hospital_beds,
+        "recipient_name": recipient_name,
+        "recipient_email": recipient_email,
+        "state": state,
+        "chart_backend": chart_backend,
+        "chart_profile": chart_profile
+    })
+    request.app.state.job_runner.notify()
+    
+    return {
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/api/jobs/{job_id}"
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_report_job(job_id: str, request: Request):
+    """Report job status, timings and the download URL once finished"""
+    job = await asyncio.to_thread(request.app.state.job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return describe_job(job)
+
 # Webhook endpoint for N8N integration with Clay
 @app.post("/webhook/send-to-clay")
 async def send_to_clay(request: Request):
-    """Generate report and send all data to Clay for email delivery"""
+    """Generate report and queue all data for Clay email delivery"""
     
     # Get form data
     form_data = await request.form()
@@ -368,22 +553,26 @@ async def send_to_clay(request: Request):
     recipient_email = form_data.get("recipient_email")
     state = form_data.get("state")
     original_subject = form_data.get("original_subject", f"{hospital_name} RCM Staffing Analysis")
+    chart_backend = form_data.get("chart_backend", "matplotlib")
+    # Emailed reports are read on screen, so they get the lightweight charts by default
+    chart_profile = form_data.get("chart_profile", CLAY_CHART_PROFILE)
     
-    # Generate report
-    generator = DataEnhancedRCMReportGenerator()
-    filename = generator.generate_report(
+    # Generate report and store it for the download link
+    result, artifact = await render_stored_report(
         hospital_name=hospital_name,
         hospital_beds=hospital_beds,
         recipient_name=recipient_name,
         recipient_email=recipient_email,
-        state=state
+        state=state,
+        chart_backend=chart_backend,
+        chart_profile=chart_profile
     )
     
-    # Get metrics from the generator
-    metrics = generator.calculate_metrics(hospital_beds, hospital_name)
+    # Use the metrics the report was rendered with
+    metrics = result.metrics
     
     # Create download URL
-    report_url = f"https://web-production-8b50.up.railway.app/reports/{filename}"
+    report_url = f"https://web-production-8b50.up.railway.app/reports/{artifact.name}"
     
     # Format currency for email
     def format_currency(amount):
@@ -438,22 +627,29 @@ async def send_to_clay(request: Request):
         "cost_per_bed": metrics['cost_per_bed']
     }
     
-    # Send to Clay webhook
-    import requests
-    clay_webhook_url = "https://api.clay.com/v3/sources/webhook/pull-in-data-from-a-webhook-7c4d6c32-6127-42df-958a-bf6c54f13b71"
-    
-    try:
-        response = requests.post(clay_webhook_url, json=clay_payload, timeout=10)
-        clay_status = "success" if response.status_code == 200 else f"error: {response.status_code}"
-    except Exception as e:
-        clay_status = f"error: {str(e)}"
+    # Queue for Clay - the outbox dispatcher delivers it with retries in the background.
+    # Retried N8N calls map to the same key and are sent once; any change to the
+    # request, the benchmark data or the report date makes a new message. The PDF
+    # bytes are left out - ReportLab output differs between renders of the same report.
+    idempotency_key = make_idempotency_key(
+        recipient_email, recipient_name, hospital_name, hospital_beds, state, original_subject,
+        chart_backend, chart_profile, result.data_sources.get("dataset_version"),
+        datetime.now().strftime('%Y-%m-%d')
+    )
+    queued = await asyncio.to_thread(
+        request.app.state.outbox_store.enqueue, CLAY_WEBHOOK_URL, clay_payload, idempotency_key
+    )
+    request.app.state.outbox_dispatcher.notify()
     
     return {
         "status": "success",
-        "report_generated": filename,
+        "report_generated": artifact.name,
         "report_url": report_url,
-        "clay_webhook_status": clay_status,
-        "metrics": metrics
+        "clay_webhook_status": "queued" if queued else "already_queued",
+        "clay_message_id": idempotency_key,
+        "metrics": metrics,
+        "data_sources": result.data_sources,
+        "timings": result.timings
     }
 
 # Original webhook endpoint (keeping for compatibility)
@@ -464,27 +660,32 @@ async def handle_staffing_reply(
     recipient_name: str = Form(...),
     recipient_email: str = Form(...),
     state: str = Form(...),
-    original_subject: str = Form(...)
+    original_subject: str = Form(...),
+    chart_backend: str = Form("matplotlib"),
+    chart_profile: str = Form(DEFAULT_CHART_PROFILE)
 ):
     """Handle STAFFING replies from N8N webhook"""
     try:
-        # Generate report
-        generator = DataEnhancedRCMReportGenerator()
-        filename = generator.generate_report(
+        # Generate report and store it for download
+        result, artifact = await render_stored_report(
             hospital_name=hospital_name,
             hospital_beds=hospital_beds,
             recipient_name=recipient_name,
             recipient_email=recipient_email,
-            state=state
+            state=state,
+            chart_backend=chart_backend,
+            chart_profile=chart_profile
         )
         
         return {
             "status": "success",
             "message": "Report generated and ready for delivery",
-            "filename": filename,
+            "filename": artifact.name,
             "recipient": recipient_email
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         return {
             "status": "error",
@@ -493,22 +694,108 @@ async def handle_staffing_reply(
 
 # Serve generated PDF reports
 @app.get("/reports/{filename}")
-async def download_report(filename: str):
-    """Serve generated PDF reports"""
+async def download_report(filename: str, request: Request):
+    """Serve stored reports, answering repeat and partial downloads cheaply
+
+    The ETag is the report's content hash: a matching If-None-Match gets a
+    304 with no body, and a Range header (honoured while If-Range still
+    matches) gets just the requested bytes.
+    """
     # Security check - only allow PDF files
     if not filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Invalid file type")
     
-    # Check if file exists
-    if not os.path.exists(filename):
+    store = get_artifact_store()
+    try:
+        artifact = await asyncio.to_thread(store.stat, filename)
+    except ValueError:
+        artifact = None
+    if artifact is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return FileResponse(
-        filename,
-        media_type='application/pdf',
-        filename=filename,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    etag = f'"{artifact.etag}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=86400"
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = content_disposition(download_name(filename))
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_byte_range(range_header, artifact.size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{artifact.size}"
+            return Response(status_code=416, headers=headers)
+    
+    if byte_range is None:
+        data = await asyncio.to_thread(store.read, artifact)
+        return Response(content=data, media_type='application/pdf', headers=headers)
+    
+    start, end = byte_range
+    data = await asyncio.to_thread(store.read, artifact, start, end)
+    headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    return Response(content=data, status_code=206, media_type='application/pdf', headers=headers)
+
+# Clay delivery queue status
+@app.get("/api/outbox/stats")
+async def get_outbox_stats(request: Request):
+    """Outbox depth, delivery lag and dispatcher throughput"""
+    return await asyncio.to_thread(request.app.state.outbox_dispatcher.stats)
+
+# Cache statistics from the render workers
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Chart, static page and report cache hit/miss counters and artifact store usage"""
+    return {
+        "chart_cache": render_pool.chart_cache_stats(),
+        "static_page_cache": render_pool.static_page_cache_stats(),
+        "report_cache": report_cache.stats(),
+        "artifact_store": get_artifact_store().stats()
+    }
+
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    """Stage latency histograms plus queue, cache and in-flight gauges"""
+    pool = render_pool.stats()
+    reports = report_cache.stats()
+    charts = render_pool.chart_cache_stats()
+    outbox = await asyncio.to_thread(request.app.state.outbox_store.summary)
+    jobs = await asyncio.to_thread(request.app.state.job_store.counts)
+    report_lookups = reports['hits'] + reports['coalesced'] + reports['misses']
+    
+    families = [
+        metric_family("rcm_render_in_flight", "Reports rendering or waiting for a worker", "gauge",
+                      [({}, pool['in_flight'])]),
+        metric_family("rcm_render_queue_depth", "Reports waiting for a free render worker", "gauge",
+                      [({}, pool['queued'])]),
+        metric_family("rcm_render_workers", "Render worker processes", "gauge",
+                      [({}, pool['workers'])]),
+        metric_family("rcm_renders_total", "Renders by outcome since the process started", "counter",
+                      [({'outcome': outcome}, pool[outcome]) for outcome in ('completed', 'failed', 'rejected')]),
+        metric_family("rcm_report_cache_requests_total", "Report requests by cache result", "counter",
+                      [({'result': result}, reports[result]) for result in ('hits', 'coalesced', 'misses')]),
+        metric_family("rcm_report_cache_hit_ratio", "Share of report requests served without a new render", "gauge",
+                      [({}, round((reports['hits'] + reports['coalesced']) / report_lookups, 4) if report_lookups else 0.0)]),
+        metric_family("rcm_chart_cache_hit_ratio", "Chart cache hit rate across render workers", "gauge",
+                      [({}, charts['hit_rate'])]),
+        metric_family("rcm_jobs", "Report jobs by status", "gauge",
+                      [({'status': status}, count) for status, count in sorted(jobs.items())]),
+        metric_family("rcm_outbox_messages", "Clay outbox messages by status", "gauge",
+                      [({'status': status}, count) for status, count in sorted(outbox['counts'].items())]),
+        metric_family("rcm_outbox_lag_seconds", "Age of the oldest undelivered Clay message", "gauge",
+                      [({}, outbox['lag_seconds'])])
+    ]
+    return Response(content=render_metrics(families), media_type=PROMETHEUS_CONTENT_TYPE)
 
 # Check available data sources
 @app.get("/api/data-sources")
@@ -538,4 +825,43 @@ async def get_data_sources():
                 "status": "active"
             }
         }
-    }
\ No newline at end of file
+    }
+
+# Cold start budget for the web process
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "1.5"))
+LAZY_MODULES = ("reportlab", "matplotlib", "numpy", "pandas", "requests")
+
+
+def test_import_budget():
+    """Import app in a fresh interpreter; fail if it got slower or loads the render stack"""
+    import json
+    import subprocess
+    import sys
+
+    print("\n🚀 Testing web process cold start...\n")
+
+    probe = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        "import app\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'loaded': loaded}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert not result["loaded"], f"app import loaded {', '.join(result['loaded'])} - import it lazily"
+    assert result["elapsed"] <= IMPORT_BUDGET_SECONDS, (
+        f"app import took {result['elapsed']:.2f}s (budget {IMPORT_BUDGET_SECONDS}s)"
+    )
+
+    print(f"✅ app imports in {result['elapsed']:.2f}s with no render dependencies loaded")
+
+
+if __name__ == "__main__":
+    test_import_budget()
@@ -0,0 +1,579 @@
+# artifact_store.py
+# Where finished report PDFs live between rendering and download (local disk or S3)
+#
+# Reports are stored under their content hash prefix plus their download name,
+# so a later render with the same download name (same hospital, same day) never
+# replaces the PDF behind a link that was already sent. The local backend keeps one
+# content-addressed blob per distinct PDF in sharded directories with a SQLite
+# index; the S3 backend works with AWS or any S3-compatible endpoint (MinIO,
+# R2) via ARTIFACT_S3_ENDPOINT_URL. Both evict reports past their TTL and the
+# oldest reports once the store grows past its size limit.
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+# Store settings - override with environment variables
+ARTIFACT_STORE = os.environ.get("ARTIFACT_STORE", "local")
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", "report_artifacts")
+ARTIFACT_TTL_DAYS = float(os.environ.get("ARTIFACT_TTL_DAYS", "30"))
+ARTIFACT_MAX_MB = int(os.environ.get("ARTIFACT_MAX_MB", "1024"))
+ARTIFACT_EVICT_SECONDS = float(os.environ.get("ARTIFACT_EVICT_SECONDS", "300"))
+ARTIFACT_S3_BUCKET = os.environ.get("ARTIFACT_S3_BUCKET", "")
+ARTIFACT_S3_PREFIX = os.environ.get("ARTIFACT_S3_PREFIX", "reports/")
+ARTIFACT_S3_ENDPOINT_URL = os.environ.get("ARTIFACT_S3_ENDPOINT_URL") or None
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """A stored report; etag is the SHA-256 of its bytes"""
+    name: str
+    etag: str
+    size: int
+    created_at: float
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def artifact_name(filename: str, data: bytes) -> str:
+    """Unique store name for a report: <sha256[:16]>_<download name>"""
+    return f"{content_hash(data)[:16]}_{os.path.basename(filename)}"
+
+
+def download_name(name: str) -> str:
+    """The download name an artifact name was made from"""
+    prefix, separator, rest = name.partition('_')
+    if separator and rest and len(prefix) == 16 and all(char in '0123456789abcdef' for char in prefix):
+        return rest
+    return name
+
+
+def check_artifact_name(name: str) -> str:
+    """Names are plain file names - nothing that could escape the store"""
+    if not name or name != os.path.basename(name) or name.startswith('.') or '\\' in name:
+        raise ValueError(f"Invalid artifact name: {name!r}")
+    return name
+
+
+class LocalArtifactStore:
+    """Reports on local disk: sharded content-addressed blobs plus a SQLite index
+
+    Identical PDFs stored under several names share one blob, which is
+    removed once no name refers to it. Size eviction drops the least
+    recently downloaded reports first.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR, ttl_days: float = ARTIFACT_TTL_DAYS,
+                 max_bytes: int = ARTIFACT_MAX_MB * 1024 * 1024,
+                 evict_interval: float = ARTIFACT_EVICT_SECONDS):
+        self.root = root
+        self.ttl = ttl_days * 24 * 3600
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self._schema_ready = False
+        self._last_evict = 0.0
+        self._counters = {'puts': 0, 'deduplicated': 0, 'reads': 0, 'evictions': 0}
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection to the index that commits on success and is always closed"""
+        if not self._schema_ready:
+            os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.root, "index.db"), timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._schema_ready:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS artifacts (
+                        name TEXT PRIMARY KEY,
+                        etag TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS artifacts_etag ON artifacts (etag)")
+                conn.commit()
+                self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, etag: str) -> str:
+        return os.path.join(self.root, etag[:2], etag[2:4], f"{etag}.pdf")
+
+    def put(self, name: str, data: bytes) -> Artifact:
+        """Store data under name, replacing any earlier report with that name"""
+        check_artifact_name(name)
+        etag = content_hash(data)
+        path = self._blob_path(etag)
+        if os.path.exists(path):
+            self._counters['deduplicated'] += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+        now = time.time()
+        with self._connect() as conn:
+            previous = conn.execute("SELECT etag FROM artifacts WHERE name = ?", (name,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (name, etag, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (name, etag, len(data), now, now)
+            )
+            if previous is not None and previous['etag'] != etag:
+                self._remove_unreferenced(conn, [previous['etag']])
+        self._counters['puts'] += 1
+
+        if now - self._last_evict >= self.evict_interval:
+            self.evict()
+        return Artifact(name, etag, len(data), now)
+
+    def stat(self, name: str) -> Optional[Artifact]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT name, etag, size, created_at FROM artifacts WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None or time.time() - row['created_at'] > self.ttl:
+            return None
+        return Artifact(**dict(row))
+
+    def read(self, artifact: Artifact, start: int = 0, end: Optional[int] = None) -> bytes:
+        """Bytes start..end (inclusive) of a report, the whole report by default"""
+        with open(self._blob_path(artifact.etag), 'rb') as f:
+            f.seek(start)
+            data = f.read() if end is None else f.read(end - start + 1)
+        with self._connect() as conn:
+            conn.execute("UPDATE artifacts SET last_access = ? WHERE name = ?", (time.time(), artifact.name))
+        self._counters['reads'] += 1
+        return data
+
+    def delete(self, name: str):
+        with self._connect() as conn:
+            row = conn.execute("DELETE FROM artifacts WHERE name = ? RETURNING etag", (name,)).fetchone()
+            if row is not None:
+                self._remove_unreferenced(conn, [row['etag']])
+
+    def _remove_unreferenced(self, conn: sqlite3.Connection, etags: List[str]):
+        for etag in set(etags):
+            if conn.execute("SELECT 1 FROM artifacts WHERE etag = ? LIMIT 1", (etag,)).fetchone() is None:
+                try:
+                    os.remove(self._blob_path(etag))
+                except FileNotFoundError:
+                    pass
+
+    def evict(self) -> int:
+        """Drop expired reports, then least recently downloaded ones until under max_bytes"""
+        self._last_evict = time.time()
+        removed = []
+        with self._connect() as conn:
+            removed += conn.execute(
+                "DELETE FROM artifacts WHERE created_at < ? RETURNING etag", (time.time() - self.ttl,)
+            ).fetchall()
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+            if total > self.max_bytes:
+                for row in conn.execute("SELECT name, etag, size FROM artifacts ORDER BY last_access").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM artifacts WHERE name = ?", (row['name'],))
+                    removed.append(row)
+                    total -= row['size']
+
+            self._remove_unreferenced(conn, [row['etag'] for row in removed])
+        self._counters['evictions'] += len(removed)
+        return len(removed)
+
+    def stats(self) -> Dict:
+        stats = dict(self._counters)
+        stats['backend'] = 'local'
+        with self._connect() as conn:
+            stats['artifacts'], stats['bytes'] = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts"
+            ).fetchone()
+        return stats
+
+
+class S3ArtifactStore:
+    """Reports in an S3 (or S3-compatible) bucket
+
+    Keys are spread over hash-prefixed shards and carry the content hash in
+    their metadata for ETags. boto3 is only imported when the store is first
+    used. S3 has no access times, so size eviction drops the oldest reports;
+    a bucket lifecycle rule can take over TTL expiry for very large buckets.
+    """
+
+    def __init__(self, bucket: str = ARTIFACT_S3_BUCKET, prefix: str = ARTIFACT_S3_PREFIX,
+                 endpoint_url: Optional[str] = ARTIFACT_S3_ENDPOINT_URL,
+                 ttl_days: float = ARTIFACT_TTL_DAYS, max_bytes: int = ARTIFACT_MAX_MB * 1024 * 1024,
+                 evict_interval: float = ARTIFACT_EVICT_SECONDS):
+        if not bucket:
+            raise ValueError("ARTIFACT_S3_BUCKET must be set for the s3 artifact store")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.ttl = ttl_days * 24 * 3600
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._last_evict = 0.0
+        self._counters = {'puts': 0, 'deduplicated': 0, 'reads': 0, 'evictions': 0}
+
+    def _s3(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    self._client = boto3.client('s3', endpoint_url=self.endpoint_url)
+        return self._client
+
+    def _key(self, name: str) -> str:
+        shard = hashlib.sha256(name.encode('utf-8')).hexdigest()[:2]
+        return f"{self.prefix}{shard}/{name}"
+
+    def _head(self, name: str) -> Optional[Artifact]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self._s3().head_object(Bucket=self.bucket, Key=self._key(name))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        etag = head.get('Metadata', {}).get('sha256') or head['ETag'].strip('"')
+        return Artifact(name, etag, head['ContentLength'], head['LastModified'].timestamp())
+
+    def put(self, name: str, data: bytes) -> Artifact:
+        check_artifact_name(name)
+        etag = content_hash(data)
+        existing = self._head(name)
+        if existing is not None and existing.etag == etag:
+            self._counters['deduplicated'] += 1
+            return existing
+
+        self._s3().put_object(
+            Bucket=self.bucket, Key=self._key(name), Body=data,
+            ContentType='application/pdf', Metadata={'sha256': etag}
+        )
+        self._counters['puts'] += 1
+        now = time.time()
+        if now - self._last_evict >= self.evict_interval:
+            self.evict()
+        return Artifact(name, etag, len(data), now)
+
+    def stat(self, name: str) -> Optional[Artifact]:
+        artifact = self._head(name)
+        if artifact is None or time.time() - artifact.created_at > self.ttl:
+            return None
+        return artifact
+
+    def read(self, artifact: Artifact, start: int = 0, end: Optional[int] = None) -> bytes:
+        kwargs = {}
+        if start or end is not None:
+            kwargs['Range'] = f"bytes={start}-{'' if end is None else end}"
+        response = self._s3().get_object(Bucket=self.bucket, Key=self._key(artifact.name), **kwargs)
+        self._counters['reads'] += 1
+        return response['Body'].read()
+
+    def delete(self, name: str):
+        self._s3().delete_object(Bucket=self.bucket, Key=self._key(name))
+
+    def evict(self) -> int:
+        """Delete expired reports, then the oldest until the bucket prefix is under max_bytes"""
+        self._last_evict = time.time()
+        objects = []
+        for page in self._s3().get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=self.prefix):
+            objects += page.get('Contents', [])
+        objects.sort(key=lambda obj: obj['LastModified'])
+
+        expired_before = time.time() - self.ttl
+        total = sum(obj['Size'] for obj in objects)
+        doomed = []
+        for obj in objects:
+            if obj['LastModified'].timestamp() >= expired_before and total <= self.max_bytes:
+                break
+            doomed.append({'Key': obj['Key']})
+            total -= obj['Size']
+
+        # delete_objects takes at most 1000 keys per call
+        for start in range(0, len(doomed), 1000):
+            self._s3().delete_objects(Bucket=self.bucket, Delete={'Objects': doomed[start:start + 1000], 'Quiet': True})
+        self._counters['evictions'] += len(doomed)
+        return len(doomed)
+
+    def stats(self) -> Dict:
+        stats = dict(self._counters)
+        stats['backend'] = 's3'
+        stats['bucket'] = self.bucket
+        return stats
+
+
+_artifact_store = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """The process-wide report store selected by ARTIFACT_STORE ('local' or 's3')"""
+    global _artifact_store
+    if _artifact_store is None:
+        with _artifact_store_lock:
+            if _artifact_store is None:
+                if ARTIFACT_STORE == 's3':
+                    _artifact_store = S3ArtifactStore()
+                elif ARTIFACT_STORE == 'local':
+                    _artifact_store = LocalArtifactStore()
+                else:
+                    raise ValueError(f"Unknown ARTIFACT_STORE: {ARTIFACT_STORE!r} (use 'local' or 's3')")
+    return _artifact_store
+
+
+async def publish_report(result) -> Artifact:
+    """Save an in-memory report under a unique name without blocking the event loop
+
+    Link to the returned artifact's name - it differs from result.filename.
+    """
+    name = artifact_name(result.filename, result.pdf_bytes)
+    return await asyncio.to_thread(get_artifact_store().put, name, result.pdf_bytes)
+
+
+# Test the local store in a temporary directory
+def test_artifact_store():
+    """Dedupe, ranged reads, replacement, TTL and size eviction"""
+    import tempfile
+
+    print("\n🚀 Testing Artifact Store...\n")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = LocalArtifactStore(temp_dir, ttl_days=1, max_bytes=250, evict_interval=3600)
+
+        first = store.put("a.pdf", b"%PDF-" + b"a" * 95)
+        copy = store.put("copy.pdf", b"%PDF-" + b"a" * 95)
+        assert first.etag == copy.etag and store.stats()['deduplicated'] == 1
+        assert store.read(store.stat("a.pdf"), 0, 4) == b"%PDF-"
+        assert store.read(store.stat("a.pdf"), 95) == b"aaaaa"
+
+        # Replacing one name keeps the blob the other name still uses
+        store.put("a.pdf", b"%PDF-" + b"b" * 95)
+        assert store.read(store.stat("copy.pdf")) == b"%PDF-" + b"a" * 95
+        assert store.stat("missing.pdf") is None
+
+        # Over max_bytes: the least recently read report goes first
+        store.read(store.stat("a.pdf"))
+        store.put("c.pdf", b"%PDF-" + b"c" * 95)
+        assert store.evict() == 1
+        assert store.stat("copy.pdf") is None and store.stat("a.pdf") is not None
+        blobs = [f for _, _, files in os.walk(temp_dir) for f in files if f.endswith('.pdf')]
+        assert len(blobs) == 2, blobs
+
+        # Expired reports are hidden at once and removed on the next eviction
+        store.ttl = 0
+        assert store.stat("a.pdf") is None
+        assert store.evict() == 2 and store.stats()['artifacts'] == 0
+
+        # Same download name, different content: both reports stay available
+        first_name = artifact_name("Report_X.pdf", b"%PDF-first")
+        second_name = artifact_name("Report_X.pdf", b"%PDF-second")
+        assert first_name != second_name and download_name(first_name) == "Report_X.pdf"
+        store.ttl = 3600
+        store.put(first_name, b"%PDF-first")
+        store.put(second_name, b"%PDF-second")
+        assert store.read(store.stat(first_name)) == b"%PDF-first"
+        assert download_name("Report_X.pdf") == "Report_X.pdf"
+
+        for bad_name in ("../x.pdf", ".hidden.pdf", "a/b.pdf", ""):
+            try:
+                store.put(bad_name, b"x")
+            except ValueError:
+                continue
+            raise AssertionError(f"accepted {bad_name!r}")
+
+    print("✅ Artifact store dedupes, serves ranges and evicts by TTL and size")
+
+
+# Test the S3 store against the local stub
+def test_s3_artifact_store():
+    """Put, stat, ranged reads and eviction through boto3 against a local S3 stub"""
+    import re
+    from email.utils import formatdate
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, unquote, urlsplit
+    from xml.sax.saxutils import escape
+
+    print("\n🚀 Testing S3 Artifact Store...\n")
+
+    # Path-style S3 stand-in for the calls S3ArtifactStore makes: PutObject,
+    # HeadObject, ranged GetObject, DeleteObject, ListObjectsV2 and DeleteObjects
+    objects = {}
+
+    class S3Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _target(self):
+            parts = urlsplit(self.path)
+            bucket, _, key = unquote(parts.path).lstrip('/').partition('/')
+            return bucket, key, parse_qs(parts.query, keep_blank_values=True)
+
+        def _body(self) -> bytes:
+            data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if 'aws-chunked' not in (self.headers.get("Content-Encoding") or ''):
+                return data
+            # aws-chunked: <hex size>[;signature]\r\n<data>\r\n ... 0\r\n<trailers>
+            body, rest = b"", data
+            while rest:
+                size_line, _, rest = rest.partition(b"\r\n")
+                size = int(size_line.split(b";")[0], 16)
+                if size == 0:
+                    break
+                body, rest = body + rest[:size], rest[size + 2:]
+            return body
+
+        def _send(self, status: int, body: bytes = b"", headers: Dict = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if self.command != 'HEAD' or 'Content-Length' not in (headers or {}):
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def _object_headers(self, obj: Dict) -> Dict:
+            headers = {
+                "ETag": f'"{obj["md5"]}"',
+                "Last-Modified": formatdate(obj['modified'], usegmt=True),
+                "Content-Type": "application/pdf",
+                "Accept-Ranges": "bytes"
+            }
+            for name, value in obj['metadata'].items():
+                headers[f"x-amz-meta-{name}"] = value
+            return headers
+
+        def do_PUT(self):
+            _, key, _ = self._target()
+            data = self._body()
+            metadata = {name[len("x-amz-meta-"):]: value for name, value in self.headers.items()
+                        if name.lower().startswith("x-amz-meta-")}
+            objects[key] = {'data': data, 'md5': hashlib.md5(data).hexdigest(),
+                                 'modified': time.time(), 'metadata': metadata}
+            self._send(200, headers={"ETag": f'"{objects[key]["md5"]}"'})
+
+        def do_HEAD(self):
+            _, key, _ = self._target()
+            obj = objects.get(key)
+            if obj is None:
+                return self._send(404)
+            headers = self._object_headers(obj)
+            headers["Content-Length"] = str(len(obj['data']))
+            self._send(200, headers=headers)
+
+        def do_GET(self):
+            bucket, key, query = self._target()
+            if not key and 'list-type' in query:
+                prefix = query.get('prefix', [''])[0]
+                contents = "".join(
+                    f"<Contents><Key>{escape(name)}</Key>"
+                    f"<LastModified>{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(obj['modified']))}</LastModified>"
+                    f"<ETag>&quot;{obj['md5']}&quot;</ETag><Size>{len(obj['data'])}</Size>"
+                    f"<StorageClass>STANDARD</StorageClass></Contents>"
+                    for name, obj in sorted(objects.items()) if name.startswith(prefix)
+                )
+                body = (f'<?xml version="1.0" encoding="UTF-8"?>'
+                        f'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                        f'<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>'
+                        f'<IsTruncated>false</IsTruncated>{contents}</ListBucketResult>')
+                return self._send(200, body.encode('utf-8'), {"Content-Type": "application/xml"})
+
+            obj = objects.get(key)
+            if obj is None:
+                body = b"<Error><Code>NoSuchKey</Code><Message>Not found</Message></Error>"
+                return self._send(404, body, {"Content-Type": "application/xml"})
+            data, status, headers = obj['data'], 200, self._object_headers(obj)
+            byte_range = self.headers.get("Range")
+            if byte_range:
+                first, _, last = byte_range.removeprefix("bytes=").partition('-')
+                start, end = int(first), int(last) if last else len(data) - 1
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                data, status = data[start:end + 1], 206
+            self._send(status, data, headers)
+
+        def do_DELETE(self):
+            _, key, _ = self._target()
+            objects.pop(key, None)
+            self._send(204)
+
+        def do_POST(self):
+            _, _, query = self._target()
+            if 'delete' not in query:
+                return self._send(400)
+            keys = re.findall(r"<Key>(.*?)</Key>", self._body().decode('utf-8'))
+            for key in keys:
+                objects.pop(key, None)
+            body = '<?xml version="1.0" encoding="UTF-8"?><DeleteResult></DeleteResult>'
+            self._send(200, body.encode('utf-8'), {"Content-Type": "application/xml"})
+
+        def log_message(self, *args):
+            pass
+
+    # The stub does not check signatures, but boto3 needs credentials to sign with
+    for name, value in (("AWS_ACCESS_KEY_ID", "test"), ("AWS_SECRET_ACCESS_KEY", "test"),
+                        ("AWS_DEFAULT_REGION", "us-east-1")):
+        os.environ.setdefault(name, value)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), S3Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        store = S3ArtifactStore("reports-test", prefix="reports/", endpoint_url=endpoint_url,
+                                ttl_days=1, max_bytes=250, evict_interval=3600)
+
+        first = store.put("a.pdf", b"%PDF-" + b"a" * 95)
+        assert first.etag == content_hash(b"%PDF-" + b"a" * 95)
+        assert store.put("a.pdf", b"%PDF-" + b"a" * 95).etag == first.etag
+        assert store.stats()['deduplicated'] == 1 and store.stats()['puts'] == 1
+
+        artifact = store.stat("a.pdf")
+        assert artifact is not None and artifact.etag == first.etag and artifact.size == 100
+        assert store.read(artifact, 0, 4) == b"%PDF-"
+        assert store.read(artifact, 95) == b"aaaaa"
+        assert store.read(artifact) == b"%PDF-" + b"a" * 95
+        assert store.stat("missing.pdf") is None
+
+        # Over max_bytes: the oldest report goes first (S3 times are whole seconds, so age them)
+        store.put("b.pdf", b"%PDF-" + b"b" * 95)
+        store.put("c.pdf", b"%PDF-" + b"c" * 95)
+        for key, obj in objects.items():
+            obj['modified'] -= {'a.pdf': 60, 'b.pdf': 30}.get(key.rsplit('/', 1)[-1], 0)
+        assert store.evict() == 1
+        assert store.stat("a.pdf") is None and store.stat("c.pdf") is not None
+
+        # Expired reports are hidden at once and deleted on the next eviction
+        store.ttl = 0
+        assert store.stat("c.pdf") is None
+        assert store.evict() == 2 and not objects
+
+        store.put("d.pdf", b"%PDF-d")
+        store.delete("d.pdf")
+        assert not objects
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("✅ S3 store round-trips, serves ranges and evicts by TTL and size")
+
+
+if __name__ == "__main__":
+    test_artifact_store()
+    test_s3_artifact_store()
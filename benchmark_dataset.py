@@ -0,0 +1,237 @@
+# benchmark_dataset.py
+# Versioned benchmark reference data loaded from benchmark_data.json with hot reload
+#
+# Edit benchmark_data.json (and bump its "version") to change wage, staffing,
+# turnover, denial, AR and cost-of-living figures without a redeploy. Every
+# process polls the file and swaps the new version in atomically; reports
+# record the version they were rendered with.
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+
+BENCHMARK_DATA_PATH = os.environ.get(
+    "BENCHMARK_DATA_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_data.json")
+)
+BENCHMARK_RELOAD_SECONDS = float(os.environ.get("BENCHMARK_RELOAD_SECONDS", "10"))
+
+REQUIRED_SECTIONS = (
+    'bls_wage_data', 'state_wage_multipliers', 'rcm_role_weights',
+    'staffing_benchmarks', 'regional_cost_factors'
+)
+
+
+def _freeze(table):
+    """Read-only view of a nested dict table, shared safely by every request"""
+    if isinstance(table, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in table.items()})
+    return table
+
+
+def thaw_table(table):
+    """Plain nested dict copy of a frozen table (for results that get pickled or serialized)"""
+    if isinstance(table, Mapping):
+        return {key: thaw_table(value) for key, value in table.items()}
+    return table
+
+
+@dataclass(frozen=True)
+class BenchmarkDataset:
+    """One immutable version of the benchmark tables"""
+    version: str
+    bls_wage_data: Mapping
+    state_wage_multipliers: Mapping
+    rcm_role_weights: Mapping
+    staffing_benchmarks: Mapping
+    regional_cost_factors: Mapping
+    state_wage_tables: Mapping
+
+    def wage_table(self, state: str) -> Mapping:
+        """Wage figures for a state (states without a multiplier use the US table)"""
+        return self.state_wage_tables.get(state, self.state_wage_tables['US'])
+
+    def cost_factor(self, state: str) -> float:
+        return self.regional_cost_factors.get(state, 1.0)
+
+
+def _state_wage_table(bls_wage_data: Mapping, multiplier) -> dict:
+    return {
+        role: {
+            metric: int(value * multiplier) if multiplier is not None else value
+            for metric, value in figures.items()
+        }
+        for role, figures in bls_wage_data['US'].items()
+    }
+
+
+def load_dataset(path: str = BENCHMARK_DATA_PATH) -> BenchmarkDataset:
+    """Read and validate a dataset file, precomputing the per-state wage tables"""
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+
+    missing = [section for section in ('version',) + REQUIRED_SECTIONS if section not in raw]
+    if missing:
+        raise ValueError(f"{path} is missing {', '.join(missing)}")
+    if 'US' not in raw['bls_wage_data']:
+        raise ValueError(f"{path} has no US wage table")
+
+    multipliers = raw['state_wage_multipliers']
+    state_wage_tables = {
+        state: _state_wage_table(raw['bls_wage_data'], multipliers.get(state))
+        for state in ['US', *multipliers]
+    }
+
+    return BenchmarkDataset(
+        version=str(raw['version']),
+        bls_wage_data=_freeze(raw['bls_wage_data']),
+        state_wage_multipliers=_freeze(multipliers),
+        rcm_role_weights=_freeze(raw['rcm_role_weights']),
+        staffing_benchmarks=_freeze(raw['staffing_benchmarks']),
+        regional_cost_factors=_freeze(raw['regional_cost_factors']),
+        state_wage_tables=_freeze(state_wage_tables)
+    )
+
+
+class DatasetWatcher:
+    """Keeps the current dataset and swaps in new versions when the file changes
+
+    Readers take a reference with current() and use it for the whole
+    calculation, so a reload mid-request never mixes two versions. A file
+    that fails to load is reported and the previous version stays active.
+    """
+
+    def __init__(self, path: str = BENCHMARK_DATA_PATH, interval: float = BENCHMARK_RELOAD_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._dataset = None
+        self._signature = None
+        self._lock = threading.Lock()
+        # Separate from _lock, which reload() takes - guards the first load and the watcher start
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        """Load the file if it changed since the last load; returns True on a swap"""
+        with self._lock:
+            signature = None
+            try:
+                signature = self._file_signature()
+                if signature == self._signature:
+                    return False
+                dataset = load_dataset(self.path)
+            except (OSError, ValueError) as e:
+                if self._dataset is None:
+                    raise
+                # Remember the bad file so it is reported once, not on every poll
+                self._signature = signature or self._signature
+                print(f"Keeping benchmark dataset {self._dataset.version}: reload failed ({e})")
+                return False
+
+            previous = self._dataset
+            self._dataset = dataset
+            self._signature = signature
+        if previous is not None and previous.version != dataset.version:
+            print(f"Benchmark dataset reloaded: {previous.version} -> {dataset.version}")
+        return True
+
+    def current(self) -> BenchmarkDataset:
+        if self._dataset is None:
+            with self._start_lock:
+                if self._dataset is None:
+                    self.reload()
+                    self._start()
+        return self._dataset
+
+    def _start(self):
+        if self._thread is not None or self.interval <= 0 or self._stop.is_set():
+            return
+        self._thread = threading.Thread(target=self._watch, name="benchmark-dataset-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop polling the file and wait for the watcher thread to exit
+
+        The loaded dataset stays available; a stopped watcher is not restarted.
+        """
+        self._stop.set()
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Benchmark dataset watcher error: {e}")
+
+
+# Per-process handle on the dataset file
+dataset_watcher = DatasetWatcher()
+
+
+def get_dataset() -> BenchmarkDataset:
+    """The benchmark dataset currently in effect for this process"""
+    return dataset_watcher.current()
+
+
+# Test loading and hot reload
+def test_benchmark_dataset():
+    """Swap a new version in on disk and check readers pick it up"""
+    import shutil
+    import tempfile
+    import time
+
+    print("\n🚀 Testing Benchmark Dataset...\n")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "benchmark_data.json")
+        shutil.copy(BENCHMARK_DATA_PATH, path)
+
+        watcher = DatasetWatcher(path, interval=0.05)
+        first = watcher.current()
+        assert first.wage_table('CA')['medical_coders']['mean_annual'] == int(52350 * 1.25)
+        assert first.wage_table('ZZ') is first.wage_table('US')
+
+        with open(path) as f:
+            raw = json.load(f)
+        raw['version'] = first.version + "-test"
+        raw['regional_cost_factors']['OH'] = 1.5
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(raw, f)
+        os.replace(temp_path, path)
+
+        deadline = time.time() + 5
+        while watcher.current().version == first.version and time.time() < deadline:
+            time.sleep(0.05)
+        second = watcher.current()
+        assert second.version == first.version + "-test", second.version
+        assert second.cost_factor('OH') == 1.5 and first.cost_factor('OH') == 0.93
+
+        # A broken file keeps the last good version
+        with open(path, "w") as f:
+            f.write("{not json")
+        time.sleep(0.2)
+        assert watcher.current() is second
+
+        thread = watcher._thread
+        watcher.stop()
+        assert not thread.is_alive() and watcher.current() is second
+
+    print(f"✅ Dataset {first.version} loaded and hot reload swaps versions atomically")
+
+
+if __name__ == "__main__":
+    test_benchmark_dataset()
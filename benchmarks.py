@@ -0,0 +1,289 @@
+# benchmarks.py
+# Stage-by-stage benchmarks for the report generators with a regression gate
+#
+#     python benchmarks.py --output bench.json
+#     python benchmarks.py --baseline bench.json --threshold 0.25
+#
+# Each benchmark is timed several times and summarized by its median. CMS
+# lookups are answered from a fixed record and chart caching is switched
+# off, so runs are offline and every render draws its charts from scratch.
+# With --baseline the run fails (exit code 1) when any stage's median is
+# more than --threshold slower than the baseline's.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from chart_cache import CHART_BACKENDS
+from chart_profiles import CHART_PROFILES, DEFAULT_CHART_PROFILE
+
+
+# Suite settings
+BENCH_REPEAT = int(os.environ.get("BENCH_REPEAT", "3"))
+BENCH_THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.25"))
+# Slowdowns smaller than this are treated as timer noise
+BENCH_NOISE_FLOOR_SECONDS = float(os.environ.get("BENCH_NOISE_FLOOR_SECONDS", "0.0002"))
+
+BENCH_HOSPITAL = "Benchmark Regional Medical Center"
+BENCH_RECIPIENT = ("Bench Reader", "bench@example.com")
+# Bed sizes span the medium and large staffing bands; states span cost factors.
+# Data-enhanced reports under 120 beds round turnover down to zero staff and
+# cannot draw the savings chart, so the small band is not benchmarked.
+BENCH_BEDS = (150, 450, 1200)
+BENCH_STATES = ('TX', 'CA', 'OH')
+BENCH_CHART_BEDS = 450
+
+# Fixed CMS answer so data collection never touches the network
+STUB_CMS_RECORD = {
+    'found': True,
+    'provider_id': '000000',
+    'city': 'Springfield',
+    'hospital_type': 'Acute Care Hospitals',
+    'hospital_ownership': 'Voluntary non-profit - Private',
+    'emergency_services': 'Yes',
+    'hospital_overall_rating': '4'
+}
+
+
+@contextlib.contextmanager
+def offline_environment():
+    """Stub CMS, disable chart caching and keep any files out of the working tree"""
+    import generate_report_enhanced
+    from chart_cache import ChartCache
+    from data_sources import HealthcareDataCollector
+
+    def stub_cms_lookup(self, hospital_name, state=None):
+        return dict(STUB_CMS_RECORD, hospital_name=hospital_name, state=state or 'US')
+
+    original_lookup = HealthcareDataCollector.get_hospital_data_from_cms
+    original_cache = generate_report_enhanced.chart_cache
+    original_cwd = os.getcwd()
+    HealthcareDataCollector.get_hospital_data_from_cms = stub_cms_lookup
+    # A zero-byte memory tier and no disk tier means every lookup is a miss
+    generate_report_enhanced.chart_cache = ChartCache(memory_limit=0, disk_dir=None)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            try:
+                yield
+            finally:
+                os.chdir(original_cwd)
+    finally:
+        HealthcareDataCollector.get_hospital_data_from_cms = original_lookup
+        generate_report_enhanced.chart_cache = original_cache
+
+
+def measure(func: Callable, repeat: int) -> List[float]:
+    """Per-call seconds for each repeat, looping fast functions like timeit does"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return [total / number for total in timer.repeat(repeat, number)]
+
+
+def measure_pipeline(func: Callable, repeat: int) -> Dict[str, List[float]]:
+    """Run a full report build repeat times and collect each stage's timings"""
+    stages = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        wall = time.perf_counter() - started
+        timings = dict(getattr(result, 'timings', None) or {})
+        timings['full'] = wall
+        for stage, seconds in timings.items():
+            stages.setdefault(stage, []).append(seconds)
+    return stages
+
+
+def summarize(samples: List[float]) -> Dict:
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'runs': len(samples)
+    }
+
+
+# Stages of a full build worth gating on (metrics are timed on their own -
+# one call is too short to measure inside a build)
+PIPELINE_STAGES = ('data_collection', 'charts', 'doc_build', 'full')
+
+
+def run_suite(repeat: int = BENCH_REPEAT, chart_backend: str = 'matplotlib', only: str = None,
+              chart_profile: str = DEFAULT_CHART_PROFILE) -> Dict[str, Dict]:
+    """Time every benchmark whose name contains only (all by default)"""
+    from chart_profiles import get_chart_profile
+    from generate_report import RCMBenchmarkReportGenerator
+    from generate_report_enhanced import EnhancedRCMReportGenerator, ReportContext
+    from generate_report_enhanced_v2 import DataEnhancedRCMReportGenerator
+    from data_sources import enhance_report_with_real_data
+    import charts_vector
+
+    results = {}
+
+    def wanted(name):
+        return not only or only in name
+
+    def bench(name, func):
+        if wanted(name):
+            print(f"⏱️  {name}", file=sys.__stdout__, flush=True)
+            results[name] = summarize(measure(func, repeat))
+
+    def bench_pipeline(prefix, func):
+        if any(wanted(f"{prefix}/{stage}") for stage in PIPELINE_STAGES):
+            print(f"⏱️  {prefix}", file=sys.__stdout__, flush=True)
+            for stage, samples in measure_pipeline(func, repeat).items():
+                if stage in PIPELINE_STAGES and wanted(f"{prefix}/{stage}"):
+                    results[f"{prefix}/{stage}"] = summarize(samples)
+
+    recipient_name, recipient_email = BENCH_RECIPIENT
+
+    # Generators print progress for every report - keep the benchmark output readable
+    with offline_environment(), contextlib.redirect_stdout(io.StringIO()):
+        base = RCMBenchmarkReportGenerator()
+        enhanced = EnhancedRCMReportGenerator()
+        data_enhanced = DataEnhancedRCMReportGenerator()
+
+        for beds in BENCH_BEDS:
+            bench(f"base/beds={beds}/metrics", lambda: base.calculate_metrics(beds, BENCH_HOSPITAL))
+            bench_pipeline(f"base/beds={beds}", lambda: base.generate_report(
+                BENCH_HOSPITAL, beds, recipient_name, recipient_email
+            ))
+
+            bench(f"enhanced/beds={beds}/metrics", lambda: enhanced.calculate_metrics(beds, BENCH_HOSPITAL))
+            bench_pipeline(f"enhanced/beds={beds}", lambda: enhanced.build_report(
+                BENCH_HOSPITAL, beds, recipient_name, recipient_email,
+                chart_backend=chart_backend, chart_profile=chart_profile, in_memory=True
+            ))
+
+        # Bed sweep in the first state, then the other states at one bed size
+        cases = [(beds, BENCH_STATES[0]) for beds in BENCH_BEDS]
+        cases += [(BENCH_CHART_BEDS, state) for state in BENCH_STATES[1:]]
+        for beds, state in cases:
+            prefix = f"data_enhanced/beds={beds},state={state}"
+            real_data = enhance_report_with_real_data(BENCH_HOSPITAL, beds, state)
+            context = ReportContext(BENCH_HOSPITAL, beds, recipient_name, recipient_email, state=state,
+                                    real_data=real_data)
+            bench(f"{prefix}/enhance_report_with_real_data",
+                  lambda: enhance_report_with_real_data(BENCH_HOSPITAL, beds, state))
+            bench(f"{prefix}/metrics", lambda: data_enhanced.calculate_metrics(beds, BENCH_HOSPITAL, context))
+            bench_pipeline(prefix, lambda: data_enhanced.build_report(
+                BENCH_HOSPITAL, beds, recipient_name, recipient_email, state=state,
+                chart_backend=chart_backend, chart_profile=chart_profile, in_memory=True
+            ))
+
+        # Each chart function on its own, raster (in the chosen profile) and vector
+        profile = get_chart_profile(chart_profile)
+        metrics = enhanced.calculate_metrics(BENCH_CHART_BEDS, BENCH_HOSPITAL)
+        real_data = enhance_report_with_real_data(BENCH_HOSPITAL, BENCH_CHART_BEDS, BENCH_STATES[0])
+        data_metrics = data_enhanced.calculate_metrics(
+            BENCH_CHART_BEDS, BENCH_HOSPITAL,
+            ReportContext(BENCH_HOSPITAL, BENCH_CHART_BEDS, recipient_name, recipient_email, real_data=real_data)
+        )
+        bench("chart/turnover_comparison",
+              lambda: enhanced.create_turnover_comparison_chart(metrics, BENCH_HOSPITAL, profile))
+        bench("chart/cost_savings", lambda: enhanced.create_cost_savings_chart(metrics, profile))
+        bench("chart/roi_timeline", lambda: enhanced.create_roi_timeline_chart(metrics, profile))
+        bench("chart/enhanced_turnover",
+              lambda: data_enhanced.create_enhanced_turnover_chart(data_metrics, BENCH_HOSPITAL, profile))
+        bench("chart/vector_turnover_comparison", lambda: charts_vector.turnover_comparison_drawing(BENCH_HOSPITAL))
+        bench("chart/vector_cost_savings", lambda: charts_vector.cost_savings_drawing(metrics))
+        bench("chart/vector_roi_timeline", lambda: charts_vector.roi_timeline_drawing(metrics))
+
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float = BENCH_THRESHOLD,
+            noise_floor: float = BENCH_NOISE_FLOOR_SECONDS) -> List[Dict]:
+    """Benchmarks whose median slowed down by more than threshold (and the noise floor)"""
+    regressions = []
+    for name, summary in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        before, after = previous['median'], summary['median']
+        if after > before * (1 + threshold) and after - before > noise_floor:
+            regressions.append({
+                'name': name,
+                'baseline': before,
+                'current': after,
+                'change': (after - before) / before if before else float('inf')
+            })
+    return regressions
+
+
+def print_results(results: Dict[str, Dict], baseline: Dict[str, Dict]):
+    width = max(len(name) for name in results)
+    for name, summary in sorted(results.items()):
+        line = f"{name:<{width}}  {summary['median'] * 1000:10.3f} ms"
+        previous = baseline.get(name)
+        if previous and previous['median']:
+            change = (summary['median'] - previous['median']) / previous['median']
+            line += f"  ({change:+.1%} vs baseline)"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks",
+        description="Benchmark each report generation stage and gate on regressions"
+    )
+    parser.add_argument("--output", default="bench_results.json", help="Where to write this run's results")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=BENCH_THRESHOLD,
+                        help=f"Allowed slowdown as a fraction of the baseline (default: {BENCH_THRESHOLD})")
+    parser.add_argument("--repeat", type=int, default=BENCH_REPEAT, help="Timed runs per benchmark")
+    parser.add_argument("--chart-backend", choices=CHART_BACKENDS, default="matplotlib")
+    parser.add_argument("--chart-profile", choices=tuple(CHART_PROFILES), default=DEFAULT_CHART_PROFILE,
+                        help="Raster chart resolution and encoding (compare results per profile)")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    print(f"\n🚀 Running report benchmarks ({args.repeat} runs each, {args.chart_backend} charts, "
+          f"{args.chart_profile} profile)...\n")
+    started = time.perf_counter()
+    results = run_suite(args.repeat, args.chart_backend, args.only, args.chart_profile)
+    if not results:
+        print("❌ No benchmarks matched")
+        return 1
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'chart_backend': args.chart_backend,
+            'chart_profile': args.chart_profile,
+            'results': results
+        }, f, indent=2, sort_keys=True)
+
+    print()
+    print_results(results, baseline)
+    print(f"\n📄 {len(results)} benchmarks in {time.perf_counter() - started:.1f}s written to {args.output}")
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"❌ {regression['name']} regressed {regression['change']:+.1%}: "
+              f"{regression['baseline'] * 1000:.3f} ms -> {regression['current'] * 1000:.3f} ms")
+    if baseline and not regressions:
+        print(f"✅ No stage slower than {args.threshold:.0%} over the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# chart_cache.py
+# Content-addressed cache for rendered chart images (memory LRU + disk tier)
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, Dict, Optional
+
+
+# Cache limits - override with environment variables
+CHART_CACHE_MEMORY_MB = int(os.environ.get("CHART_CACHE_MEMORY_MB", "64"))
+CHART_CACHE_DISK_MB = int(os.environ.get("CHART_CACHE_DISK_MB", "512"))
+CHART_CACHE_DIR = os.environ.get("CHART_CACHE_DIR", ".chart_cache")
+
+# Bump when chart drawing code changes so old images are never served
+CHART_CACHE_VERSION = 1
+
+# Chart rendering backends selectable per report
+CHART_BACKENDS = ('matplotlib', 'vector')
+
+
+class ChartCache:
+    """Two-tier cache of chart PNG bytes keyed by a hash of the chart's inputs
+
+    The memory tier is an LRU bounded by total bytes. The disk tier is shared by
+    every worker process on the machine and evicts least recently used files
+    once it grows past its size limit. Pass disk_dir=None to disable it.
+    """
+
+    def __init__(self, memory_limit: int = CHART_CACHE_MEMORY_MB * 1024 * 1024,
+                 disk_dir: Optional[str] = CHART_CACHE_DIR,
+                 disk_limit: int = CHART_CACHE_DISK_MB * 1024 * 1024):
+        self.memory_limit = memory_limit
+        self.disk_dir = disk_dir
+        self.disk_limit = disk_limit
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0
+        }
+
+    @staticmethod
+    def make_key(chart_name: str, inputs: Dict) -> str:
+        """Hash of the chart name and the exact inputs it is drawn from"""
+        payload = json.dumps([CHART_CACHE_VERSION, chart_name, inputs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.png")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return data
+
+        data = self._read_disk(key)
+        with self._lock:
+            if data is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._store_memory(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            self._store_memory(key, data)
+        self._write_disk(key, data)
+
+    def get_or_render(self, chart_name: str, inputs: Dict, render: Callable[[], BytesIO]) -> BytesIO:
+        """Return the cached chart for these inputs, rendering it on a miss"""
+        key = self.make_key(chart_name, inputs)
+        data = self.get(key)
+        if data is None:
+            data = render().getvalue()
+            self.put(key, data)
+        return BytesIO(data)
+
+    def _store_memory(self, key: str, data: bytes):
+        if len(data) > self.memory_limit:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_limit:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._counters['memory_evictions'] += 1
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Refresh mtime so eviction treats this entry as recently used
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so other workers never read a partial file
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not write chart cache entry: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_usage()
+            else:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.disk_limit:
+                self._evict_disk()
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith('.png'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_disk_usage(self) -> int:
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def _evict_disk(self):
+        """Delete least recently used files until usage is 90% of the limit"""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        usage = sum(size for _, size, _ in entries)
+        target = self.disk_limit * 0.9
+        for path, size, _ in entries:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            usage -= size
+            self._counters['disk_evictions'] += 1
+        self._disk_bytes = usage
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current tier sizes"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# Per-process cache used by the report generators
+chart_cache = ChartCache()
+
+
+# Test both tiers in a temporary directory
+def test_chart_cache():
+    """Charts pushed out of the memory tier are served from disk; disk evicts oldest first"""
+    import tempfile
+    import time
+
+    print("\n🚀 Testing Chart Cache...\n")
+
+    renders = []
+
+    def render(fill):
+        def draw():
+            renders.append(fill)
+            return BytesIO(fill * 100)
+        return draw
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Room for two 100-byte charts in memory
+        cache = ChartCache(memory_limit=250, disk_dir=temp_dir, disk_limit=10_000)
+        for fill in (b"a", b"b", b"c"):
+            cache.get_or_render("chart", {'fill': fill}, render(fill))
+        stats = cache.stats()
+        assert stats['memory_entries'] == 2 and stats['memory_evictions'] == 1 and stats['misses'] == 3
+
+        # The evicted chart comes back from disk without a re-render...
+        assert cache.get_or_render("chart", {'fill': b"a"}, render(b"a")).getvalue() == b"a" * 100
+        assert renders == [b"a", b"b", b"c"] and cache.stats()['disk_hits'] == 1
+        # ...and is back in memory afterwards
+        cache.get_or_render("chart", {'fill': b"a"}, render(b"a"))
+        assert cache.stats()['memory_hits'] == 1
+
+        # Another process (empty memory tier) shares the disk tier
+        other = ChartCache(memory_limit=250, disk_dir=temp_dir, disk_limit=10_000)
+        assert other.get(ChartCache.make_key("chart", {'fill': b"c"})) == b"c" * 100
+
+        # Over the disk limit the least recently used files go first
+        small = ChartCache(memory_limit=0, disk_dir=os.path.join(temp_dir, "small"), disk_limit=250)
+        small.put("old", b"o" * 100)
+        old_path = small._disk_path("old")
+        os.utime(old_path, (time.time() - 60, time.time() - 60))
+        small.put("mid", b"m" * 100)
+        small.put("new", b"n" * 100)
+        assert not os.path.exists(old_path) and small.get("new") == b"n" * 100
+        assert small.stats()['disk_evictions'] >= 1
+
+    print("✅ Memory LRU evicts to the disk tier and disk evicts least recently used")
+
+
+if __name__ == "__main__":
+    test_chart_cache()
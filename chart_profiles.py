@@ -0,0 +1,43 @@
+# chart_profiles.py
+# Output profiles for raster charts - resolution and image encoding per delivery channel
+#
+# Charts are drawn at their layout size (the fonts are sized for it) and the
+# profile decides how many pixels that becomes and how they are encoded.
+# ReportLab embeds JPEG data as-is, while PNGs are decoded and deflated
+# again for every report, so JPEG charts also make doc_build much cheaper.
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ChartProfile:
+    """How raster charts are rendered and encoded for one delivery channel"""
+    name: str
+    dpi: int
+    image_format: str = 'png'             # 'png' or 'jpeg'
+    jpeg_quality: int = 85
+    palette_colors: Optional[int] = None  # quantize PNGs to this many colors
+
+
+CHART_PROFILES = {
+    # Emailed download links - opened once on screen, small and quick to build
+    'email-preview': ChartProfile('email-preview', dpi=100, image_format='jpeg', jpeg_quality=80),
+    # Viewed on screen - sharp when zoomed, palette PNGs keep text edges clean
+    'screen': ChartProfile('screen', dpi=150, palette_colors=256),
+    # Full-resolution charts for printing (the original output)
+    'print': ChartProfile('print', dpi=300)
+}
+DEFAULT_CHART_PROFILE = 'print'
+
+# Profile for reports whose download link is emailed through Clay
+CLAY_CHART_PROFILE = os.environ.get("CLAY_CHART_PROFILE", "email-preview")
+
+
+def get_chart_profile(name: Optional[str] = None) -> ChartProfile:
+    """The named profile (the default when name is None)"""
+    try:
+        return CHART_PROFILES[name or DEFAULT_CHART_PROFILE]
+    except KeyError:
+        raise ValueError(f"Unknown chart profile: {name}")
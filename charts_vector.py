@@ -0,0 +1,270 @@
+# charts_vector.py
+# Native ReportLab vector versions of the report charts (no matplotlib required)
+
+from reportlab.graphics.shapes import Drawing, String, Line, Polygon, Circle, Group
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+
+RED = colors.HexColor('#ef4444')
+ORANGE = colors.HexColor('#f59e0b')
+GREEN = colors.HexColor('#10b981')
+GRAY = colors.HexColor('#6b7280')
+GRID = colors.HexColor('#e5e7eb')
+GREEN_BAR = colors.Color(GREEN.red, GREEN.green, GREEN.blue, alpha=0.7)
+GREEN_FILL = colors.Color(GREEN.red, GREEN.green, GREEN.blue, alpha=0.3)
+
+# Fixed comparison rates shown on the turnover chart
+TURNOVER_RATES = [40, 35, 15]
+TARGET_TURNOVER_RATE = 15
+
+
+def roi_timeline_series(potential_savings):
+    """Cumulative investment and savings every 3 months over 3 years"""
+    months = list(range(0, 37, 3))
+    investment = []
+    returns = []
+
+    for month in months:
+        if month == 0:
+            inv = 0
+            ret = 0
+        elif month <= 12:
+            inv = (month/12) * 450000
+            ret = (month/12) * potential_savings
+        elif month <= 24:
+            inv = 450000 + ((month-12)/12) * 400000
+            ret = potential_savings + ((month-12)/12) * potential_savings
+        else:
+            inv = 450000 + 400000 + ((month-24)/12) * 400000
+            ret = 2 * potential_savings + ((month-24)/12) * potential_savings
+
+        investment.append(inv)
+        returns.append(ret)
+
+    return months, investment, returns
+
+
+def _millions(value):
+    return f'${value/1e6:.1f}M'
+
+
+def _title(drawing, x, y, text, size=14):
+    drawing.add(String(x, y, text, fontName='Helvetica-Bold', fontSize=size, textAnchor='middle'))
+
+
+def _vertical_label(drawing, x, y, text):
+    label = Group(
+        String(0, 0, text, fontName='Helvetica-Bold', fontSize=10, textAnchor='middle'),
+        transform=(0, 1, -1, 0, x, y)
+    )
+    drawing.add(label)
+
+
+def turnover_comparison_drawing(hospital_name, width=6.5*inch, height=4.3*inch):
+    """Bar chart comparing current, industry average and best practice turnover"""
+    drawing = Drawing(width, height)
+    _title(drawing, width/2, height - 20, 'RCM Staff Turnover Rate Comparison', size=16)
+
+    chart = VerticalBarChart()
+    chart.x = 55
+    chart.y = 45
+    chart.width = width - 75
+    chart.height = height - 90
+    chart.data = [TURNOVER_RATES]
+    chart.barWidth = 6
+    chart.groupSpacing = 4
+    chart.bars.strokeColor = None
+    for i, color in enumerate([RED, ORANGE, GREEN]):
+        chart.bars[(0, i)].fillColor = color
+
+    chart.barLabelFormat = '%d%%'
+    chart.barLabels.nudge = 10
+    chart.barLabels.fontName = 'Helvetica-Bold'
+    chart.barLabels.fontSize = 14
+
+    chart.categoryAxis.categoryNames = [f'{hospital_name}\n(Current)', 'Industry\nAverage', 'Best\nPractice']
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 11
+    chart.categoryAxis.labels.dy = -4
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = 50
+    chart.valueAxis.valueStep = 10
+    chart.valueAxis.labels.fontName = 'Helvetica'
+    chart.valueAxis.labels.fontSize = 10
+    chart.valueAxis.visibleGrid = 1
+    chart.valueAxis.gridStrokeColor = GRID
+    drawing.add(chart)
+
+    # Reference line for the target rate, with a legend entry in the top corner
+    target_y = chart.y + chart.height * TARGET_TURNOVER_RATE / chart.valueAxis.valueMax
+    drawing.add(Line(chart.x, target_y, chart.x + chart.width, target_y,
+                     strokeColor=colors.green, strokeWidth=1.5, strokeDashArray=[6, 3]))
+    legend_x = chart.x + chart.width - 95
+    legend_y = chart.y + chart.height - 8
+    drawing.add(Line(legend_x, legend_y + 3, legend_x + 25, legend_y + 3,
+                     strokeColor=colors.green, strokeWidth=1.5, strokeDashArray=[6, 3]))
+    drawing.add(String(legend_x + 30, legend_y, 'Target Rate', fontName='Helvetica', fontSize=10))
+
+    _vertical_label(drawing, 15, chart.y + chart.height/2, 'Staff Turnover Rate (%)')
+    return drawing
+
+
+def cost_savings_drawing(metrics, width=7*inch, height=3*inch):
+    """Donut of optimized cost vs savings beside a 3-year cumulative savings bar chart"""
+    drawing = Drawing(width, height)
+
+    current_cost = metrics['current_turnover_cost']
+    saved_cost = metrics['potential_savings']
+    remaining_cost = metrics['reduced_cost']
+    total = (remaining_cost + saved_cost) or 1
+
+    # Donut chart
+    half = width / 2
+    _title(drawing, half/2, height - 16, 'Cost Optimization Potential')
+    size = min(half - 60, height - 60)
+
+    pie = Pie()
+    pie.x = (half - size) / 2
+    pie.y = (height - 30 - size) / 2
+    pie.width = size
+    pie.height = size
+    pie.data = [remaining_cost, saved_cost]
+    pie.labels = [
+        f'Optimized Cost {remaining_cost / total * 100:.0f}%',
+        f'Savings {saved_cost / total * 100:.0f}%'
+    ]
+    pie.startAngle = 90
+    pie.direction = 'anticlockwise'
+    pie.innerRadiusFraction = 0.5
+    pie.slices.strokeColor = colors.white
+    pie.slices.fontName = 'Helvetica'
+    pie.slices.fontSize = 10
+    pie.slices[0].fillColor = GRAY
+    pie.slices[1].fillColor = GREEN
+    pie.slices[1].popout = 6
+    drawing.add(pie)
+
+    center_x = pie.x + size/2
+    center_y = pie.y + size/2
+    drawing.add(String(center_x, center_y + 3, 'Total Current:', fontName='Helvetica-Bold',
+                       fontSize=9, textAnchor='middle'))
+    drawing.add(String(center_x, center_y - 9, f'${current_cost:,}', fontName='Helvetica-Bold',
+                       fontSize=9, textAnchor='middle'))
+
+    # 3-year cumulative savings
+    _title(drawing, half + half/2, height - 16, '3-Year Savings Projection')
+    cumulative = [saved_cost * year for year in (1, 2, 3)]
+
+    chart = VerticalBarChart()
+    chart.x = half + 50
+    chart.y = 25
+    chart.width = half - 65
+    chart.height = height - 65
+    chart.data = [cumulative]
+    chart.bars.strokeColor = None
+    chart.bars[0].fillColor = GREEN_BAR
+    chart.barLabelFormat = lambda value: f'${value:,.0f}'
+    chart.barLabels.nudge = 8
+    chart.barLabels.fontName = 'Helvetica-Bold'
+    chart.barLabels.fontSize = 9
+    chart.categoryAxis.categoryNames = ['Year 1', 'Year 2', 'Year 3']
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 10
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = max(cumulative[-1] * 1.15, 1)
+    chart.valueAxis.labelTextFormat = _millions
+    chart.valueAxis.labels.fontName = 'Helvetica'
+    chart.valueAxis.labels.fontSize = 9
+    chart.valueAxis.visibleGrid = 1
+    chart.valueAxis.gridStrokeColor = GRID
+    drawing.add(chart)
+
+    _vertical_label(drawing, half + 10, chart.y + chart.height/2, 'Cumulative Savings ($)')
+    return drawing
+
+
+def roi_timeline_drawing(metrics, width=6.5*inch, height=4.3*inch):
+    """Cumulative investment vs savings with the break-even point highlighted"""
+    drawing = Drawing(width, height)
+    _title(drawing, width/2, height - 20, 'ROI Timeline Analysis', size=16)
+
+    months, investment, returns = roi_timeline_series(metrics['potential_savings'])
+    y_max = max(max(investment), max(returns)) * 1.15 or 1
+
+    plot = LinePlot()
+    plot.x = 65
+    plot.y = 45
+    plot.width = width - 85
+    plot.height = height - 100
+    plot.data = [list(zip(months, investment)), list(zip(months, returns))]
+    plot.joinedLines = 1
+    plot.lines[0].strokeColor = RED
+    plot.lines[0].strokeWidth = 2
+    plot.lines[0].symbol = makeMarker('FilledCircle', fillColor=RED, size=6)
+    plot.lines[1].strokeColor = GREEN
+    plot.lines[1].strokeWidth = 2
+    plot.lines[1].symbol = makeMarker('FilledSquare', fillColor=GREEN, size=6)
+
+    plot.xValueAxis.valueMin = 0
+    plot.xValueAxis.valueMax = 36
+    plot.xValueAxis.valueSteps = list(range(0, 37, 6))
+    plot.xValueAxis.labels.fontName = 'Helvetica'
+    plot.xValueAxis.labels.fontSize = 10
+    plot.yValueAxis.valueMin = 0
+    plot.yValueAxis.valueMax = y_max
+    plot.yValueAxis.labelTextFormat = _millions
+    plot.yValueAxis.labels.fontName = 'Helvetica'
+    plot.yValueAxis.labels.fontSize = 10
+    plot.yValueAxis.visibleGrid = 1
+    plot.yValueAxis.gridStrokeColor = GRID
+    plot.xValueAxis.visibleGrid = 1
+    plot.xValueAxis.gridStrokeColor = GRID
+
+    def to_point(month, amount):
+        return (plot.x + plot.width * month / 36, plot.y + plot.height * amount / y_max)
+
+    # Shade the region where savings exceed investment
+    positive = [i for i, (inv, ret) in enumerate(zip(investment, returns)) if ret >= inv and i > 0]
+    if len(positive) > 1:
+        upper = [to_point(months[i], returns[i]) for i in positive]
+        lower = [to_point(months[i], investment[i]) for i in reversed(positive)]
+        points = [coord for point in upper + lower for coord in point]
+        drawing.add(Polygon(points, fillColor=GREEN_FILL, strokeColor=None))
+
+    drawing.add(plot)
+
+    # Break-even marker
+    if positive:
+        break_even_month = months[positive[0]]
+        px, py = to_point(break_even_month, returns[positive[0]])
+        # Label sits in the empty area under the investment line with a leader to the point
+        label_x = min(px + 40, plot.x + plot.width - 160)
+        label_y = plot.y + 15
+        drawing.add(Line(px, py, label_x, label_y + 12, strokeColor=ORANGE, strokeWidth=1.5))
+        drawing.add(Circle(px, py, 7, fillColor=ORANGE, strokeColor=None))
+        drawing.add(String(label_x, label_y, f'Break-even ({break_even_month} months)',
+                           fontName='Helvetica-Bold', fontSize=11, fillColor=ORANGE))
+
+    legend = Legend()
+    legend.x = plot.x + 10
+    legend.y = plot.y + plot.height - 5
+    legend.fontName = 'Helvetica'
+    legend.fontSize = 9
+    legend.alignment = 'right'
+    legend.colorNamePairs = [
+        (RED, 'Cumulative Investment'),
+        (GREEN, 'Cumulative Savings'),
+        (GREEN_FILL, 'Net Positive ROI')
+    ]
+    drawing.add(legend)
+
+    drawing.add(String(plot.x + plot.width/2, 12, 'Months', fontName='Helvetica-Bold',
+                       fontSize=11, textAnchor='middle'))
+    _vertical_label(drawing, 15, plot.y + plot.height/2, 'Amount ($)')
+    return drawing
@@ -0,0 +1,226 @@
+# cms_cache.py
+# Persistent cache of CMS hospital lookups with TTL, negative caching and stale-while-revalidate
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+# Cache settings - override with environment variables
+CMS_CACHE_DB_PATH = os.environ.get("CMS_CACHE_DB_PATH", "cms_cache.db")
+CMS_CACHE_TTL_SECONDS = int(os.environ.get("CMS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CMS_CACHE_NEGATIVE_TTL_SECONDS = int(os.environ.get("CMS_CACHE_NEGATIVE_TTL_SECONDS", str(24 * 3600)))
+CMS_CACHE_STALE_SECONDS = int(os.environ.get("CMS_CACHE_STALE_SECONDS", str(30 * 24 * 3600)))
+# After a failed fetch, skip CMS for this long so an outage costs one timeout, not one per report
+CMS_CACHE_ERROR_BACKOFF_SECONDS = float(os.environ.get("CMS_CACHE_ERROR_BACKOFF_SECONDS", "60"))
+
+
+def normalize_lookup_key(hospital_name: str, state: str = None) -> str:
+    """Case, punctuation and whitespace insensitive key for a hospital lookup"""
+    name = re.sub(r"[^a-z0-9]+", " ", (hospital_name or "").lower()).strip()
+    return f"{name}|{(state or '').strip().upper()}"
+
+
+class CMSLookupCache:
+    """SQLite cache of CMS lookups shared by every process on the machine
+
+    Hits (found hospitals) live for ttl seconds and misses for negative_ttl
+    seconds. Once an entry expires it can still be served for stale_seconds
+    while a background thread refreshes it, so the render never waits on CMS
+    for a hospital it has seen before. Failed fetches are never stored; instead
+    CMS is skipped for error_backoff seconds, so while it is down uncached
+    lookups answer 'not found' at once rather than each waiting for a timeout.
+    """
+
+    def __init__(self, db_path: str = CMS_CACHE_DB_PATH, ttl: int = CMS_CACHE_TTL_SECONDS,
+                 negative_ttl: int = CMS_CACHE_NEGATIVE_TTL_SECONDS,
+                 stale_seconds: int = CMS_CACHE_STALE_SECONDS,
+                 error_backoff: float = CMS_CACHE_ERROR_BACKOFF_SECONDS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_seconds = stale_seconds
+        self.error_backoff = error_backoff
+        self._schema_ready = False
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._skip_fetches_until = 0.0
+        self._counters = {'fresh_hits': 0, 'stale_hits': 0, 'misses': 0, 'fetch_errors': 0, 'skipped_fetches': 0}
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            if not self._schema_ready:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cms_lookups (
+                        lookup_key TEXT PRIMARY KEY,
+                        found INTEGER NOT NULL,
+                        data TEXT NOT NULL,
+                        fetched_at REAL NOT NULL
+                    )
+                """)
+                conn.commit()
+                self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, hospital_name: str, state: str = None):
+        """Return (data, age_state) where age_state is 'fresh', 'stale' or None"""
+        key = normalize_lookup_key(hospital_name, state)
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT found, data, fetched_at FROM cms_lookups WHERE lookup_key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"CMS cache read failed: {e}")
+            return None, None
+
+        if row is None:
+            return None, None
+
+        found, data, fetched_at = row
+        age = time.time() - fetched_at
+        ttl = self.ttl if found else self.negative_ttl
+        if age <= ttl:
+            return json.loads(data), 'fresh'
+        if age <= ttl + self.stale_seconds:
+            return json.loads(data), 'stale'
+        return None, None
+
+    def put(self, hospital_name: str, state: str, data: Dict):
+        key = normalize_lookup_key(hospital_name, state)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cms_lookups (lookup_key, found, data, fetched_at) VALUES (?, ?, ?, ?)",
+                    (key, 1 if data.get('found') else 0, json.dumps(data), time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"CMS cache write failed: {e}")
+
+    def get_or_fetch(self, hospital_name: str, state: str, fetch: Callable[[], Optional[Dict]],
+                     refresh: Optional[Callable[[], Optional[Dict]]] = None) -> Dict:
+        """Serve from cache when possible; fetch returns None when CMS could not be reached
+
+        refresh replaces fetch for background refreshes of stale entries, e.g.
+        one with a larger retry budget since nobody is waiting on it.
+        """
+        data, age_state = self.get(hospital_name, state)
+
+        if age_state == 'fresh':
+            self._counters['fresh_hits'] += 1
+            return data
+
+        if age_state == 'stale':
+            self._counters['stale_hits'] += 1
+            self._refresh_in_background(hospital_name, state, refresh or fetch)
+            return data
+
+        self._counters['misses'] += 1
+        if time.monotonic() < self._skip_fetches_until:
+            self._counters['skipped_fetches'] += 1
+            return {'found': False}
+        data = self._fetch(fetch)
+        if data is None:
+            return {'found': False}
+        self.put(hospital_name, state, data)
+        return data
+
+    def _fetch(self, fetch: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """Call fetch, backing off from CMS for error_backoff seconds if it fails"""
+        data = fetch()
+        if data is None:
+            self._counters['fetch_errors'] += 1
+            self._skip_fetches_until = time.monotonic() + self.error_backoff
+        return data
+
+    def _refresh_in_background(self, hospital_name: str, state: str, fetch: Callable[[], Optional[Dict]]):
+        key = normalize_lookup_key(hospital_name, state)
+        with self._lock:
+            if key in self._refreshing or time.monotonic() < self._skip_fetches_until:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                data = self._fetch(fetch)
+                if data is not None:
+                    self.put(hospital_name, state, data)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"cms-refresh-{key}", daemon=True).start()
+
+    def stats(self) -> Dict:
+        return dict(self._counters)
+
+
+# Per-process handle on the shared cache database
+cms_cache = CMSLookupCache()
+
+
+# Test the cache paths on a temporary database
+def test_cms_cache():
+    """Fresh hits skip CMS, stale hits refresh in the background, misses and outages are cheap"""
+    import tempfile
+
+    print("\n🚀 Testing CMS Lookup Cache...\n")
+
+    calls = []
+
+    def fetcher(result):
+        def fetch():
+            calls.append(result)
+            return result
+        return fetch
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = CMSLookupCache(os.path.join(temp_dir, "cms.db"), ttl=3600, negative_ttl=60,
+                               stale_seconds=3600, error_backoff=3600)
+        hospital = {'found': True, 'name': 'General Hospital'}
+
+        # Miss, then fresh hit - keys ignore case and punctuation
+        assert cache.get_or_fetch("General Hospital", "tx", fetcher(hospital)) == hospital
+        assert cache.get_or_fetch("general  hospital.", "TX", fetcher(hospital)) == hospital
+        assert len(calls) == 1
+
+        # Hospitals CMS doesn't know are cached with the negative TTL
+        assert cache.get_or_fetch("Nowhere Clinic", "TX", fetcher({'found': False})) == {'found': False}
+        assert cache.get("Nowhere Clinic", "TX")[1] == 'fresh'
+        cache.negative_ttl = 0
+        assert cache.get("Nowhere Clinic", "TX")[1] == 'stale'
+
+        # Past the TTL the old entry is served while a background fetch replaces it
+        cache.ttl = 0
+        updated = dict(hospital, name='General Hospital (updated)')
+        assert cache.get_or_fetch("General Hospital", "TX", fetcher(updated)) == hospital
+        for _ in range(100):
+            if cache.get("General Hospital", "TX")[0] == updated:
+                break
+            time.sleep(0.01)
+        assert cache.get("General Hospital", "TX")[0] == updated
+        cache.ttl = 3600
+
+        # A failed fetch is not stored, and CMS is skipped for the backoff period
+        calls.clear()
+        assert cache.get_or_fetch("Outage Hospital", "TX", fetcher(None)) == {'found': False}
+        assert cache.get_or_fetch("Other Hospital", "TX", fetcher(hospital)) == {'found': False}
+        assert calls == [None] and cache.get("Outage Hospital", "TX") == (None, None)
+        assert cache.stats()['fetch_errors'] == 1 and cache.stats()['skipped_fetches'] == 1
+
+    print("✅ CMS cache serves fresh, stale and negative entries and backs off during outages")
+
+
+if __name__ == "__main__":
+    test_cms_cache()
@@ -0,0 +1,252 @@
+# cms_index.py
+# Offline index of the CMS Hospital General Information dataset (xubh-q36u)
+#
+# Download the CSV from https://data.cms.gov/provider-data/dataset/xubh-q36u and load it with:
+#     python cms_index.py load Hospital_General_Information.csv
+
+import argparse
+import csv
+import difflib
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+CMS_INDEX_PATH = os.environ.get("CMS_INDEX_PATH", "cms_index.db")
+CMS_INDEX_MIN_SCORE = float(os.environ.get("CMS_INDEX_MIN_SCORE", "0.75"))
+
+# CSV headers (normalized) that map onto each indexed column - covers the
+# current CSV export as well as the older API field names
+COLUMN_ALIASES = {
+    'facility_id': ['facility_id', 'provider_id', 'ccn'],
+    'facility_name': ['facility_name', 'hospital_name'],
+    'city': ['city_town', 'citytown', 'city'],
+    'state': ['state'],
+    'hospital_type': ['hospital_type'],
+    'hospital_ownership': ['hospital_ownership'],
+    'emergency_services': ['emergency_services'],
+    'hospital_overall_rating': ['hospital_overall_rating']
+}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a hospital name and collapse punctuation to single spaces"""
+    return re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).strip()
+
+
+def _normalize_header(header: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", header.lower()).strip("_")
+
+
+def load_cms_index(csv_path: str, db_path: str = CMS_INDEX_PATH) -> int:
+    """Build the SQLite FTS index from a Hospital General Information CSV
+
+    The index is written to a temporary file and swapped into place, so
+    running processes keep reading the old index until the new one is ready.
+    Returns the number of hospitals indexed.
+    """
+    temp_path = f"{db_path}.loading"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    conn = sqlite3.connect(temp_path)
+    conn.executescript("""
+        CREATE TABLE hospitals (
+            facility_id TEXT,
+            facility_name TEXT,
+            name_key TEXT,
+            city TEXT,
+            state TEXT,
+            hospital_type TEXT,
+            hospital_ownership TEXT,
+            emergency_services TEXT,
+            hospital_overall_rating TEXT
+        );
+        CREATE VIRTUAL TABLE hospitals_fts USING fts5(
+            name_key, content='hospitals', content_rowid='rowid'
+        );
+    """)
+
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        headers = [_normalize_header(header) for header in next(reader)]
+        positions = {}
+        for column, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in headers:
+                    positions[column] = headers.index(alias)
+                    break
+        if 'facility_name' not in positions or 'state' not in positions:
+            conn.close()
+            os.remove(temp_path)
+            raise ValueError(f"{csv_path} has no facility name/state columns")
+
+        rows = []
+        for record in reader:
+            values = {
+                column: (record[index].strip() if index < len(record) else '')
+                for column, index in positions.items()
+            }
+            rows.append((
+                values.get('facility_id', ''),
+                values['facility_name'],
+                normalize_name(values['facility_name']),
+                values.get('city', ''),
+                values['state'].upper(),
+                values.get('hospital_type', ''),
+                values.get('hospital_ownership', ''),
+                values.get('emergency_services', ''),
+                values.get('hospital_overall_rating', '')
+            ))
+
+    conn.executemany("INSERT INTO hospitals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute("CREATE INDEX hospitals_state ON hospitals (state)")
+    conn.execute("INSERT INTO hospitals_fts (hospitals_fts) VALUES ('rebuild')")
+    conn.commit()
+    conn.close()
+
+    os.replace(temp_path, db_path)
+    print(f"Indexed {len(rows):,} hospitals into {db_path}")
+    return len(rows)
+
+
+class CMSHospitalIndex:
+    """Fuzzy name + state lookup against the local CMS index"""
+
+    def __init__(self, db_path: str = CMS_INDEX_PATH, min_score: float = CMS_INDEX_MIN_SCORE):
+        self.db_path = db_path
+        self.min_score = min_score
+        self._conn = None
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return os.path.exists(self.db_path)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Reopen when a reload has swapped in a new index file
+        mtime = os.path.getmtime(self.db_path)
+        if self._conn is None or mtime != self._loaded_mtime:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._conn.row_factory = sqlite3.Row
+            self._loaded_mtime = mtime
+        return self._conn
+
+    def candidates(self, hospital_name: str, state: str = None, limit: int = 25) -> List[Dict]:
+        """Hospitals sharing at least one name token, best full-text matches first"""
+        tokens = normalize_name(hospital_name).split()
+        if not tokens:
+            return []
+        match = " OR ".join(f'"{token}"' for token in tokens)
+
+        sql = """
+            SELECT hospitals.* FROM hospitals_fts
+            JOIN hospitals ON hospitals.rowid = hospitals_fts.rowid
+            WHERE hospitals_fts MATCH ?
+        """
+        params = [match]
+        if state:
+            sql += " AND hospitals.state = ?"
+            params.append(state.upper())
+        sql += " ORDER BY bm25(hospitals_fts) LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def lookup(self, hospital_name: str, state: str = None) -> Optional[Dict]:
+        """Best match in the CMS result format, or None if nothing is close enough"""
+        target = normalize_name(hospital_name)
+        best = None
+        best_score = 0.0
+        for candidate in self.candidates(hospital_name, state):
+            score = difflib.SequenceMatcher(None, target, candidate['name_key']).ratio()
+            if score > best_score:
+                best, best_score = candidate, score
+
+        if best is None or best_score < self.min_score:
+            return None
+
+        return {
+            'found': True,
+            'hospital_name': best['facility_name'],
+            'provider_id': best['facility_id'],
+            'state': best['state'],
+            'city': best['city'],
+            'hospital_type': best['hospital_type'],
+            'hospital_ownership': best['hospital_ownership'],
+            'emergency_services': best['emergency_services'],
+            'hospital_overall_rating': best['hospital_overall_rating'],
+            'match_score': round(best_score, 3)
+        }
+
+
+# Per-process handle on the local index
+cms_index = CMSHospitalIndex()
+
+
+# Test the index with a small sample of the CMS export
+def test_cms_index():
+    """Load a sample CSV and check fuzzy name + state matching"""
+    import tempfile
+
+    print("\n🚀 Testing CMS Hospital Index...\n")
+
+    sample_csv = (
+        '"Facility ID","Facility Name","Address","City/Town","State","ZIP Code",'
+        '"Hospital Type","Hospital Ownership","Emergency Services","Hospital overall rating"\n'
+        '"360180","CLEVELAND CLINIC","9500 EUCLID AVE","CLEVELAND","OH","44195",'
+        '"Acute Care Hospitals","Voluntary non-profit - Private","Yes","5"\n'
+        '"450358","HOUSTON METHODIST HOSPITAL","6565 FANNIN ST","HOUSTON","TX","77030",'
+        '"Acute Care Hospitals","Voluntary non-profit - Private","Yes","5"\n'
+        '"050262","RONALD REAGAN U C L A MEDICAL CENTER","757 WESTWOOD PLAZA","LOS ANGELES","CA","90095",'
+        '"Acute Care Hospitals","Government - State","Yes","5"\n'
+        '"390009","ST MARY\'S HOSPITAL","100 MAIN ST","LANGHORNE","PA","19047",'
+        '"Acute Care Hospitals","Voluntary non-profit - Church","Yes","4"\n'
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = os.path.join(temp_dir, "hospitals.csv")
+        with open(csv_path, "w") as f:
+            f.write(sample_csv)
+
+        index = CMSHospitalIndex(os.path.join(temp_dir, "cms_index.db"))
+        load_cms_index(csv_path, index.db_path)
+
+        match = index.lookup("Houston Methodist Hospital", "TX")
+        assert match and match['provider_id'] == "450358", match
+        match = index.lookup("St. Mary's Hospital", "PA")
+        assert match and match['city'] == "LANGHORNE", match
+        assert index.lookup("Houston Methodist Hospital", "CA") is None
+        assert index.lookup("Mayo Clinic", "MN") is None
+
+    print("✅ CMS index lookups match the sample data")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local CMS Hospital General Information index")
+    subparsers = parser.add_subparsers(dest="command")
+
+    load_parser = subparsers.add_parser("load", help="Build the index from a downloaded CSV")
+    load_parser.add_argument("csv_path")
+    load_parser.add_argument("--db", default=CMS_INDEX_PATH)
+
+    lookup_parser = subparsers.add_parser("lookup", help="Look up a hospital by name")
+    lookup_parser.add_argument("hospital_name")
+    lookup_parser.add_argument("--state")
+    lookup_parser.add_argument("--db", default=CMS_INDEX_PATH)
+
+    args = parser.parse_args()
+    if args.command == "load":
+        load_cms_index(args.csv_path, args.db)
+    elif args.command == "lookup":
+        print(CMSHospitalIndex(args.db).lookup(args.hospital_name, args.state))
+    else:
+        test_cms_index()
@@ -1,12 +1,25 @@
 # data_sources.py
 # Real data source integrations for RCM Benchmark Reports
 
-import requests
-import pandas as pd
+import os
 from datetime import datetime
 import json
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional
+
+from benchmark_dataset import BenchmarkDataset, get_dataset, thaw_table
+from cms_cache import cms_cache
+from cms_index import cms_index
+from http_client import get_session
+from instrumentation import timed_stage
+
+# CMS Hospital General Information endpoint (override to point at a mirror or stub)
+CMS_API_URL = os.environ.get("CMS_API_URL", "https://data.cms.gov/provider-data/api/1/datastore/query")
+
+# Turnover cost model for the hospital analysis (metrics_engine vectorizes the same numbers)
+ANALYSIS_REPLACEMENT_COST_MULTIPLIER = 2.0  # 200% replacement cost
+ANALYSIS_BEST_PRACTICE_TURNOVER = 0.15
+
 
 class HealthcareDataCollector:
     """Collects real healthcare data from various public sources"""
@@ -18,12 +31,33 @@ class HealthcareDataCollector:
         
     def get_hospital_data_from_cms(self, hospital_name: str, state: str = None) -> Dict:
         """
-        Fetch hospital data from CMS Hospital Compare API
+        Look up hospital data in the local CMS index, falling back to the
+        (cached) CMS Hospital Compare API
         """
         print(f"Fetching CMS data for {hospital_name}...")
         
+        if cms_index.available():
+            try:
+                hospital = cms_index.lookup(hospital_name, state)
+                if hospital:
+                    return hospital
+            except Exception as e:
+                print(f"Error reading local CMS index: {e}")
+        
+        # The render waits on a miss, so it gets the short retry budget;
+        # background refreshes of stale entries keep the full one
+        return cms_cache.get_or_fetch(
+            hospital_name, state,
+            lambda: self._fetch_hospital_data_from_cms(hospital_name, inline=True),
+            refresh=lambda: self._fetch_hospital_data_from_cms(hospital_name)
+        )
+    
+    def _fetch_hospital_data_from_cms(self, hospital_name: str, inline: bool = False) -> Optional[Dict]:
+        """
+        Query the live CMS datastore. Returns None if CMS could not be reached.
+        """
         # CMS Hospital General Information endpoint
-        base_url = "https://data.cms.gov/provider-data/api/1/datastore/query"
+        base_url = CMS_API_URL
         dataset_id = "xubh-q36u"  # Hospital General Information dataset
         
         # Build query
@@ -38,156 +72,76 @@ class HealthcareDataCollector:
             query["q"] = hospital_name
             
         try:
-            response = requests.get(
+            # Pooled keep-alive session with retries; timeouts come from http_client settings
+            response = get_session(inline=inline).get(
                 f"{base_url}/{dataset_id}",
                 params={"q": hospital_name, "limit": 10},
-                headers=self.headers,
-                timeout=10
+                headers=self.headers
             )
             
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('results'):
-                    # Return first matching hospital
-                    hospital = data['results'][0]
-                    return {
-                        'found': True,
-                        'hospital_name': hospital.get('hospital_name', ''),
-                        'provider_id': hospital.get('provider_id', ''),
-                        'state': hospital.get('state', ''),
-                        'city': hospital.get('city', ''),
-                        'hospital_type': hospital.get('hospital_type', ''),
-                        'hospital_ownership': hospital.get('hospital_ownership', ''),
-                        'emergency_services': hospital.get('emergency_services', ''),
-                        'hospital_overall_rating': hospital.get('hospital_overall_rating', '')
-                    }
+            if response.status_code != 200:
+                print(f"CMS returned status {response.status_code}")
+                return None
+            
+            data = response.json()
+            if data.get('results'):
+                # Return first matching hospital
+                hospital = data['results'][0]
+                return {
+                    'found': True,
+                    'hospital_name': hospital.get('hospital_name', ''),
+                    'provider_id': hospital.get('provider_id', ''),
+                    'state': hospital.get('state', ''),
+                    'city': hospital.get('city', ''),
+                    'hospital_type': hospital.get('hospital_type', ''),
+                    'hospital_ownership': hospital.get('hospital_ownership', ''),
+                    'emergency_services': hospital.get('emergency_services', ''),
+                    'hospital_overall_rating': hospital.get('hospital_overall_rating', '')
+                }
         except Exception as e:
             print(f"Error fetching CMS data: {e}")
+            return None
             
         return {'found': False}
     
-    def get_bls_healthcare_wages(self, state: str = "US") -> Dict:
+    def get_bls_healthcare_wages(self, state: str = "US", dataset: BenchmarkDataset = None) -> Mapping:
         """
         Fetch healthcare wage data from Bureau of Labor Statistics
         Note: BLS API requires registration for extended access
+
+        Returns a shared read-only table; use thaw_table() for a mutable copy.
         """
         print(f"Fetching BLS wage data for {state}...")
         
-        # For demo purposes, using static data
+        # For demo purposes, using the static figures in benchmark_data.json
         # In production, you'd use the actual BLS API
-        wage_data = {
-            'US': {
-                'medical_records_specialists': {
-                    'mean_annual': 47250,
-                    'median_annual': 44090,
-                    'entry_level': 35380,
-                    'experienced': 59500
-                },
-                'medical_coders': {
-                    'mean_annual': 52350,
-                    'median_annual': 48040,
-                    'entry_level': 37250,
-                    'experienced': 65890
-                },
-                'billing_specialists': {
-                    'mean_annual': 45630,
-                    'median_annual': 42150,
-                    'entry_level': 33420,
-                    'experienced': 57350
-                }
-            }
-        }
-        
-        # State-specific adjustments (simplified)
-        state_multipliers = {
-            'CA': 1.25, 'NY': 1.20, 'TX': 0.95, 'FL': 0.92,
-            'IL': 1.05, 'PA': 1.00, 'OH': 0.95, 'MI': 0.97
-        }
-        
-        base_data = wage_data['US'].copy()
-        
-        if state in state_multipliers:
-            multiplier = state_multipliers[state]
-            for role in base_data:
-                for metric in base_data[role]:
-                    base_data[role][metric] = int(base_data[role][metric] * multiplier)
-        
-        return base_data
+        return (dataset or get_dataset()).wage_table(state)
     
-    def get_healthcare_staffing_benchmarks(self) -> Dict:
+    def get_healthcare_staffing_benchmarks(self, dataset: BenchmarkDataset = None) -> Mapping:
         """
-        Get industry staffing benchmarks from various sources
+        Get industry staffing benchmarks from various sources (read-only)
         """
         print("Loading healthcare staffing benchmarks...")
         
-        # Industry benchmark data (compiled from MGMA, HFMA reports)
-        benchmarks = {
-            'rcm_staff_per_bed': {
-                'small_hospital': 0.030,    # <100 beds
-                'medium_hospital': 0.025,   # 100-300 beds
-                'large_hospital': 0.020,    # 300+ beds
-                'academic_medical': 0.035   # Teaching hospitals
-            },
-            'turnover_rates_by_function': {
-                'denial_management': 0.45,
-                'insurance_followup': 0.42,
-                'patient_collections': 0.38,
-                'coding': 0.35,
-                'billing': 0.32,
-                'front_desk': 0.40,
-                'overall_rcm': 0.37
-            },
-            'denial_rates_by_payer': {
-                'medicare': 0.08,
-                'medicaid': 0.12,
-                'commercial': 0.15,
-                'medicare_advantage': 0.18,
-                'overall': 0.13
-            },
-            'days_in_ar_benchmarks': {
-                'best_practice': 35,
-                'average': 48,
-                'concerning': 65,
-                'critical': 80
-            },
-            'collection_rate_benchmarks': {
-                'best_practice': 0.98,
-                'average': 0.95,
-                'below_average': 0.92,
-                'poor': 0.88
-            }
-        }
-        
-        return benchmarks
+        return (dataset or get_dataset()).staffing_benchmarks
     
-    def get_regional_cost_factors(self, state: str) -> Dict:
+    def get_regional_cost_factors(self, state: str, dataset: BenchmarkDataset = None) -> float:
         """
         Get regional cost adjustment factors
         """
-        # Regional cost factors based on general COL indices
-        cost_factors = {
-            'AL': 0.87, 'AK': 1.32, 'AZ': 0.97, 'AR': 0.85, 'CA': 1.39,
-            'CO': 1.07, 'CT': 1.27, 'DE': 1.02, 'FL': 1.01, 'GA': 0.93,
-            'HI': 1.88, 'ID': 0.93, 'IL': 1.02, 'IN': 0.90, 'IA': 0.91,
-            'KS': 0.89, 'KY': 0.87, 'LA': 0.91, 'ME': 1.09, 'MD': 1.29,
-            'MA': 1.34, 'MI': 0.90, 'MN': 1.02, 'MS': 0.84, 'MO': 0.90,
-            'MT': 1.00, 'NE': 0.93, 'NV': 1.02, 'NH': 1.20, 'NJ': 1.25,
-            'NM': 0.91, 'NY': 1.39, 'NC': 0.96, 'ND': 0.98, 'OH': 0.93,
-            'OK': 0.87, 'OR': 1.13, 'PA': 1.02, 'RI': 1.19, 'SC': 0.93,
-            'SD': 0.99, 'TN': 0.89, 'TX': 0.97, 'UT': 0.97, 'VT': 1.24,
-            'VA': 1.02, 'WA': 1.13, 'WV': 0.88, 'WI': 0.97, 'WY': 0.91
-        }
-        
-        return cost_factors.get(state, 1.0)
+        return (dataset or get_dataset()).cost_factor(state)
     
     def analyze_hospital_characteristics(self, beds: int, state: str, hospital_type: str = None) -> Dict:
         """
         Provide detailed analysis based on hospital characteristics
         """
+        # One dataset version for the whole analysis, even if a reload lands mid-way
+        dataset = get_dataset()
+        
         # Get all relevant data
-        wage_data = self.get_bls_healthcare_wages(state)
-        benchmarks = self.get_healthcare_staffing_benchmarks()
-        cost_factor = self.get_regional_cost_factors(state)
+        wage_data = self.get_bls_healthcare_wages(state, dataset)
+        benchmarks = self.get_healthcare_staffing_benchmarks(dataset)
+        cost_factor = self.get_regional_cost_factors(state, dataset)
         
         # Determine hospital category
         if beds < 100:
@@ -201,10 +155,9 @@ class HealthcareDataCollector:
             staff_ratio = benchmarks['rcm_staff_per_bed']['large_hospital']
         
         # Calculate weighted average salary
-        weights = {'medical_records_specialists': 0.3, 'medical_coders': 0.4, 'billing_specialists': 0.3}
         avg_salary = sum(
             wage_data[role]['mean_annual'] * weight 
-            for role, weight in weights.items()
+            for role, weight in dataset.rcm_role_weights.items()
         )
         
         # Adjust for regional costs
@@ -216,12 +169,11 @@ class HealthcareDataCollector:
         
         # Financial calculations
         annual_turnover = int(estimated_rcm_staff * turnover_rate)
-        replacement_cost = avg_salary * 2.0  # 200% replacement cost
+        replacement_cost = avg_salary * ANALYSIS_REPLACEMENT_COST_MULTIPLIER
         total_turnover_cost = int(annual_turnover * replacement_cost)
         
         # Best practice calculations
-        best_practice_turnover = 0.15
-        best_practice_annual_turnover = int(estimated_rcm_staff * best_practice_turnover)
+        best_practice_annual_turnover = int(estimated_rcm_staff * ANALYSIS_BEST_PRACTICE_TURNOVER)
         best_practice_cost = int(best_practice_annual_turnover * replacement_cost)
         potential_savings = total_turnover_cost - best_practice_cost
         
@@ -239,8 +191,10 @@ class HealthcareDataCollector:
             'denial_rate_benchmark': benchmarks['denial_rates_by_payer']['overall'],
             'days_in_ar_benchmark': benchmarks['days_in_ar_benchmarks']['average'],
             'collection_rate_benchmark': benchmarks['collection_rate_benchmarks']['average'],
-            'wage_data': wage_data,
-            'function_specific_turnover': benchmarks['turnover_rates_by_function']
+            # Plain copies - analysis results are pickled between processes and sent as JSON
+            'wage_data': thaw_table(wage_data),
+            'function_specific_turnover': thaw_table(benchmarks['turnover_rates_by_function']),
+            'dataset_version': dataset.version
         }
 
 
@@ -250,20 +204,23 @@ def enhance_report_with_real_data(hospital_name: str, beds: int, state: str = No
     Main function to enhance report with real data
     """
     collector = HealthcareDataCollector()
+    timings = {}
     
     # Try to find hospital in CMS data
-    cms_data = collector.get_hospital_data_from_cms(hospital_name, state)
+    with timed_stage(timings, 'cms_fetch'):
+        cms_data = collector.get_hospital_data_from_cms(hospital_name, state)
     
     # If we found the hospital, use its state
     if cms_data.get('found') and not state:
         state = cms_data.get('state', 'US')
     
     # Get comprehensive analysis
-    analysis = collector.analyze_hospital_characteristics(
-        beds=beds,
-        state=state or 'US',
-        hospital_type=cms_data.get('hospital_type') if cms_data.get('found') else None
-    )
+    with timed_stage(timings, 'analysis'):
+        analysis = collector.analyze_hospital_characteristics(
+            beds=beds,
+            state=state or 'US',
+            hospital_type=cms_data.get('hospital_type') if cms_data.get('found') else None
+        )
     
     # Combine all data
     enhanced_data = {
@@ -275,7 +232,9 @@ def enhance_report_with_real_data(hospital_name: str, beds: int, state: str = No
             'benchmarks': 'MGMA/HFMA Industry Reports',
             'regional': 'Regional Cost of Living Index'
         },
-        'generated_date': datetime.now().strftime('%Y-%m-%d')
+        'dataset_version': analysis['dataset_version'],
+        'generated_date': datetime.now().strftime('%Y-%m-%d'),
+        'timings': timings
     }
     
     return enhanced_data
@@ -0,0 +1,219 @@
+# generate_batch.py
+# Batch report generation across all cores with a resumable manifest
+#
+#     python generate_batch.py hospitals.csv --output-dir batch_reports
+#
+# The input is a CSV or JSONL file with hospital_name, beds, recipient, email
+# and state columns. Every finished row is appended to manifest.jsonl in the
+# output directory, so re-running the same command after a crash picks up
+# where it stopped.
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List
+
+from chart_cache import CHART_BACKENDS
+from render_pool import init_render_worker, render_report_in_worker
+
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# Accepted spellings of each input column
+FIELD_ALIASES = {
+    'hospital_name': ['hospital_name', 'hospital'],
+    'beds': ['beds', 'hospital_beds'],
+    'recipient': ['recipient', 'recipient_name'],
+    'email': ['email', 'recipient_email'],
+    'state': ['state']
+}
+
+
+def _normalize_row(raw: Dict) -> Dict:
+    lowered = {str(key).strip().lower(): value for key, value in raw.items()}
+    row = {}
+    for field, aliases in FIELD_ALIASES.items():
+        value = next((lowered[alias] for alias in aliases if lowered.get(alias) not in (None, '')), None)
+        row[field] = value.strip() if isinstance(value, str) else value
+    return row
+
+
+def read_batch_input(path: str) -> List[Dict]:
+    """Load rows from a CSV or JSONL file, giving each a stable row_id"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            raw_rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            raw_rows = list(csv.DictReader(f))
+
+    rows = []
+    for line_number, raw in enumerate(raw_rows, start=1):
+        row = _normalize_row(raw)
+        identity = json.dumps([row[field] for field in FIELD_ALIASES], default=str)
+        row['row_id'] = hashlib.sha256(identity.encode('utf-8')).hexdigest()[:12]
+        row['line'] = line_number
+        rows.append(row)
+    return rows
+
+
+def validate_row(row: Dict) -> str:
+    """Return an error message for an unusable row, or an empty string"""
+    missing = [field for field in ('hospital_name', 'beds', 'recipient', 'email') if not row.get(field)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    try:
+        if int(row['beds']) <= 0:
+            return "beds must be positive"
+    except (TypeError, ValueError):
+        return f"beds is not a number: {row['beds']!r}"
+    return ""
+
+
+def load_manifest(manifest_path: str) -> Dict[str, Dict]:
+    """Latest manifest entry per row_id (later lines win)"""
+    entries = {}
+    if not os.path.exists(manifest_path):
+        return entries
+    with open(manifest_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a truncated last line
+                continue
+            entries[entry['row_id']] = entry
+    return entries
+
+
+def _append_manifest(manifest, entry: Dict):
+    manifest.write(json.dumps(entry) + "\n")
+    manifest.flush()
+    os.fsync(manifest.fileno())
+
+
+def render_batch_row(row: Dict, chart_backend: str, output_dir: str) -> Dict:
+    """Worker entry point - render one row with the worker's warm generator"""
+    from generate_report_enhanced_v2 import get_generator
+
+    started = time.perf_counter()
+    default_name = get_generator().report_filename(row['hospital_name'])
+    # Prefix with the row id so rows for the same hospital don't overwrite each other
+    result, _ = render_report_in_worker({
+        'hospital_name': row['hospital_name'],
+        'hospital_beds': int(row['beds']),
+        'recipient_name': row['recipient'],
+        'recipient_email': row['email'],
+        'state': row.get('state') or None,
+        'chart_backend': chart_backend,
+        'filename': os.path.join(output_dir, f"{row['row_id']}_{default_name}")
+    })
+    return {
+        'filename': result.filename,
+        'pid': os.getpid(),
+        'timings': result.timings,
+        'wall_seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def run_batch(input_path: str, output_dir: str, workers: int = None,
+              chart_backend: str = 'matplotlib') -> Dict:
+    """Render every pending row and return a summary of the run"""
+    os.makedirs(output_dir, exist_ok=True)
+    output_dir = os.path.abspath(output_dir)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    rows = read_batch_input(input_path)
+    done = load_manifest(manifest_path)
+    # Only successful rows are skipped - failed and invalid rows are tried again
+    pending = [row for row in rows if done.get(row['row_id'], {}).get('status') != 'ok']
+    workers = workers or os.cpu_count() or 1
+
+    print(f"📋 {len(rows)} rows in {input_path}: "
+          f"{len(rows) - len(pending)} already in manifest, {len(pending)} to render on {workers} workers")
+
+    summary = {'total': len(rows), 'skipped': len(rows) - len(pending), 'ok': 0, 'error': 0, 'invalid': 0}
+    if not pending:
+        return summary
+
+    batch_started = time.perf_counter()
+    with open(manifest_path, 'a', encoding='utf-8') as manifest:
+        def record(row, status, **fields):
+            entry = {
+                'row_id': row['row_id'],
+                'line': row['line'],
+                'hospital_name': row['hospital_name'],
+                'recipient_email': row['email'],
+                'state': row.get('state'),
+                'status': status,
+                'chart_backend': chart_backend,
+                'finished_at': datetime.now().isoformat(timespec='seconds')
+            }
+            entry.update(fields)
+            _append_manifest(manifest, entry)
+            summary[status] += 1
+
+            finished = summary['ok'] + summary['error'] + summary['invalid']
+            elapsed = time.perf_counter() - batch_started
+            remaining = (elapsed / finished) * (len(pending) - finished)
+            icon = "✅" if status == 'ok' else "❌"
+            detail = fields.get('filename') or fields.get('error')
+            print(f"{icon} [{finished}/{len(pending)}] {row['hospital_name']} - {detail} "
+                  f"({elapsed:.1f}s elapsed, ~{remaining:.0f}s left)", flush=True)
+
+        valid = []
+        for row in pending:
+            problem = validate_row(row)
+            if problem:
+                record(row, 'invalid', error=problem)
+            else:
+                valid.append(row)
+
+        if valid:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(valid)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_render_worker
+            ) as executor:
+                futures = {executor.submit(render_batch_row, row, chart_backend, output_dir): row for row in valid}
+                for future in as_completed(futures):
+                    row = futures[future]
+                    try:
+                        record(row, 'ok', **future.result())
+                    except Exception as e:
+                        record(row, 'error', error=str(e) or type(e).__name__)
+
+    summary['elapsed_seconds'] = round(time.perf_counter() - batch_started, 3)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="generate-batch",
+        description="Render RCM benchmark reports for every row of a CSV/JSONL file"
+    )
+    parser.add_argument("input", help="CSV or JSONL with hospital_name, beds, recipient, email, state")
+    parser.add_argument("--output-dir", default="batch_reports",
+                        help="Where PDFs and manifest.jsonl are written (default: batch_reports)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chart-backend", choices=CHART_BACKENDS, default="matplotlib")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.input, args.output_dir, args.workers, args.chart_backend)
+
+    print(f"\n🏁 Batch finished: {summary['ok']} rendered, {summary['error']} failed, "
+          f"{summary['invalid']} invalid, {summary['skipped']} skipped")
+    if 'elapsed_seconds' in summary:
+        print(f"⏱️  {summary['elapsed_seconds']}s total")
+    print(f"📄 Manifest: {os.path.join(args.output_dir, MANIFEST_NAME)}")
+    return 1 if summary['error'] or summary['invalid'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
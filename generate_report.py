@@ -9,8 +9,6 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
-print("Starting RCM Benchmark Report Generator...")
-
 class RCMBenchmarkReportGenerator:
     def __init__(self):
         """Initialize the report generator"""
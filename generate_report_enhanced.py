@@ -2,8 +2,12 @@
 # Enhanced RCM Benchmark Report Generator with Charts and Branding
 # Updated with larger fonts and better page utilization
 
-import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from io import BytesIO
+from typing import Dict, Optional
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
@@ -12,122 +16,517 @@ from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 from reportlab.pdfgen import canvas
 
-# For charts
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-import numpy as np
+# Vector charts - matplotlib is only imported when the raster backend is used
+import charts_vector
+from chart_cache import chart_cache
+from chart_profiles import DEFAULT_CHART_PROFILE, get_chart_profile
+from report_template import ReportTemplate, Section
+from page_cache import merge_pdfs, static_page_cache
+from instrumentation import timed_stage
 
-print("Starting Enhanced RCM Benchmark Report Generator...")
+# Brand colors
+BRAND_BLUE = colors.HexColor('#1e3a8a')
+BRAND_LIGHT_BLUE = colors.HexColor('#3b82f6')
+BRAND_GREEN = colors.HexColor('#10b981')
+BRAND_RED = colors.HexColor('#ef4444')
+BRAND_ORANGE = colors.HexColor('#f59e0b')
+BRAND_GRAY = colors.HexColor('#6b7280')
 
-class EnhancedRCMReportGenerator:
-    def __init__(self):
-        """Initialize the enhanced report generator"""
-        print("Initializing enhanced report generator...")
-        self.styles = getSampleStyleSheet()
-        self._setup_colors()
-        self._setup_custom_styles()
-        
-    def _setup_colors(self):
-        """Define brand colors"""
-        self.brand_blue = colors.HexColor('#1e3a8a')
-        self.brand_light_blue = colors.HexColor('#3b82f6')
-        self.brand_green = colors.HexColor('#10b981')
-        self.brand_red = colors.HexColor('#ef4444')
-        self.brand_orange = colors.HexColor('#f59e0b')
-        self.brand_gray = colors.HexColor('#6b7280')
-        
-    def _setup_custom_styles(self):
-        """Create custom styles with better branding and larger fonts"""
-        # Title style - BIGGER
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=36,  # Increased from 28
-            textColor=self.brand_blue,
-            spaceAfter=36,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            leading=42  # Line height
-        ))
-        
-        # Subtitle style - BIGGER
-        self.styles.add(ParagraphStyle(
-            name='CustomSubtitle',
-            parent=self.styles['Heading2'],
-            fontSize=24,  # Increased from 18
-            textColor=self.brand_blue,
-            spaceBefore=24,
-            spaceAfter=18,
-            fontName='Helvetica-Bold',
-            leading=28
-        ))
-        
-        # Normal text - BIGGER
-        self.styles.add(ParagraphStyle(
-            name='CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=13,  # Increased from default 10
-            leading=18,   # Better line spacing
-            spaceBefore=6,
-            spaceAfter=6
-        ))
-        
-        # Highlight style for important numbers - BIGGER
-        self.styles.add(ParagraphStyle(
-            name='Highlight',
-            parent=self.styles['Normal'],
-            fontSize=18,  # Increased from 14
-            textColor=self.brand_green,
-            fontName='Helvetica-Bold',
-            alignment=TA_CENTER,
-            leading=22
-        ))
-        
-        # Large number style for key metrics
-        self.styles.add(ParagraphStyle(
-            name='BigNumber',
-            parent=self.styles['Normal'],
-            fontSize=48,  # Very large for impact
-            textColor=self.brand_green,
-            fontName='Helvetica-Bold',
-            alignment=TA_CENTER,
-            leading=52
-        ))
-        
-        # Medium number style
-        self.styles.add(ParagraphStyle(
-            name='MediumNumber',
-            parent=self.styles['Normal'],
-            fontSize=28,
-            textColor=self.brand_blue,
-            fontName='Helvetica-Bold',
-            alignment=TA_CENTER,
-            leading=32
-        ))
+# Turnover cost model for reports without real data (metrics_engine vectorizes the same numbers)
+AVERAGE_RCM_STAFF_PER_BED = 0.025
+AVERAGE_RCM_SALARY = 85000
+CURRENT_TURNOVER_RATE = 0.40
+BEST_PRACTICE_TURNOVER = 0.15
+REPLACEMENT_COST_MULTIPLIER = 2.0
+IMPLEMENTATION_COST = 450000
+# Indirect impact as a share of the direct savings
+PRODUCTIVITY_LOSS_FACTOR = 0.3
+QUALITY_IMPROVEMENT_FACTOR = 0.15
+TOTAL_IMPACT_FACTOR = 1.45
+
+# Raster chart style, applied once per process the first time matplotlib is needed
+MATPLOTLIB_STYLE = 'seaborn-v0_8-darkgrid'
+_matplotlib_lock = threading.Lock()
+_matplotlib_ready = False
+
+
+def chart_figure(figsize):
+    """New matplotlib Figure detached from pyplot's global figure manager
+
+    Figures made this way can be drawn from several threads at once; the
+    backend and style are configured only on first use.
+    """
+    global _matplotlib_ready
+    import matplotlib
+    if not _matplotlib_ready:
+        with _matplotlib_lock:
+            if not _matplotlib_ready:
+                matplotlib.use('Agg')
+                import matplotlib.style
+                matplotlib.style.use(MATPLOTLIB_STYLE)
+                _matplotlib_ready = True
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+def save_chart(fig, profile=None):
+    """Render a Figure to an in-memory image encoded for a ChartProfile (print by default)"""
+    profile = profile or get_chart_profile()
+    fig.tight_layout()
+    chart_buffer = BytesIO()
+    if profile.image_format == 'jpeg':
+        fig.savefig(chart_buffer, format='jpeg', dpi=profile.dpi, bbox_inches='tight', facecolor='white',
+                    pil_kwargs={'quality': profile.jpeg_quality, 'optimize': True})
+    else:
+        fig.savefig(chart_buffer, format='png', dpi=profile.dpi, bbox_inches='tight', facecolor='white')
+        if profile.palette_colors:
+            from PIL import Image as PILImage
+            chart_buffer.seek(0)
+            palette_image = PILImage.open(chart_buffer).convert('RGB').quantize(
+                colors=profile.palette_colors, method=PILImage.Quantize.FASTOCTREE
+            )
+            chart_buffer = BytesIO()
+            palette_image.save(chart_buffer, format='png', optimize=True)
+    chart_buffer.seek(0)
+    return chart_buffer
+
+
+def _build_stylesheet():
+    """Sample stylesheet plus the report's custom styles with better branding and larger fonts"""
+    styles = getSampleStyleSheet()
+    
+    # Title style - BIGGER
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=36,  # Increased from 28
+        textColor=BRAND_BLUE,
+        spaceAfter=36,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        leading=42  # Line height
+    ))
+    
+    # Subtitle style - BIGGER
+    styles.add(ParagraphStyle(
+        name='CustomSubtitle',
+        parent=styles['Heading2'],
+        fontSize=24,  # Increased from 18
+        textColor=BRAND_BLUE,
+        spaceBefore=24,
+        spaceAfter=18,
+        fontName='Helvetica-Bold',
+        leading=28
+    ))
+    
+    # Normal text - BIGGER
+    styles.add(ParagraphStyle(
+        name='CustomNormal',
+        parent=styles['Normal'],
+        fontSize=13,  # Increased from default 10
+        leading=18,   # Better line spacing
+        spaceBefore=6,
+        spaceAfter=6
+    ))
+    
+    # Highlight style for important numbers - BIGGER
+    styles.add(ParagraphStyle(
+        name='Highlight',
+        parent=styles['Normal'],
+        fontSize=18,  # Increased from 14
+        textColor=BRAND_GREEN,
+        fontName='Helvetica-Bold',
+        alignment=TA_CENTER,
+        leading=22
+    ))
+    
+    # Large number style for key metrics
+    styles.add(ParagraphStyle(
+        name='BigNumber',
+        parent=styles['Normal'],
+        fontSize=48,  # Very large for impact
+        textColor=BRAND_GREEN,
+        fontName='Helvetica-Bold',
+        alignment=TA_CENTER,
+        leading=52
+    ))
+    
+    # Medium number style
+    styles.add(ParagraphStyle(
+        name='MediumNumber',
+        parent=styles['Normal'],
+        fontSize=28,
+        textColor=BRAND_BLUE,
+        fontName='Helvetica-Bold',
+        alignment=TA_CENTER,
+        leading=32
+    ))
+    
+    # Footer style
+    styles.add(ParagraphStyle(
+        name='Footer',
+        parent=styles['Normal'],
+        fontSize=10,  # Keep footer smaller
+        textColor=BRAND_GRAY,
+        alignment=TA_CENTER
+    ))
+    
+    # Bullet style
+    styles.add(ParagraphStyle(
+        name='CustomBullet',
+        parent=styles['Normal'],
+        fontSize=13,
+        leading=20,
+        leftIndent=20,
+        bulletIndent=10
+    ))
+    
+    return styles
+
+
+# Built once per process and only ever read while rendering
+REPORT_STYLES = _build_stylesheet()
+
+
+@dataclass
+class ReportContext:
+    """Per-request inputs and gathered data for one render
+
+    Everything that varies between reports travels in the context, so one
+    generator instance can render any number of reports concurrently.
+    """
+    hospital_name: str
+    hospital_beds: int
+    recipient_name: str
+    recipient_email: str
+    state: Optional[str] = None
+    chart_backend: str = 'matplotlib'
+    chart_profile: str = DEFAULT_CHART_PROFILE
+    filename: Optional[str] = None
+    in_memory: bool = False
+    real_data: Optional[Dict] = None
+    data_sources: Dict = field(default_factory=dict)
+    timings: Dict = field(default_factory=dict)
+
+
+@dataclass
+class ReportResult:
+    """Everything produced by one report render
+
+    Callers should use these metrics rather than recomputing them so that what
+    they send on (e.g. to Clay) always matches the numbers printed in the PDF.
+    """
+    filename: str
+    metrics: Dict
+    data_sources: Dict = field(default_factory=dict)
+    timings: Dict = field(default_factory=dict)
+    # Set instead of writing filename when the report was built in memory
+    pdf_bytes: Optional[bytes] = None
+
+
+# Table styles are fixed, so they are built once and shared by every report
+DASHBOARD_TABLE_STYLE = TableStyle([
+    # Header
+    ('BACKGROUND', (0, 0), (-1, 0), BRAND_BLUE),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 13),  # Bigger header
+    ('FONTSIZE', (0, 1), (-1, -1), 12),  # Bigger body
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
+    ('TOPPADDING', (0, 1), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
+    # Data rows
+    ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
+    ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    # Impact column
+    ('BACKGROUND', (3, 1), (3, -1), BRAND_GREEN),
+    ('TEXTCOLOR', (3, 1), (3, -1), colors.whitesmoke),
+    ('FONTNAME', (3, 1), (3, -1), 'Helvetica-Bold'),
+])
+
+ROI_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), BRAND_BLUE),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),  # Bigger
+    ('FONTSIZE', (0, 1), (-1, -1), 11),  # Bigger
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, -1), (-1, -1), BRAND_GREEN),
+    ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+])
+
+TIMELINE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), BRAND_BLUE),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('ALIGN', (0, 1), (1, -1), 'CENTER'),
+    ('ALIGN', (2, 1), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),  # Bigger
+    ('FONTSIZE', (0, 1), (-1, -1), 10),  # Bigger
+    ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+])
+
+
+# Report sections - each takes the report data ({'context', 'metrics', 'charts'}),
+# or for static sections just its cache key
+def _cover_title_section(_):
+    return [
+        Spacer(1, 1.5*inch),
+        Paragraph("RCM Staffing Crisis<br/>Benchmark Analysis", REPORT_STYLES['CustomTitle']),
+        Spacer(1, 0.5*inch)
+    ]
+
+
+def _cover_client_section(data):
+    context = data['context']
+    # Client info box - BIGGER
+    client_info = f"""
+        <para alignment="center">
+        <font size="16"><b>Prepared For:</b></font><br/>
+        <font size="18">{context.recipient_name}</font><br/>
+        <font size="18">{context.hospital_name}</font><br/>
+        <br/>
+        <font size="16"><b>Analysis Date:</b></font><br/>
+        <font size="16">{datetime.now().strftime('%B %d, %Y')}</font><br/>
+        <br/>
+        <font size="16"><b>Facility Size:</b></font><br/>
+        <font size="18">{context.hospital_beds} Beds</font>
+        </para>
+        """
+    return [Paragraph(client_info, REPORT_STYLES['CustomNormal'])]
+
+
+def _cover_highlight_section(_):
+    # Key finding highlight - MUCH BIGGER
+    return [
+        Spacer(1, 1.5*inch),
+        Paragraph("Potential Annual Savings Identified:", REPORT_STYLES['Highlight'])
+    ]
+
+
+def _cover_savings_section(data):
+    return [
+        Paragraph(f"${data['metrics']['potential_savings']:,}", REPORT_STYLES['BigNumber']),
+        PageBreak()
+    ]
+
+
+def _dashboard_heading_section(_):
+    return [Paragraph("Executive Dashboard", REPORT_STYLES['CustomSubtitle'])]
+
+
+def _dashboard_section(data):
+    metrics = data['metrics']
+    # Key metrics table - BIGGER FONTS
+    dashboard_data = [
+        ['Key Performance Indicators', 'Current State', 'Target State', 'Impact'],
+        ['Staff Turnover Rate', '40%', '15%', '↓ 62.5%'],
+        ['Annual Turnover Cost', f"${metrics['current_turnover_cost']:,}", 
+         f"${metrics['reduced_cost']:,}", f"Save ${metrics['potential_savings']:,}"],
+        ['Cost Per Bed', f"${metrics['cost_per_bed']:,}", 
+         f"${int(metrics['cost_per_bed'] * 0.375):,}", f"↓ ${metrics['savings_per_bed']:,}"],
+        ['Staff Departures/Year', f"{metrics['staff_turning_over_now']}", 
+         f"{metrics['staff_turning_over_optimized']}", 
+         f"↓ {metrics['staff_turning_over_now'] - metrics['staff_turning_over_optimized']}"],
+        ['Break-Even Timeline', '-', f"{metrics['break_even_months']} months", 'Quick ROI']
+    ]
+    return [
+        Table(dashboard_data, colWidths=[2.5*inch, 1.5*inch, 1.7*inch, 1.7*inch], style=DASHBOARD_TABLE_STYLE),
+        Spacer(1, 0.5*inch),
+        # Add turnover comparison chart - BIGGER
+        data['charts']['turnover'],
+        PageBreak()
+    ]
+
+
+def _financial_heading_section(_):
+    return [Paragraph("Financial Impact Analysis", REPORT_STYLES['CustomSubtitle'])]
+
+
+def _financial_impact_section(data):
+    metrics = data['metrics']
+    impact_text = f"""
+        <font size="14">Our comprehensive analysis reveals significant financial opportunities through strategic 
+        RCM workforce optimization at {data['context'].hospital_name}:</font>
+        <br/><br/>
+        <font size="14"><b>Direct Cost Savings:</b> ${metrics['potential_savings']:,} annually<br/>
+        <b>Productivity Recovery:</b> ${metrics['productivity_loss']:,} annually<br/>
+        <b>Quality Improvements:</b> ${metrics['quality_improvement']:,} annually<br/>
+        <b>Total Potential Impact:</b> ${metrics['total_impact']:,} annually</font>
+        """
+    return [
+        Paragraph(impact_text, REPORT_STYLES['CustomNormal']),
+        Spacer(1, 0.4*inch),
+        # Add savings charts - BIGGER
+        data['charts']['savings'],
+        PageBreak()
+    ]
+
+
+def _roi_heading_section(_):
+    return [
+        Paragraph("Return on Investment Analysis", REPORT_STYLES['CustomSubtitle']),
+        Paragraph(
+            "<font size='14'>The following analysis demonstrates the compelling ROI timeline for implementing "
+            "strategic RCM outsourcing initiatives:</font>",
+            REPORT_STYLES['CustomNormal']
+        ),
+        Spacer(1, 0.3*inch)
+    ]
+
+
+def _roi_section(data):
+    savings = data['metrics']['potential_savings']
+    # ROI Summary Table - BIGGER
+    roi_summary = [
+        ['Investment Period', 'Investment', 'Savings', 'Net Benefit', 'ROI %'],
+        ['Year 1', '$450,000', f"${savings:,}", 
+         f"${savings - 450000:,}", 
+         f"{((savings - 450000) / 450000 * 100):.0f}%"],
+        ['Year 2', '$400,000', f"${savings:,}", 
+         f"${savings - 400000:,}",
+         f"{((savings - 400000) / 400000 * 100):.0f}%"],
+        ['Year 3', '$400,000', f"${savings:,}", 
+         f"${savings - 400000:,}",
+         f"{((savings - 400000) / 400000 * 100):.0f}%"],
+        ['3-Year Total', '$1,250,000', f"${savings * 3:,}", 
+         f"${(savings * 3) - 1250000:,}",
+         f"{(((savings * 3) - 1250000) / 1250000 * 100):.0f}%"]
+    ]
+    return [
+        data['charts']['roi'],
+        Spacer(1, 0.3*inch),
+        Table(roi_summary, colWidths=[1.6*inch, 1.4*inch, 1.4*inch, 1.5*inch, .9*inch], style=ROI_TABLE_STYLE)
+    ]
+
+
+def _roadmap_section(_):
+    # Timeline visualization - BIGGER
+    timeline_data = [
+        ['Phase', 'Timeline', 'Key Activities', 'Expected Outcomes'],
+        ['Discovery & Assessment', 'Days 1-30', 
+         '• Detailed turnover analysis\n• Function-specific assessment\n• Vendor evaluation', 
+         'Clear action plan'],
+        ['Pilot Implementation', 'Days 31-90', 
+         '• Select high-impact function\n• Partner selection\n• Process documentation', 
+         '25% turnover reduction'],
+        ['Scale & Optimize', 'Days 91-180', 
+         '• Expand to additional functions\n• Technology integration\n• Staff development', 
+         '50% turnover reduction'],
+        ['Full Transformation', 'Days 181-365', 
+         '• Complete implementation\n• Continuous improvement\n• Performance monitoring', 
+         'Achieve 15% turnover rate']
+    ]
+    return [
+        PageBreak(),
+        Paragraph("Implementation Roadmap", REPORT_STYLES['CustomSubtitle']),
+        Table(timeline_data, colWidths=[2.0*inch, 1.1*inch, 2.5*inch, 1.8*inch], style=TIMELINE_TABLE_STYLE)
+    ]
+
+
+def _next_steps_section(_):
+    next_steps_text = """
+        <font size="14"><b>1. Schedule Your Strategy Session (This Week)</b><br/>
+        Our RCM transformation experts will conduct a confidential review of your specific 
+        challenges and opportunities. This 60-minute session includes:<br/>
+        • Detailed analysis of your RCM department structure<br/>
+        • Identification of highest-impact outsourcing opportunities<br/>
+        • Customized implementation timeline<br/>
+        • ROI projections based on your actual data<br/>
+        <br/>
         
-        # Footer style
-        self.styles.add(ParagraphStyle(
-            name='Footer',
-            parent=self.styles['Normal'],
-            fontSize=10,  # Keep footer smaller
-            textColor=self.brand_gray,
-            alignment=TA_CENTER
-        ))
+        <b>2. Receive Your Custom Transformation Plan (Within 5 Days)</b><br/>
+        Following our strategy session, you'll receive:<br/>
+        • Function-by-function outsourcing recommendations<br/>
+        • Vendor evaluation criteria specific to your needs<br/>
+        • Risk mitigation strategies<br/>
+        • Month-by-month implementation roadmap<br/>
+        <br/>
         
-        # Bullet style
-        self.styles.add(ParagraphStyle(
-            name='CustomBullet',
-            parent=self.styles['Normal'],
-            fontSize=13,
-            leading=20,
-            leftIndent=20,
-            bulletIndent=10
-        ))
+        <b>3. Begin Your Pilot Program (Within 30 Days)</b><br/>
+        Start with your highest-turnover function to:<br/>
+        • Prove the ROI model with minimal risk<br/>
+        • Build internal confidence in the approach<br/>
+        • Refine processes before full-scale implementation<br/>
+        • Generate quick wins to fund expansion</font>
+        """
+    return [
+        PageBreak(),
+        Paragraph("Your Next Steps", REPORT_STYLES['CustomSubtitle']),
+        Paragraph(next_steps_text, REPORT_STYLES['CustomNormal']),
+        Spacer(1, 0.5*inch)
+    ]
+
+
+def _reference_month(_):
+    return datetime.now().strftime('%Y%m')
+
+
+def _cta_section(month):
+    # Call to action box - BIGGER
+    cta_text = """
+        <para alignment="center">
+        <font size="20"><b>Ready to Transform Your RCM Workforce Challenges?</b></font><br/>
+        <br/>
+        <font size="18">Schedule Your Confidential Strategy Session Today</font><br/>
+        <br/>
+        <font size="16"><b>Call: 1-800-FROST-RCM</b><br/>
+        <b>Email: solutions@frost-arnett.com</b><br/>
+        <b>Web: www.frost-arnett.com/rcm-transformation</b></font><br/>
+        <br/>
+        <font size="14"><i>Mention reference code: STAFF-{} for priority scheduling</i></font>
+        </para>
+        """.format(month)
+    return [Paragraph(cta_text, REPORT_STYLES['CustomNormal'])]
+
+
+# Bump the version whenever a section's content or order changes
+ENHANCED_REPORT_TEMPLATE = ReportTemplate("enhanced-2025.08", [
+    Section('cover_title', _cover_title_section, static=True),
+    Section('cover_client', _cover_client_section),
+    Section('cover_highlight', _cover_highlight_section, static=True),
+    Section('cover_savings', _cover_savings_section),
+    Section('dashboard_heading', _dashboard_heading_section, static=True),
+    Section('dashboard', _dashboard_section),
+    Section('financial_heading', _financial_heading_section, static=True),
+    Section('financial_impact', _financial_impact_section),
+    Section('roi_heading', _roi_heading_section, static=True),
+    Section('roi', _roi_section),
+    Section('roadmap', _roadmap_section, static=True),
+    Section('next_steps', _next_steps_section, static=True),
+    Section('cta', _cta_section, static=True, cache_key=_reference_month)
+])
+
+
+class EnhancedRCMReportGenerator:
+    """Stateless report renderer - styles and colors are shared, per-report data lives in a ReportContext"""
     
-    def create_turnover_comparison_chart(self, metrics, hospital_name):
+    brand_blue = BRAND_BLUE
+    brand_light_blue = BRAND_LIGHT_BLUE
+    brand_green = BRAND_GREEN
+    brand_red = BRAND_RED
+    brand_orange = BRAND_ORANGE
+    brand_gray = BRAND_GRAY
+    styles = REPORT_STYLES
+    template = ENHANCED_REPORT_TEMPLATE
+    
+    def create_turnover_comparison_chart(self, metrics, hospital_name, profile=None):
         """Create a visual turnover comparison chart"""
-        plt.style.use('seaborn-v0_8-darkgrid')
-        fig, ax = plt.subplots(1, 1, figsize=(12, 8))  # Bigger chart
+        fig = chart_figure(figsize=(12, 8))  # Bigger chart
+        ax = fig.subplots(1, 1)
         
         # Data
         categories = [f'{hospital_name}\n(Current)', 'Industry\nAverage', 'Best\nPractice']
@@ -161,16 +560,15 @@ class EnhancedRCMReportGenerator:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout()
-        chart_filename = f'turnover_chart_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png'
-        plt.savefig(chart_filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
-        
-        return chart_filename
+        return save_chart(fig, profile)
     
-    def create_cost_savings_chart(self, metrics):
+    def create_cost_savings_chart(self, metrics, profile=None):
         """Create a cost savings visualization"""
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))  # Bigger chart
+        import numpy as np
+        from matplotlib.ticker import FuncFormatter
+        
+        fig = chart_figure(figsize=(14, 6))  # Bigger chart
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Pie chart for cost breakdown
         current_cost = metrics['current_turnover_cost']
@@ -213,46 +611,25 @@ class EnhancedRCMReportGenerator:
         
         ax2.set_ylabel('Cumulative Savings ($)', fontsize=16, fontweight='bold')
         ax2.set_title('3-Year Savings Projection', fontsize=18, fontweight='bold', pad=20)
-        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
+        ax2.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
         ax2.tick_params(axis='both', labelsize=14)
         ax2.grid(axis='y', alpha=0.3)
         ax2.spines['top'].set_visible(False)
         ax2.spines['right'].set_visible(False)
         
-        plt.tight_layout()
-        chart_filename = f'savings_chart_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png'
-        plt.savefig(chart_filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
-        
-        return chart_filename
+        return save_chart(fig, profile)
     
-    def create_roi_timeline_chart(self, metrics):
+    def create_roi_timeline_chart(self, metrics, profile=None):
         """Create ROI timeline visualization"""
-        fig, ax = plt.subplots(1, 1, figsize=(12, 8))  # Bigger chart
+        import numpy as np
+        from matplotlib.ticker import FuncFormatter
         
-        # Data
-        months = np.arange(0, 37, 3)  # 0 to 36 months, every 3 months
-        investment = []
-        returns = []
-        net_benefit = []
-        
-        for month in months:
-            if month == 0:
-                inv = 0
-                ret = 0
-            elif month <= 12:
-                inv = (month/12) * 450000
-                ret = (month/12) * metrics['potential_savings']
-            elif month <= 24:
-                inv = 450000 + ((month-12)/12) * 400000
-                ret = metrics['potential_savings'] + ((month-12)/12) * metrics['potential_savings']
-            else:
-                inv = 450000 + 400000 + ((month-24)/12) * 400000
-                ret = 2 * metrics['potential_savings'] + ((month-24)/12) * metrics['potential_savings']
-            
-            investment.append(inv)
-            returns.append(ret)
-            net_benefit.append(ret - inv)
+        fig = chart_figure(figsize=(12, 8))  # Bigger chart
+        ax = fig.subplots(1, 1)
+        
+        # Data - 0 to 36 months, every 3 months
+        months, investment, returns = charts_vector.roi_timeline_series(metrics['potential_savings'])
+        months = np.array(months)
         
         # Plot lines with bigger markers
         ax.plot(months, investment, 'o-', color='#ef4444', linewidth=3, markersize=10, label='Cumulative Investment')
@@ -275,31 +652,69 @@ class EnhancedRCMReportGenerator:
         ax.set_xlabel('Months', fontsize=18, fontweight='bold')
         ax.set_ylabel('Amount ($)', fontsize=18, fontweight='bold')
         ax.set_title('ROI Timeline Analysis', fontsize=22, fontweight='bold', pad=25)
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
         ax.tick_params(axis='both', labelsize=14)
         ax.grid(True, alpha=0.3)
         ax.legend(loc='upper left', fontsize=14)
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        plt.tight_layout()
-        chart_filename = f'roi_timeline_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png'
-        plt.savefig(chart_filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        return save_chart(fig, profile)
+    
+    def create_chart_flowables(self, metrics, hospital_name, chart_backend='matplotlib', timings=None,
+                               chart_profile=DEFAULT_CHART_PROFILE):
+        """Build the turnover, savings and ROI charts sized for the report layout
         
-        return chart_filename
+        Time spent on each chart is added to timings as chart_<name>. Raster
+        charts are rendered at the named chart profile's resolution and format.
+        """
+        timings = {} if timings is None else timings
+        if chart_backend == 'vector':
+            with timed_stage(timings, 'chart_turnover_comparison'):
+                turnover_drawing = charts_vector.turnover_comparison_drawing(
+                    hospital_name, width=6.5*inch, height=4.3*inch
+                )
+            with timed_stage(timings, 'chart_cost_savings'):
+                savings_drawing = charts_vector.cost_savings_drawing(metrics, width=7*inch, height=3*inch)
+            with timed_stage(timings, 'chart_roi_timeline'):
+                roi_drawing = charts_vector.roi_timeline_drawing(metrics, width=6.5*inch, height=4.3*inch)
+            return turnover_drawing, savings_drawing, roi_drawing
+        if chart_backend != 'matplotlib':
+            raise ValueError(f"Unknown chart backend: {chart_backend}")
+        profile = get_chart_profile(chart_profile)
+        encoding = asdict(profile)
+        
+        # Raster charts are cached on exactly the values each one draws and how it is encoded
+        with timed_stage(timings, 'chart_turnover_comparison'):
+            turnover_chart = chart_cache.get_or_render(
+                'turnover_comparison',
+                {'hospital_name': hospital_name, 'profile': encoding},
+                lambda: self.create_turnover_comparison_chart(metrics, hospital_name, profile)
+            )
+        with timed_stage(timings, 'chart_cost_savings'):
+            savings_chart = chart_cache.get_or_render(
+                'cost_savings',
+                dict({key: metrics[key] for key in ('current_turnover_cost', 'potential_savings', 'reduced_cost')},
+                     profile=encoding),
+                lambda: self.create_cost_savings_chart(metrics, profile)
+            )
+        with timed_stage(timings, 'chart_roi_timeline'):
+            roi_chart = chart_cache.get_or_render(
+                'roi_timeline',
+                {'potential_savings': metrics['potential_savings'], 'profile': encoding},
+                lambda: self.create_roi_timeline_chart(metrics, profile)
+            )
+        return (
+            Image(turnover_chart, width=6.5*inch, height=4.3*inch),
+            Image(savings_chart, width=7*inch, height=3*inch),
+            Image(roi_chart, width=6.5*inch, height=4.3*inch)
+        )
     
-    def calculate_metrics(self, hospital_beds, hospital_name):
+    def calculate_metrics(self, hospital_beds, hospital_name, context=None):
         """Calculate all metrics with enhanced detail"""
         print(f"Calculating enhanced metrics for {hospital_name}...")
         
         # Base calculations (same as before)
-        AVERAGE_RCM_STAFF_PER_BED = 0.025
-        AVERAGE_RCM_SALARY = 85000
-        CURRENT_TURNOVER_RATE = 0.40
-        BEST_PRACTICE_TURNOVER = 0.15
-        REPLACEMENT_COST_MULTIPLIER = 2.0
-        
         estimated_staff = int(hospital_beds * AVERAGE_RCM_STAFF_PER_BED)
         staff_turning_over = estimated_staff * CURRENT_TURNOVER_RATE
         current_cost = staff_turning_over * AVERAGE_RCM_SALARY * REPLACEMENT_COST_MULTIPLIER
@@ -317,12 +732,12 @@ class EnhancedRCMReportGenerator:
             'staff_turning_over_now': int(staff_turning_over),
             'staff_turning_over_optimized': int(reduced_staff_turnover),
             # New metrics
-            'productivity_loss': int(potential_savings * 0.3),  # 30% additional impact
-            'quality_improvement': int(potential_savings * 0.15),  # 15% from better quality
-            'total_impact': int(potential_savings * 1.45),  # Total including indirect benefits
+            'productivity_loss': int(potential_savings * PRODUCTIVITY_LOSS_FACTOR),  # 30% additional impact
+            'quality_improvement': int(potential_savings * QUALITY_IMPROVEMENT_FACTOR),  # 15% from better quality
+            'total_impact': int(potential_savings * TOTAL_IMPACT_FACTOR),  # Total including indirect benefits
             'cost_per_bed': int(current_cost / hospital_beds),
             'savings_per_bed': int(potential_savings / hospital_beds),
-            'break_even_months': int(450000 / (potential_savings / 12)) if potential_savings > 0 else 999
+            'break_even_months': int(IMPLEMENTATION_COST / (potential_savings / 12)) if potential_savings > 0 else 999
         }
         
         return metrics
@@ -348,8 +763,10 @@ class EnhancedRCMReportGenerator:
         canvas_obj.setFillColor(self.brand_gray)
         canvas_obj.drawString(0.75*inch, 0.5*inch, 
                              "Frost-Arnett Company | Healthcare Revenue Excellence Since 1893")
+        # Cached static pages are rendered on their own and numbered from their place in the report
+        page_number = canvas_obj.getPageNumber() + getattr(doc, 'page_offset', 0)
         canvas_obj.drawRightString(letter[0] - 0.75*inch, 0.5*inch, 
-                                  f"Page {canvas_obj.getPageNumber()}")
+                                  f"Page {page_number}")
         
         # Footer line
         canvas_obj.setLineWidth(1)
@@ -357,293 +774,134 @@ class EnhancedRCMReportGenerator:
         
         canvas_obj.restoreState()
     
-    def generate_report(self, hospital_name, hospital_beds, recipient_name, recipient_email):
-        """Generate the enhanced PDF report"""
-        print(f"Generating enhanced report for {hospital_name}...")
-        
-        # Calculate metrics
-        metrics = self.calculate_metrics(hospital_beds, hospital_name)
-        
-        # Generate charts
-        turnover_chart = self.create_turnover_comparison_chart(metrics, hospital_name)
-        savings_chart = self.create_cost_savings_chart(metrics)
-        roi_chart = self.create_roi_timeline_chart(metrics)
-        
-        # Create filename
+    def generate_report(self, hospital_name, hospital_beds, recipient_name, recipient_email,
+                        chart_backend='matplotlib'):
+        """Generate the enhanced PDF report and return its filename"""
+        return self.build_report(
+            hospital_name, hospital_beds, recipient_name, recipient_email,
+            chart_backend=chart_backend
+        ).filename
+    
+    def report_filename(self, hospital_name):
+        """Default PDF filename for a hospital's report"""
         safe_hospital_name = hospital_name.replace(' ', '_').replace('/', '_')
-        filename = f"Enhanced_RCM_Benchmark_{safe_hospital_name}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        
-        # Create PDF with smaller margins for more content space
-        doc = SimpleDocTemplate(
-            filename, 
+        return f"Enhanced_RCM_Benchmark_{safe_hospital_name}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    
+    def build_report(self, hospital_name, hospital_beds, recipient_name, recipient_email,
+                     chart_backend='matplotlib', filename=None, in_memory=False,
+                     chart_profile=DEFAULT_CHART_PROFILE):
+        """Generate the enhanced PDF report and return a ReportResult
+        
+        With in_memory the PDF is returned as ReportResult.pdf_bytes and
+        nothing is written to disk. chart_profile picks the raster chart
+        resolution and encoding (see chart_profiles.py).
+        """
+        return self.render(ReportContext(
+            hospital_name=hospital_name,
+            hospital_beds=hospital_beds,
+            recipient_name=recipient_name,
+            recipient_email=recipient_email,
+            chart_backend=chart_backend,
+            chart_profile=chart_profile,
+            filename=filename,
+            in_memory=in_memory
+        ))
+    
+    def create_document(self, target, subject=''):
+        """Letter-size document with the report's margins writing to a path or buffer"""
+        # Smaller margins for more content space
+        return SimpleDocTemplate(
+            target, 
             pagesize=letter,
             topMargin=0.75*inch,      # Reduced from 1 inch
             bottomMargin=0.75*inch,   # Reduced from 1 inch
             leftMargin=0.75*inch,     # Reduced from default
-            rightMargin=0.75*inch     # Reduced from default
+            rightMargin=0.75*inch,    # Reduced from default
+            subject=subject
         )
+    
+    def render_static_pages(self, data, first_page):
+        """Render the template's static tail on its own, numbered from first_page"""
+        buffer = BytesIO()
+        doc = self.create_document(buffer)
+        doc.page_offset = first_page - 1
+        doc.build(self.template.static_pages_story(data),
+                  onFirstPage=self.add_header_footer, onLaterPages=self.add_header_footer)
+        return buffer.getvalue()
+    
+    def render(self, context):
+        """Render the PDF described by a ReportContext and return a ReportResult
         
-        story = []
-        
-        # Cover Page
-        story.append(Spacer(1, 1.5*inch))
-        story.append(Paragraph(
-            "RCM Staffing Crisis<br/>Benchmark Analysis",
-            self.styles['CustomTitle']
-        ))
-        
-        story.append(Spacer(1, 0.5*inch))
-        
-        # Client info box - BIGGER
-        client_info = f"""
-        <para alignment="center">
-        <font size="16"><b>Prepared For:</b></font><br/>
-        <font size="18">{recipient_name}</font><br/>
-        <font size="18">{hospital_name}</font><br/>
-        <br/>
-        <font size="16"><b>Analysis Date:</b></font><br/>
-        <font size="16">{datetime.now().strftime('%B %d, %Y')}</font><br/>
-        <br/>
-        <font size="16"><b>Facility Size:</b></font><br/>
-        <font size="18">{hospital_beds} Beds</font>
-        </para>
-        """
-        story.append(Paragraph(client_info, self.styles['CustomNormal']))
-        
-        story.append(Spacer(1, 1.5*inch))
-        
-        # Key finding highlight - MUCH BIGGER
-        story.append(Paragraph(
-            "Potential Annual Savings Identified:",
-            self.styles['Highlight']
-        ))
-        story.append(Paragraph(
-            f"${metrics['potential_savings']:,}",
-            self.styles['BigNumber']
-        ))
-        
-        story.append(PageBreak())
-        
-        # Executive Dashboard
-        story.append(Paragraph("Executive Dashboard", self.styles['CustomSubtitle']))
-        
-        # Key metrics table - BIGGER FONTS
-        dashboard_data = [
-            ['Key Performance Indicators', 'Current State', 'Target State', 'Impact'],
-            ['Staff Turnover Rate', '40%', '15%', '↓ 62.5%'],
-            ['Annual Turnover Cost', f"${metrics['current_turnover_cost']:,}", 
-             f"${metrics['reduced_cost']:,}", f"Save ${metrics['potential_savings']:,}"],
-            ['Cost Per Bed', f"${metrics['cost_per_bed']:,}", 
-             f"${int(metrics['cost_per_bed'] * 0.375):,}", f"↓ ${metrics['savings_per_bed']:,}"],
-            ['Staff Departures/Year', f"{metrics['staff_turning_over_now']}", 
-             f"{metrics['staff_turning_over_optimized']}", 
-             f"↓ {metrics['staff_turning_over_now'] - metrics['staff_turning_over_optimized']}"],
-            ['Break-Even Timeline', '-', f"{metrics['break_even_months']} months", 'Quick ROI']
-        ]
-        
-        dashboard_table = Table(dashboard_data, colWidths=[2.5*inch, 1.5*inch, 1.7*inch, 1.7*inch])
-        dashboard_table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), self.brand_blue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 13),  # Bigger header
-            ('FONTSIZE', (0, 1), (-1, -1), 12),  # Bigger body
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
-            ('TOPPADDING', (0, 1), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
-            # Data rows
-            ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            # Impact column
-            ('BACKGROUND', (3, 1), (3, -1), self.brand_green),
-            ('TEXTCOLOR', (3, 1), (3, -1), colors.whitesmoke),
-            ('FONTNAME', (3, 1), (3, -1), 'Helvetica-Bold'),
-        ]))
-        
-        story.append(dashboard_table)
-        story.append(Spacer(1, 0.5*inch))
-        
-        # Add turnover comparison chart - BIGGER
-        story.append(Image(turnover_chart, width=6.5*inch, height=4.3*inch))
-        
-        story.append(PageBreak())
-        
-        # Financial Impact Analysis
-        story.append(Paragraph("Financial Impact Analysis", self.styles['CustomSubtitle']))
-        
-        impact_text = f"""
-        <font size="14">Our comprehensive analysis reveals significant financial opportunities through strategic 
-        RCM workforce optimization at {hospital_name}:</font>
-        <br/><br/>
-        <font size="14"><b>Direct Cost Savings:</b> ${metrics['potential_savings']:,} annually<br/>
-        <b>Productivity Recovery:</b> ${metrics['productivity_loss']:,} annually<br/>
-        <b>Quality Improvements:</b> ${metrics['quality_improvement']:,} annually<br/>
-        <b>Total Potential Impact:</b> ${metrics['total_impact']:,} annually</font>
+        Subclasses that gather data first put it, with its provenance and
+        timings, on the context before calling this.
         """
+        hospital_name = context.hospital_name
+        hospital_beds = context.hospital_beds
+        data_sources = context.data_sources
+        print(f"Generating enhanced report for {hospital_name}...")
+        report_start = time.perf_counter()
+        timings = dict(context.timings)
         
-        story.append(Paragraph(impact_text, self.styles['CustomNormal']))
-        story.append(Spacer(1, 0.4*inch))
-        
-        # Add savings charts - BIGGER
-        story.append(Image(savings_chart, width=7*inch, height=3*inch))
-        
-        story.append(PageBreak())
-        
-        # ROI Analysis
-        story.append(Paragraph("Return on Investment Analysis", self.styles['CustomSubtitle']))
-        
-        story.append(Paragraph(
-            "<font size='14'>The following analysis demonstrates the compelling ROI timeline for implementing "
-            "strategic RCM outsourcing initiatives:</font>",
-            self.styles['CustomNormal']
-        ))
-        
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Image(roi_chart, width=6.5*inch, height=4.3*inch))
-        
-        story.append(Spacer(1, 0.3*inch))
-        
-        # ROI Summary Table - BIGGER
-        roi_summary = [
-            ['Investment Period', 'Investment', 'Savings', 'Net Benefit', 'ROI %'],
-            ['Year 1', '$450,000', f"${metrics['potential_savings']:,}", 
-             f"${metrics['potential_savings'] - 450000:,}", 
-             f"{((metrics['potential_savings'] - 450000) / 450000 * 100):.0f}%"],
-            ['Year 2', '$400,000', f"${metrics['potential_savings']:,}", 
-             f"${metrics['potential_savings'] - 400000:,}",
-             f"{((metrics['potential_savings'] - 400000) / 400000 * 100):.0f}%"],
-            ['Year 3', '$400,000', f"${metrics['potential_savings']:,}", 
-             f"${metrics['potential_savings'] - 400000:,}",
-             f"{((metrics['potential_savings'] - 400000) / 400000 * 100):.0f}%"],
-            ['3-Year Total', '$1,250,000', f"${metrics['potential_savings'] * 3:,}", 
-             f"${(metrics['potential_savings'] * 3) - 1250000:,}",
-             f"{(((metrics['potential_savings'] * 3) - 1250000) / 1250000 * 100):.0f}%"]
-        ]
+        # Calculate metrics
+        with timed_stage(timings, 'metrics'):
+            metrics = self.calculate_metrics(hospital_beds, hospital_name, context)
         
-        roi_table = Table(roi_summary, colWidths=[1.6*inch, 1.4*inch, 1.4*inch, 1.5*inch, .9*inch])
-        roi_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.brand_blue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),  # Bigger
-            ('FONTSIZE', (0, 1), (-1, -1), 11),  # Bigger
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, -1), (-1, -1), self.brand_green),
-            ('TEXTCOLOR', (0, -1), (-1, -1), colors.whitesmoke),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
-        
-        story.append(roi_table)
-        
-        # Implementation Roadmap
-        story.append(PageBreak())
-        story.append(Paragraph("Implementation Roadmap", self.styles['CustomSubtitle']))
-        
-        # Timeline visualization - BIGGER
-        timeline_data = [
-            ['Phase', 'Timeline', 'Key Activities', 'Expected Outcomes'],
-            ['Discovery & Assessment', 'Days 1-30', 
-             '• Detailed turnover analysis\n• Function-specific assessment\n• Vendor evaluation', 
-             'Clear action plan'],
-            ['Pilot Implementation', 'Days 31-90', 
-             '• Select high-impact function\n• Partner selection\n• Process documentation', 
-             '25% turnover reduction'],
-            ['Scale & Optimize', 'Days 91-180', 
-             '• Expand to additional functions\n• Technology integration\n• Staff development', 
-             '50% turnover reduction'],
-            ['Full Transformation', 'Days 181-365', 
-             '• Complete implementation\n• Continuous improvement\n• Performance monitoring', 
-             'Achieve 15% turnover rate']
-        ]
+        # Generate charts - in-memory PNGs or native vector drawings
+        with timed_stage(timings, 'charts'):
+            turnover_chart, savings_chart, roi_chart = self.create_chart_flowables(
+                metrics, hospital_name, context.chart_backend, timings, context.chart_profile
+            )
         
-        timeline_table = Table(timeline_data, colWidths=[2.0*inch, 1.1*inch, 2.5*inch, 1.8*inch])
-        timeline_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.brand_blue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('ALIGN', (0, 1), (1, -1), 'CENTER'),
-            ('ALIGN', (2, 1), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),  # Bigger
-            ('FONTSIZE', (0, 1), (-1, -1), 10),  # Bigger
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
-        
-        story.append(timeline_table)
-        
-        # Next Steps
-        story.append(PageBreak())
-        story.append(Paragraph("Your Next Steps", self.styles['CustomSubtitle']))
-        
-        next_steps_text = """
-        <font size="14"><b>1. Schedule Your Strategy Session (This Week)</b><br/>
-        Our RCM transformation experts will conduct a confidential review of your specific 
-        challenges and opportunities. This 60-minute session includes:<br/>
-        • Detailed analysis of your RCM department structure<br/>
-        • Identification of highest-impact outsourcing opportunities<br/>
-        • Customized implementation timeline<br/>
-        • ROI projections based on your actual data<br/>
-        <br/>
-        
-        <b>2. Receive Your Custom Transformation Plan (Within 5 Days)</b><br/>
-        Following our strategy session, you'll receive:<br/>
-        • Function-by-function outsourcing recommendations<br/>
-        • Vendor evaluation criteria specific to your needs<br/>
-        • Risk mitigation strategies<br/>
-        • Month-by-month implementation roadmap<br/>
-        <br/>
+        # Create filename
+        filename = context.filename or self.report_filename(hospital_name)
         
-        <b>3. Begin Your Pilot Program (Within 30 Days)</b><br/>
-        Start with your highest-turnover function to:<br/>
-        • Prove the ROI model with minimal risk<br/>
-        • Build internal confidence in the approach<br/>
-        • Refine processes before full-scale implementation<br/>
-        • Generate quick wins to fund expansion</font>
-        """
+        # Record which benchmark data the numbers came from in the PDF metadata
+        dataset_version = data_sources.get('dataset_version')
+        subject = f"Benchmark dataset {dataset_version}" if dataset_version else ''
         
-        story.append(Paragraph(next_steps_text, self.styles['CustomNormal']))
+        data = {
+            'context': context,
+            'metrics': metrics,
+            'charts': {'turnover': turnover_chart, 'savings': savings_chart, 'roi': roi_chart}
+        }
         
-        story.append(Spacer(1, 0.5*inch))
+        # The static last pages come prebuilt from the page cache when they can be merged
+        static_pages_key = self.template.static_pages_key(data) if static_page_cache.available else None
         
-        # Call to action box - BIGGER
-        cta_text = """
-        <para alignment="center">
-        <font size="20"><b>Ready to Transform Your RCM Workforce Challenges?</b></font><br/>
-        <br/>
-        <font size="18">Schedule Your Confidential Strategy Session Today</font><br/>
-        <br/>
-        <font size="16"><b>Call: 1-800-FROST-RCM</b><br/>
-        <b>Email: solutions@frost-arnett.com</b><br/>
-        <b>Web: www.frost-arnett.com/rcm-transformation</b></font><br/>
-        <br/>
-        <font size="14"><i>Mention reference code: STAFF-{} for priority scheduling</i></font>
-        </para>
-        """.format(datetime.now().strftime('%Y%m'))
-        
-        story.append(Paragraph(cta_text, self.styles['CustomNormal']))
+        # Create PDF - merged reports are always built in memory first
+        pdf_buffer = BytesIO() if context.in_memory or static_pages_key else None
+        doc = self.create_document(pdf_buffer or filename, subject)
+        story = self.template.story(data, self.template.dynamic_sections if static_pages_key else None)
         
         # Build PDF with header/footer
-        doc.build(story, onFirstPage=self.add_header_footer, onLaterPages=self.add_header_footer)
-        
-        # Clean up chart files
-        for chart in [turnover_chart, savings_chart, roi_chart]:
-            if os.path.exists(chart):
-                os.remove(chart)
-        
-        print(f"✅ Enhanced report generated successfully: {filename}")
-        return filename
+        with timed_stage(timings, 'doc_build'):
+            doc.build(story, onFirstPage=self.add_header_footer, onLaterPages=self.add_header_footer)
+        
+        if static_pages_key:
+            with timed_stage(timings, 'static_pages'):
+                first_page = doc.page + 1
+                # The header shows the month, so cached pages never outlive it
+                key = (type(self).__name__, static_pages_key, datetime.now().strftime('%B %Y'), first_page)
+                static_pages = static_page_cache.get_or_render(
+                    key, lambda: self.render_static_pages(data, first_page)
+                )
+                pdf_buffer = BytesIO(merge_pdfs([pdf_buffer.getvalue(), static_pages]))
+            if not context.in_memory:
+                with open(filename, 'wb') as f:
+                    f.write(pdf_buffer.getvalue())
+                pdf_buffer = None
+        timings['render'] = time.perf_counter() - report_start
+        timings['total'] = timings['render']
+        
+        print(f"✅ Enhanced report generated successfully: {filename}"
+              f"{' (in memory)' if pdf_buffer else ''}")
+        return ReportResult(
+            filename=filename,
+            metrics=metrics,
+            data_sources=data_sources or {'metrics': 'Industry average assumptions'},
+            timings=timings,
+            pdf_bytes=pdf_buffer.getvalue() if pdf_buffer else None
+        )
 
 
 # Test function
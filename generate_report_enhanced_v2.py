@@ -1,33 +1,69 @@
 # generate_report_enhanced_v2.py
 # Enhanced RCM Report Generator with Real Data Integration
 
-from generate_report_enhanced import EnhancedRCMReportGenerator
+import threading
+from generate_report_enhanced import (
+    BEST_PRACTICE_TURNOVER, PRODUCTIVITY_LOSS_FACTOR, QUALITY_IMPROVEMENT_FACTOR, TOTAL_IMPACT_FACTOR,
+    EnhancedRCMReportGenerator, ReportContext, chart_figure, save_chart
+)
+from chart_profiles import DEFAULT_CHART_PROFILE
 from data_sources import enhance_report_with_real_data
-import matplotlib.pyplot as plt
-import numpy as np
+from instrumentation import timed_stage
 from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+# Data-enhanced reports quote a fixed payback period
+DATA_ENHANCED_BREAK_EVEN_MONTHS = 8
 
 class DataEnhancedRCMReportGenerator(EnhancedRCMReportGenerator):
     """Enhanced report generator that uses real data sources"""
     
-    def generate_report(self, hospital_name, hospital_beds, recipient_name, recipient_email, state=None):
-        """Generate report with real data integration"""
+    def generate_report(self, hospital_name, hospital_beds, recipient_name, recipient_email, state=None,
+                        chart_backend='matplotlib'):
+        """Generate report with real data integration and return its filename"""
+        return self.build_report(
+            hospital_name, hospital_beds, recipient_name, recipient_email,
+            state=state, chart_backend=chart_backend
+        ).filename
+    
+    def build_report(self, hospital_name, hospital_beds, recipient_name, recipient_email, state=None,
+                     chart_backend='matplotlib', filename=None, in_memory=False,
+                     chart_profile=DEFAULT_CHART_PROFILE):
+        """Generate report with real data integration and return a ReportResult"""
         print(f"Generating data-enhanced report for {hospital_name} in {state}...")
+        context = ReportContext(
+            hospital_name=hospital_name,
+            hospital_beds=hospital_beds,
+            recipient_name=recipient_name,
+            recipient_email=recipient_email,
+            state=state,
+            chart_backend=chart_backend,
+            chart_profile=chart_profile,
+            filename=filename,
+            in_memory=in_memory
+        )
         
         # Get real data
-        self.real_data = enhance_report_with_real_data(hospital_name, hospital_beds, state)
+        with timed_stage(context.timings, 'data_collection'):
+            real_data = enhance_report_with_real_data(hospital_name, hospital_beds, state)
+        context.real_data = real_data
+        context.timings.update(real_data['timings'])
         
-        # Store state for use in other methods
-        self.state = state
+        # Record where the numbers came from alongside the rendered report
+        context.data_sources = dict(real_data['data_sources'])
+        context.data_sources['cms_match'] = real_data['cms_data'].get('found', False)
+        context.data_sources['generated_date'] = real_data['generated_date']
+        context.data_sources['dataset_version'] = real_data['dataset_version']
         
-        # Call parent method
-        return super().generate_report(hospital_name, hospital_beds, recipient_name, recipient_email)
+        result = self.render(context)
+        result.timings['total'] = result.timings['data_collection'] + result.timings['render']
+        return result
     
-    def calculate_metrics(self, hospital_beds, hospital_name):
-        """Override to use real data when available"""
-        if hasattr(self, 'real_data') and self.real_data:
-            analysis = self.real_data['analysis']
+    def calculate_metrics(self, hospital_beds, hospital_name, context=None):
+        """Override to use real data when the context carries it"""
+        if context is not None and context.real_data:
+            analysis = context.real_data['analysis']
             
             # Use real data with enhanced calculations
             metrics = {
@@ -37,13 +73,13 @@ class DataEnhancedRCMReportGenerator(EnhancedRCMReportGenerator):
                 'potential_savings': analysis['potential_savings'],
                 'reduced_cost': analysis['best_practice_cost'],
                 'staff_turning_over_now': analysis['annual_staff_turnover'],
-                'staff_turning_over_optimized': int(analysis['estimated_rcm_staff'] * 0.15),
-                'productivity_loss': int(analysis['potential_savings'] * 0.3),
-                'quality_improvement': int(analysis['potential_savings'] * 0.15),
-                'total_impact': int(analysis['potential_savings'] * 1.45),
+                'staff_turning_over_optimized': int(analysis['estimated_rcm_staff'] * BEST_PRACTICE_TURNOVER),
+                'productivity_loss': int(analysis['potential_savings'] * PRODUCTIVITY_LOSS_FACTOR),
+                'quality_improvement': int(analysis['potential_savings'] * QUALITY_IMPROVEMENT_FACTOR),
+                'total_impact': int(analysis['potential_savings'] * TOTAL_IMPACT_FACTOR),
                 'cost_per_bed': int(analysis['total_turnover_cost'] / hospital_beds),
                 'savings_per_bed': int(analysis['potential_savings'] / hospital_beds),
-                'break_even_months': 8,
+                'break_even_months': DATA_ENHANCED_BREAK_EVEN_MONTHS,
                 # New real data fields
                 'average_salary': analysis['average_rcm_salary'],
                 'regional_factor': analysis['regional_cost_factor'],
@@ -58,16 +94,16 @@ class DataEnhancedRCMReportGenerator(EnhancedRCMReportGenerator):
             return metrics
         else:
             # Fallback to parent implementation
-            return super().calculate_metrics(hospital_beds, hospital_name)
+            return super().calculate_metrics(hospital_beds, hospital_name, context)
     
-    def create_enhanced_turnover_chart(self, metrics, hospital_name):
+    def create_enhanced_turnover_chart(self, metrics, hospital_name, profile=None):
         """Create an enhanced chart showing function-specific turnover rates"""
         if 'function_turnover' not in metrics:
             # Use parent method if no function data
-            return super().create_turnover_comparison_chart(metrics, hospital_name)
+            return super().create_turnover_comparison_chart(metrics, hospital_name, profile)
         
-        plt.style.use('seaborn-v0_8-darkgrid')
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 7))
+        fig = chart_figure(figsize=(14, 7))
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Left chart - Overall comparison (same as parent)
         categories = [f'{hospital_name}\n(Current)', 'Industry\nAverage', 'Best\nPractice']
@@ -125,19 +161,14 @@ class DataEnhancedRCMReportGenerator(EnhancedRCMReportGenerator):
         ax2.axvline(x=15, color='green', linestyle='--', alpha=0.7, linewidth=2)
         ax2.text(15, -0.5, 'Target', ha='center', fontsize=12, color='green')
         
-        plt.tight_layout()
-        chart_filename = f'enhanced_turnover_chart_{hospital_name.replace(" ", "_")}.png'
-        plt.savefig(chart_filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
-        
-        return chart_filename
+        return save_chart(fig, profile)
     
-    def add_regional_data_section(self, story, metrics, hospital_name):
+    def add_regional_data_section(self, story, metrics, hospital_name, state=None):
         """Add a new section showing regional data insights"""
         story.append(Paragraph("Regional Market Analysis", self.styles['CustomSubtitle']))
         
         # Get state name
-        state_name = self.state if hasattr(self, 'state') else 'your region'
+        state_name = state or 'your region'
         
         regional_text = f"""
         <font size="14">Based on real-time data from the Bureau of Labor Statistics and CMS, 
@@ -212,12 +243,27 @@ class DataEnhancedRCMReportGenerator(EnhancedRCMReportGenerator):
         return story
 
 
+# One warm generator per process - it keeps no per-request state, so threads can share it
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_generator() -> DataEnhancedRCMReportGenerator:
+    """The process-wide DataEnhancedRCMReportGenerator"""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = DataEnhancedRCMReportGenerator()
+    return _generator
+
+
 # Test function
 def test_data_enhanced_report():
     """Test the data-enhanced report generator"""
     print("\n🚀 Testing Data-Enhanced Report Generation...\n")
     
-    generator = DataEnhancedRCMReportGenerator()
+    generator = get_generator()
     
     # Test data - try different states to see regional variations
     test_cases = [
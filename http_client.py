@@ -0,0 +1,229 @@
+# http_client.py
+# Shared, connection-pooled HTTP clients for outbound calls (CMS, Clay)
+
+import asyncio
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+
+# Client settings - override with environment variables
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_READ_TIMEOUT_SECONDS = float(os.environ.get("HTTP_READ_TIMEOUT_SECONDS", "10"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "20"))
+HTTP_POOL_PER_HOST = int(os.environ.get("HTTP_POOL_PER_HOST", "10"))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+# Retries for lookups a request is waiting on (read timeouts are never retried there)
+HTTP_INLINE_RETRIES = int(os.environ.get("HTTP_INLINE_RETRIES", "1"))
+HTTP_BACKOFF_SECONDS = float(os.environ.get("HTTP_BACKOFF_SECONDS", "0.5"))
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_SECONDS", "30"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+_sessions = {}
+_session_lock = threading.Lock()
+
+
+def get_session(inline: bool = False):
+    """Process-wide requests.Session with keep-alive, bounded pools and retries
+
+    Idempotent requests are retried with exponential backoff on connection
+    errors and on 429/5xx responses. The inline session is for calls a report
+    render is waiting on: it retries HTTP_INLINE_RETRIES times and never after
+    a read timeout, so a hanging server costs one timeout rather than
+    HTTP_RETRIES + 1. requests is only imported here, so the web process
+    (which only uses the async client) never loads it.
+    """
+    session = _sessions.get(inline)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(inline)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                class _TimeoutSession(requests.Session):
+                    """Session that applies the configured timeouts unless a call overrides them"""
+
+                    def request(self, method, url, **kwargs):
+                        kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_READ_TIMEOUT_SECONDS))
+                        return super().request(method, url, **kwargs)
+
+                retry = Retry(
+                    total=HTTP_INLINE_RETRIES if inline else HTTP_RETRIES,
+                    read=0 if inline else None,
+                    backoff_factor=HTTP_BACKOFF_SECONDS,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=IDEMPOTENT_METHODS,
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_SIZE,
+                    pool_maxsize=HTTP_POOL_PER_HOST,
+                    max_retries=retry
+                )
+                session = _TimeoutSession()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _sessions[inline] = session
+    return session
+
+
+class AsyncHTTPClient:
+    """Pooled httpx.AsyncClient with per-host concurrency limits and retries"""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, per_host: int = HTTP_POOL_PER_HOST,
+                 retries: int = HTTP_RETRIES, backoff: float = HTTP_BACKOFF_SECONDS):
+        self.pool_size = pool_size
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self._client = None
+        self._loop = None
+        self._host_limits = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # Clients are tied to the loop they were created on
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(HTTP_READ_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=HTTP_KEEPALIVE_SECONDS
+                )
+            )
+            self._loop = loop
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def request(self, method: str, url: str, retry_unsafe: bool = False, **kwargs) -> httpx.Response:
+        """Send a request, retrying with exponential backoff and jitter
+
+        Connection failures (nothing reached the server) are always retried.
+        Timeouts and 429/5xx responses are only retried for idempotent methods
+        unless retry_unsafe is set, e.g. when the call carries an idempotency key.
+        """
+        client = self._get_client()
+        retry_responses = retry_unsafe or method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                async with self._host_limit(url):
+                    response = await client.request(method, url, **kwargs)
+                if not (retry_responses and response.status_code in RETRY_STATUSES) or last_attempt:
+                    return response
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if last_attempt:
+                    raise
+            except httpx.TransportError:
+                if last_attempt or not retry_responses:
+                    raise
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+# Shared async client for the web handlers
+async_http = AsyncHTTPClient()
+
+
+# Test the clients against a local stub server
+def test_http_client():
+    """Check retries and connection reuse against a stub that fails twice"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    print("\n🚀 Testing HTTP clients...\n")
+
+    state = {"requests": 0, "hangs": 0, "connections": set()}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self):
+            if self.path.startswith("/hang"):
+                # Answer too late for the client's read timeout
+                state["hangs"] += 1
+                time.sleep(0.5)
+                return
+            state["requests"] += 1
+            state["connections"].add(self.client_address)
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            status = 503 if state["requests"] in (1, 2) else 200
+            body = b'{"ok": true}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = _respond
+        do_POST = _respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/stub"
+
+    try:
+        # Sync GET retries through two 503s
+        response = get_session().get(url)
+        assert response.status_code == 200 and state["requests"] == 3, state
+        for _ in range(5):
+            get_session().get(url)
+        assert len(state["connections"]) <= 3, "sync session did not reuse connections"
+
+        # Inline lookups give up after one read timeout instead of retrying it
+        try:
+            get_session(inline=True).get(url.replace("/stub", "/hang"), timeout=(1, 0.1))
+            timed_out = False
+        except Exception as e:
+            timed_out = "timed out" in str(e).lower()
+        assert timed_out and state["hangs"] == 1, state
+
+        async def exercise_async():
+            client = AsyncHTTPClient(backoff=0.01)
+            state["requests"] = 0
+            state["connections"].clear()
+            response = await client.post(url, json={"a": 1}, retry_unsafe=True)
+            assert response.status_code == 200 and state["requests"] == 3, state
+            await asyncio.gather(*[client.get(url) for _ in range(10)])
+            await client.aclose()
+
+        asyncio.run(exercise_async())
+    finally:
+        server.shutdown()
+
+    print("✅ HTTP clients retry and keep connections alive")
+
+
+if __name__ == "__main__":
+    test_http_client()
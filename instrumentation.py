@@ -0,0 +1,157 @@
+# instrumentation.py
+# Stage timings and Prometheus-format metrics for the report pipeline
+#
+# Render workers record how long each stage took in the report's timings
+# dict (see timed_stage). The web process feeds those timings into its
+# histograms when a render comes back, so /metrics covers every worker
+# without any shared state between processes.
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@contextmanager
+def timed_stage(timings: Dict, stage: str):
+    """Add the time spent in the with-block to timings[stage]"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs: Iterable[Tuple[str, object]]) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with optional labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, dict(values, counts=list(values['counts']))) for key, values in self._series.items())
+        for key, values in series:
+            label_pairs = list(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, values['counts']):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(label_pairs + [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(label_pairs)} {_number(values['sum'])}")
+            lines.append(f"{self.name}_count{_labels(label_pairs)} {values['count']}")
+        return lines
+
+
+def metric_family(name: str, help_text: str, kind: str, samples: List[Tuple[Dict, float]]) -> List[str]:
+    """Exposition lines for a gauge or counter given (labels, value) samples"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(sorted(labels.items()))} {_number(value)}")
+    return lines
+
+
+# Histograms shared by the web process
+report_stage_seconds = Histogram(
+    "rcm_report_stage_seconds",
+    "Time spent in each report pipeline stage inside a render worker",
+    ("stage",)
+)
+report_render_seconds = Histogram(
+    "rcm_report_render_seconds",
+    "Wall time from submitting a report to the pool until it is ready, queueing included"
+)
+clay_post_seconds = Histogram(
+    "rcm_clay_post_seconds",
+    "Latency of each Clay webhook delivery attempt",
+    ("outcome",)
+)
+HISTOGRAMS = (report_stage_seconds, report_render_seconds, clay_post_seconds)
+
+
+def observe_report_timings(timings: Dict):
+    """Record a finished report's per-stage timings"""
+    for stage, seconds in timings.items():
+        report_stage_seconds.observe(seconds, stage=stage)
+
+
+def render_metrics(families: Iterable[List[str]] = ()) -> str:
+    """The full /metrics page: the shared histograms plus any collected families"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.exposition()
+    for family in families:
+        lines += family
+    return "\n".join(lines) + "\n"
+
+
+# Test the exposition format
+def test_instrumentation():
+    """Histogram buckets are cumulative and labels are escaped"""
+    print("\n🚀 Testing Instrumentation...\n")
+
+    histogram = Histogram("test_seconds", "Test latencies", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage='doc"build')
+    lines = histogram.exposition()
+    assert 'test_seconds_bucket{stage="doc\\"build",le="0.1"} 1' in lines, lines
+    assert 'test_seconds_bucket{stage="doc\\"build",le="1.0"} 3' in lines, lines
+    assert 'test_seconds_bucket{stage="doc\\"build",le="+Inf"} 4' in lines, lines
+    assert 'test_seconds_count{stage="doc\\"build"} 4' in lines, lines
+
+    timings = {}
+    with timed_stage(timings, 'metrics'):
+        time.sleep(0.01)
+    with timed_stage(timings, 'metrics'):
+        pass
+    assert timings['metrics'] >= 0.01
+
+    assert metric_family("queue_depth", "Queued", "gauge", [({'status': 'queued'}, 3)])[-1] == 'queue_depth{status="queued"} 3'
+
+    print("✅ Histograms and gauges render in Prometheus text format")
+
+
+if __name__ == "__main__":
+    test_instrumentation()
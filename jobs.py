@@ -0,0 +1,273 @@
+# jobs.py
+# Persistent report job queue so API callers don't hold connections open during renders
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from artifact_store import publish_report
+from render_pool import RenderQueueFull, RENDER_WORKERS
+from report_cache import render_report_cached
+
+
+# Job storage and dispatch settings
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", "jobs.db")
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", RENDER_WORKERS))
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "1.0"))
+
+
+class JobStore:
+    """SQLite-backed queue of report jobs that survives process restarts
+
+    Every method blocks on SQLite, so async callers run them with asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    filename TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, params: Dict) -> str:
+        """Queue a new job and return its ID"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(params), time.time())
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def claim_next(self) -> Optional[Dict]:
+        """Atomically move the oldest queued job to running"""
+        with self._connect() as conn:
+            row = conn.execute("""
+                UPDATE jobs SET status = 'running', started_at = ?
+                WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1)
+                RETURNING *
+            """, (time.time(),)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def mark_done(self, job_id: str, filename: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', filename = ?, finished_at = ? WHERE id = ?",
+                (filename, time.time(), job_id)
+            )
+
+    def mark_failed(self, job_id: str, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (error, time.time(), job_id)
+            )
+
+    def requeue(self, job_id: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE id = ?",
+                (job_id,)
+            )
+
+    def requeue_interrupted(self) -> int:
+        """Put jobs that were running when the process died back in the queue"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+def describe_job(job: Dict) -> Dict:
+    """Public view of a job for the status endpoint"""
+    now = time.time()
+    started = job['started_at']
+    finished = job['finished_at']
+
+    description = {
+        "job_id": job['id'],
+        "status": job['status'],
+        "hospital_name": job['params'].get('hospital_name'),
+        "created_at": job['created_at'],
+        "started_at": started,
+        "finished_at": finished,
+        "timings": {
+            "queued_seconds": round((started or now) - job['created_at'], 3),
+            "render_seconds": round((finished or now) - started, 3) if started else None
+        }
+    }
+    if job['status'] == 'done':
+        description["filename"] = job['filename']
+        description["report_url"] = f"/reports/{job['filename']}"
+    if job['status'] == 'failed':
+        description["error"] = job['error']
+    return description
+
+
+class JobRunner:
+    """Background task that feeds queued jobs into the render pool"""
+
+    def __init__(self, store: JobStore, concurrency: int = JOB_CONCURRENCY):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self._running = 0
+        self._wakeup = None
+        self._task = None
+        # Strong references so in-flight jobs are not garbage collected
+        self._job_tasks = set()
+
+    def start(self):
+        requeued = self.store.requeue_interrupted()
+        if requeued:
+            print(f"Requeued {requeued} interrupted report jobs")
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        """Stop dispatching and cancel running jobs
+
+        Cancelled jobs stay marked running, so the next start() requeues them.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        job_tasks = list(self._job_tasks)
+        for task in job_tasks:
+            task.cancel()
+        await asyncio.gather(*job_tasks, return_exceptions=True)
+
+    def notify(self):
+        """Wake the dispatcher after a job is queued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _dispatch_loop(self):
+        while True:
+            while self._running < self.concurrency:
+                job = await asyncio.to_thread(self.store.claim_next)
+                if job is None:
+                    break
+                self._running += 1
+                task = asyncio.create_task(self._run_job(job))
+                self._job_tasks.add(task)
+                task.add_done_callback(self._job_tasks.discard)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, job: Dict):
+        pool_full = False
+        try:
+            result = await render_report_cached(**job['params'], in_memory=True)
+            artifact = await publish_report(result)
+            await asyncio.to_thread(self.store.mark_done, job['id'], artifact.name)
+        except RenderQueueFull:
+            # Interactive requests filled the pool - retry after the poll interval
+            pool_full = True
+            await asyncio.to_thread(self.store.requeue, job['id'])
+        except Exception as e:
+            await asyncio.to_thread(self.store.mark_failed, job['id'], str(e))
+        finally:
+            self._running -= 1
+            if not pool_full:
+                self.notify()
+
+
+# Test the job lifecycle on a temporary database
+def test_job_store():
+    """Jobs move queued -> running -> done/failed and interrupted jobs are resumed"""
+    import tempfile
+
+    print("\n🚀 Testing Job Store...\n")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "jobs.db")
+        store = JobStore(db_path)
+        first = store.create({'hospital_name': "First Hospital", 'hospital_beds': 300})
+        second = store.create({'hospital_name': "Second Hospital", 'hospital_beds': 400})
+        third = store.create({'hospital_name': "Third Hospital", 'hospital_beds': 500})
+        assert store.get(first)['status'] == 'queued'
+        assert store.get(first)['params'] == {'hospital_name': "First Hospital", 'hospital_beds': 300}
+        assert store.get("missing") is None
+
+        # Claimed oldest first, each job only once
+        job = store.claim_next()
+        assert job['id'] == first and job['status'] == 'running' and job['started_at']
+        store.mark_done(first, "abc123_report.pdf")
+        done = describe_job(store.get(first))
+        assert done['status'] == 'done' and done['report_url'] == "/reports/abc123_report.pdf"
+
+        assert store.claim_next()['id'] == second
+        store.mark_failed(second, "render failed")
+        assert describe_job(store.get(second))['error'] == "render failed"
+
+        # A full render pool puts the job back in the queue
+        assert store.claim_next()['id'] == third
+        store.requeue(third)
+        assert store.get(third)['status'] == 'queued' and store.get(third)['started_at'] is None
+
+        # Jobs left running by a process that died are queued again on startup
+        assert store.claim_next()['id'] == third
+        assert store.claim_next() is None
+        restarted = JobStore(db_path)
+        assert restarted.requeue_interrupted() == 1
+        assert restarted.counts() == {'done': 1, 'failed': 1, 'queued': 1}
+        assert restarted.claim_next()['id'] == third
+
+    print("✅ Jobs are claimed once, finish or fail, and resume after a restart")
+
+
+if __name__ == "__main__":
+    test_job_store()
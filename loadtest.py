@@ -0,0 +1,362 @@
+# loadtest.py
+# Local load test for the report endpoints against stubbed CMS and Clay servers
+#
+#     python loadtest.py --concurrency 1,4,8 --duration 30 --render-workers 2
+#
+# Starts the app under uvicorn in a scratch directory with CMS_API_URL and
+# CLAY_WEBHOOK_URL pointed at a local stub, then drives /generate,
+# /api/generate and /webhook/send-to-clay at each concurrency level and
+# reports throughput, latency percentiles, error rate and server memory
+# growth. Pass --url to load an already running server instead.
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+
+LOADTEST_STARTUP_SECONDS = float(os.environ.get("LOADTEST_STARTUP_SECONDS", "120"))
+LOADTEST_TIMEOUT_SECONDS = float(os.environ.get("LOADTEST_TIMEOUT_SECONDS", "120"))
+
+ENDPOINTS = ('/generate', '/api/generate', '/webhook/send-to-clay')
+STATES = ('TX', 'CA', 'OH', 'NY', 'FL', 'PA')
+
+
+class StubServer:
+    """CMS datastore and Clay webhook stand-ins on one local port"""
+
+    def __init__(self, cms_delay: float = 0.0, clay_delay: float = 0.0):
+        self.counts = {'cms': 0, 'clay': 0}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_json(self, body: Dict):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                stub.counts['cms'] += 1
+                time.sleep(cms_delay)
+                self._send_json({'results': [{
+                    'hospital_name': 'Load Test Hospital',
+                    'provider_id': '000000',
+                    'state': 'TX',
+                    'city': 'Springfield',
+                    'hospital_type': 'Acute Care Hospitals',
+                    'hospital_ownership': 'Voluntary non-profit - Private',
+                    'emergency_services': 'Yes',
+                    'hospital_overall_rating': '4'
+                }]})
+
+            def do_POST(self):
+                stub.counts['clay'] += 1
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(clay_delay)
+                self._send_json({'ok': True})
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Resident bytes of a process and all its descendants (Linux /proc), None elsewhere"""
+    total, pending = 0, [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending += [int(child) for child in f.read().split()]
+    except (OSError, ValueError):
+        return total or None
+    return total
+
+
+def start_server(stub_url: str, work_dir: str, env_overrides: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    """Launch the app under uvicorn with outbound calls pointed at the stub"""
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        'CMS_API_URL': f"{stub_url}/cms",
+        'CLAY_WEBHOOK_URL': f"{stub_url}/clay",
+        'PYTHONPATH': os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)),
+                                                    env.get('PYTHONPATH')]))
+    })
+    env.update(env_overrides)
+    # The report generators print per request - keep that out of the results
+    with open(os.path.join(work_dir, "server.log"), "w") as log:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def wait_until_ready(base_url: str, server: Optional[subprocess.Popen]):
+    """Wait for /health and for the render workers to finish warming up"""
+    deadline = time.time() + LOADTEST_STARTUP_SECONDS
+    async with httpx.AsyncClient(timeout=5) as client:
+        while time.time() < deadline:
+            if server is not None and server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode} during startup")
+            try:
+                health = (await client.get(f"{base_url}/health")).json()
+                if health['render_pool'].get('warm', True):
+                    return
+            except (httpx.HTTPError, ValueError, KeyError):
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} was not ready after {LOADTEST_STARTUP_SECONDS:.0f}s")
+
+
+def request_form(sequence: int, distinct: int, chart_backend: str,
+                 chart_profile: Optional[str] = None) -> Dict[str, str]:
+    """Form fields for the sequence-th request to an endpoint; distinct bounds how many different reports are asked for"""
+    hospital = sequence % distinct
+    form = {
+        'hospital_name': f"Load Test Hospital {hospital}",
+        # Data-enhanced reports need at least 120 beds to have any turnover to chart
+        'hospital_beds': str(120 + (hospital * 37) % 1400),
+        'recipient_name': "Load Tester",
+        'recipient_email': f"loadtest{hospital}@example.com",
+        'state': STATES[hospital % len(STATES)],
+        'chart_backend': chart_backend,
+        'original_subject': "STAFFING"
+    }
+    # Without a profile each endpoint uses its own default (Clay sends email-preview charts)
+    if chart_profile:
+        form['chart_profile'] = chart_profile
+    return form
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, endpoints: List[str],
+                    distinct: int, chart_backend: str, server_pid: Optional[int], offset: int,
+                    chart_profile: Optional[str] = None) -> Dict:
+    """Keep concurrency requests in flight for duration seconds and summarize them"""
+    samples = []
+    sequence = iter(range(offset, offset + 10 ** 9))
+    rss_start = process_tree_rss(server_pid) if server_pid else None
+    rss_peak = rss_start
+
+    async def client_loop(client: httpx.AsyncClient, stop_at: float):
+        while time.perf_counter() < stop_at:
+            number = next(sequence)
+            # Endpoints rotate on the request number and hospitals on the round, so every
+            # endpoint sees every hospital rather than the subset that shares its remainder
+            endpoint = endpoints[number % len(endpoints)]
+            form = request_form(number // len(endpoints), distinct, chart_backend, chart_profile)
+            started = time.perf_counter()
+            clay_webhook_status = None
+            try:
+                response = await client.post(f"{base_url}{endpoint}", data=form)
+                status = response.status_code
+                body = {}
+                if response.headers.get("content-type", "").startswith("application/json"):
+                    body = response.json()
+                # /api/generate reports render failures in a 200 body
+                ok = 200 <= status < 300 and body.get("status") != "error"
+                # send-to-clay says whether a webhook was queued or deduplicated
+                clay_webhook_status = body.get("clay_webhook_status")
+            except (httpx.HTTPError, ValueError):
+                status, ok = None, False
+            samples.append({'endpoint': endpoint, 'seconds': time.perf_counter() - started,
+                            'status': status, 'ok': ok, 'clay_webhook_status': clay_webhook_status})
+
+    async def watch_memory(stop_at: float):
+        nonlocal rss_peak
+        while time.perf_counter() < stop_at and server_pid:
+            rss = process_tree_rss(server_pid)
+            if rss is not None:
+                rss_peak = max(rss_peak or 0, rss)
+            await asyncio.sleep(0.5)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=LOADTEST_TIMEOUT_SECONDS, limits=limits) as client:
+        started = time.perf_counter()
+        stop_at = started + duration
+        await asyncio.gather(watch_memory(stop_at), *[client_loop(client, stop_at) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    rss_end = process_tree_rss(server_pid) if server_pid else None
+
+    def latency(selected):
+        seconds = [sample['seconds'] for sample in selected if sample['ok']]
+        return {name: percentile(seconds, fraction) for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))}
+
+    ok_count = sum(1 for sample in samples if sample['ok'])
+    statuses = {}
+    clay_webhooks = {}
+    for sample in samples:
+        statuses[str(sample['status'])] = statuses.get(str(sample['status']), 0) + 1
+        if sample['clay_webhook_status']:
+            clay_webhooks[sample['clay_webhook_status']] = clay_webhooks.get(sample['clay_webhook_status'], 0) + 1
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(ok_count / elapsed, 3) if elapsed else 0.0,
+        'error_rate': round(1 - ok_count / len(samples), 4) if samples else 0.0,
+        'statuses': statuses,
+        # Only 'queued' webhooks reach the outbox; 'already_queued' ones were deduplicated
+        'clay_webhooks': clay_webhooks,
+        'latency': latency(samples),
+        'endpoints': {
+            endpoint: dict(latency([s for s in samples if s['endpoint'] == endpoint]),
+                           requests=sum(1 for s in samples if s['endpoint'] == endpoint))
+            for endpoint in endpoints
+        },
+        'rss_start_mb': round(rss_start / 2 ** 20, 1) if rss_start else None,
+        'rss_peak_mb': round(rss_peak / 2 ** 20, 1) if rss_peak else None,
+        'rss_end_mb': round(rss_end / 2 ** 20, 1) if rss_end else None,
+        'rss_growth_mb': round((rss_end - rss_start) / 2 ** 20, 1) if rss_start and rss_end else None
+    }
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1000:8.0f}" if seconds is not None else "       -"
+
+
+def print_level(level: Dict):
+    latency = level['latency']
+    growth = level['rss_growth_mb']
+    print(f"  c={level['concurrency']:<3} {level['requests']:6d} req  {level['throughput_rps']:7.2f} req/s  "
+          f"p50 {_ms(latency['p50'])} ms  p95 {_ms(latency['p95'])} ms  p99 {_ms(latency['p99'])} ms  "
+          f"errors {level['error_rate']:6.1%}  rss {level['rss_end_mb'] or '-'} MB"
+          f"{f' ({growth:+.1f})' if growth is not None else ''}")
+    webhooks = level['clay_webhooks']
+    if webhooks:
+        print(f"        clay webhooks: {webhooks.get('queued', 0)} queued, "
+              f"{webhooks.get('already_queued', 0)} already queued")
+
+
+async def run_load_test(args) -> List[Dict]:
+    env_overrides = dict(item.split("=", 1) for item in args.env)
+    if args.render_workers:
+        env_overrides['RENDER_WORKERS'] = str(args.render_workers)
+    if args.queue_limit is not None:
+        env_overrides['RENDER_QUEUE_LIMIT'] = str(args.queue_limit)
+    if args.http_pool_size:
+        env_overrides['HTTP_POOL_SIZE'] = str(args.http_pool_size)
+
+    stub = server = None
+    work_dir = tempfile.TemporaryDirectory(prefix="loadtest-")
+    try:
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            stub = StubServer(cms_delay=args.cms_delay, clay_delay=args.clay_delay)
+            stub.start()
+            server, base_url = start_server(stub.url, work_dir.name, env_overrides)
+            print(f"🚀 Started app at {base_url} (stubs at {stub.url}, settings {env_overrides or 'default'})")
+
+        await wait_until_ready(base_url, server)
+        server_pid = server.pid if server else None
+
+        levels = []
+        for concurrency in args.concurrency:
+            # Carry on through the hospital list so a level doesn't replay the last one's reports
+            sent = sum(level['requests'] for level in levels)
+            level = await run_level(base_url, concurrency, args.duration, args.endpoints, args.distinct,
+                                    args.chart_backend, server_pid, offset=sent, chart_profile=args.chart_profile)
+            levels.append(level)
+            print_level(level)
+
+        if stub is not None:
+            print(f"📡 Stub traffic: {stub.counts['cms']} CMS lookups, {stub.counts['clay']} Clay deliveries")
+        return levels
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if stub is not None:
+            stub.stop()
+        work_dir.cleanup()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="loadtest",
+        description="Measure report throughput, latency and memory at several concurrency levels"
+    )
+    parser.add_argument("--concurrency", type=lambda value: [int(part) for part in value.split(",")],
+                        default=[1, 4, 8], help="Comma-separated concurrent clients per level (default: 1,4,8)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per concurrency level")
+    parser.add_argument("--endpoints", type=lambda value: value.split(","), default=list(ENDPOINTS),
+                        help="Comma-separated endpoints to drive in rotation")
+    parser.add_argument("--distinct", type=int, default=1000,
+                        help="Distinct hospitals to cycle through (lower = more report cache hits)")
+    parser.add_argument("--chart-backend", choices=('matplotlib', 'vector'), default="matplotlib")
+    parser.add_argument("--chart-profile", choices=('email-preview', 'screen', 'print'),
+                        help="Chart output profile to request (default: each endpoint's own)")
+    parser.add_argument("--render-workers", type=int, help="RENDER_WORKERS for the server under test")
+    parser.add_argument("--queue-limit", type=int, help="RENDER_QUEUE_LIMIT for the server under test")
+    parser.add_argument("--http-pool-size", type=int, help="HTTP_POOL_SIZE for the server under test")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the server under test (repeatable)")
+    parser.add_argument("--cms-delay", type=float, default=0.05, help="Stub CMS response delay in seconds")
+    parser.add_argument("--clay-delay", type=float, default=0.05, help="Stub Clay response delay in seconds")
+    parser.add_argument("--url", help="Load an already running server instead of starting one")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    levels = asyncio.run(run_load_test(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+                       'levels': levels}, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# metrics_engine.py
+# Columnar metrics for whole hospital populations (e.g. the full CMS list)
+#
+# Produces exactly the numbers the per-report scalar path produces:
+#   data_enhanced_metrics -> HealthcareDataCollector.analyze_hospital_characteristics
+#                            + DataEnhancedRCMReportGenerator.calculate_metrics
+#   enhanced_metrics      -> EnhancedRCMReportGenerator.calculate_metrics
+# Every float expression keeps the scalar code's operation order and every
+# int() becomes a truncating astype, so results match value for value. The
+# model constants are imported from the scalar modules so the two can't drift.
+
+import numpy as np
+import pandas as pd
+
+from benchmark_dataset import BenchmarkDataset, get_dataset
+from data_sources import ANALYSIS_BEST_PRACTICE_TURNOVER, ANALYSIS_REPLACEMENT_COST_MULTIPLIER
+from generate_report_enhanced import (
+    AVERAGE_RCM_SALARY, AVERAGE_RCM_STAFF_PER_BED, BEST_PRACTICE_TURNOVER, CURRENT_TURNOVER_RATE,
+    IMPLEMENTATION_COST, PRODUCTIVITY_LOSS_FACTOR, QUALITY_IMPROVEMENT_FACTOR, REPLACEMENT_COST_MULTIPLIER,
+    TOTAL_IMPACT_FACTOR
+)
+from generate_report_enhanced_v2 import DATA_ENHANCED_BREAK_EVEN_MONTHS
+
+
+def _beds_array(beds) -> np.ndarray:
+    beds = np.asarray(beds, dtype=np.int64)
+    if beds.ndim != 1:
+        raise ValueError("beds must be one-dimensional")
+    if (beds <= 0).any():
+        raise ValueError("beds must be positive for every hospital")
+    return beds
+
+
+def _truncate(values: np.ndarray) -> np.ndarray:
+    """Vector equivalent of int() on floats"""
+    return np.trunc(values).astype(np.int64)
+
+
+def _state_tables(states: np.ndarray, dataset: BenchmarkDataset):
+    """Average salary and cost factor for each distinct state, then spread to rows"""
+    unique_states, row_index = np.unique(states, return_inverse=True)
+
+    cost_factor = np.array([dataset.cost_factor(state) for state in unique_states])
+    wage_tables = [dataset.wage_table(state) for state in unique_states]
+
+    # sum() in the scalar path starts from 0 and adds roles in weight order
+    avg_salary = np.zeros(len(unique_states))
+    for role, weight in dataset.rcm_role_weights.items():
+        mean_annual = np.array([float(table[role]['mean_annual']) for table in wage_tables])
+        avg_salary = avg_salary + mean_annual * weight
+    avg_salary = _truncate(avg_salary * cost_factor)
+
+    return avg_salary[row_index], cost_factor[row_index]
+
+
+def data_enhanced_metrics(beds, states=None, dataset: BenchmarkDataset = None) -> pd.DataFrame:
+    """Staffing and turnover metrics for many hospitals at once
+
+    beds is an array-like of bed counts; states is an array-like of state
+    codes (missing or blank states use the national figures, like 'US').
+    Returns one row per hospital with the analysis and report metric columns.
+    """
+    beds = _beds_array(beds)
+    if states is None:
+        states = np.full(len(beds), 'US', dtype=object)
+    else:
+        states = pd.Series(states, dtype=object).fillna('').astype(str)
+        states = states.where(states != '', 'US').to_numpy(dtype=object)
+        if len(states) != len(beds):
+            raise ValueError("beds and states must be the same length")
+
+    dataset = dataset or get_dataset()
+    ratios = dataset.staffing_benchmarks['rcm_staff_per_bed']
+    small = beds < 100
+    medium = (beds >= 100) & (beds < 300)
+    size_category = np.select([small, medium], ['small_hospital', 'medium_hospital'], 'large_hospital')
+    staff_ratio = np.select(
+        [small, medium], [ratios['small_hospital'], ratios['medium_hospital']], ratios['large_hospital']
+    )
+
+    avg_salary, cost_factor = _state_tables(states, dataset)
+
+    turnover_rate = dataset.staffing_benchmarks['turnover_rates_by_function']['overall_rcm']
+    estimated_staff = _truncate(beds * staff_ratio)
+    annual_turnover = _truncate(estimated_staff * turnover_rate)
+    replacement_cost = avg_salary * ANALYSIS_REPLACEMENT_COST_MULTIPLIER
+    total_turnover_cost = _truncate(annual_turnover * replacement_cost)
+    best_practice_annual_turnover = _truncate(estimated_staff * ANALYSIS_BEST_PRACTICE_TURNOVER)
+    best_practice_cost = _truncate(best_practice_annual_turnover * replacement_cost)
+    potential_savings = total_turnover_cost - best_practice_cost
+
+    return pd.DataFrame({
+        'hospital_beds': beds,
+        'state': states,
+        'hospital_size_category': size_category,
+        'regional_cost_factor': cost_factor,
+        'staff_per_bed_ratio': staff_ratio,
+        'average_salary': avg_salary,
+        'estimated_rcm_staff': estimated_staff,
+        'current_turnover_rate': turnover_rate,
+        'staff_turning_over_now': annual_turnover,
+        'staff_turning_over_optimized': best_practice_annual_turnover,
+        'current_turnover_cost': total_turnover_cost,
+        'reduced_cost': best_practice_cost,
+        'potential_savings': potential_savings,
+        'productivity_loss': _truncate(potential_savings * PRODUCTIVITY_LOSS_FACTOR),
+        'quality_improvement': _truncate(potential_savings * QUALITY_IMPROVEMENT_FACTOR),
+        'total_impact': _truncate(potential_savings * TOTAL_IMPACT_FACTOR),
+        'cost_per_bed': _truncate(total_turnover_cost / beds),
+        'savings_per_bed': _truncate(potential_savings / beds),
+        'break_even_months': DATA_ENHANCED_BREAK_EVEN_MONTHS,
+        'dataset_version': dataset.version
+    })
+
+
+def enhanced_metrics(beds) -> pd.DataFrame:
+    """EnhancedRCMReportGenerator metrics (national constants) for many hospitals at once"""
+    beds = _beds_array(beds)
+
+    estimated_staff = _truncate(beds * AVERAGE_RCM_STAFF_PER_BED)
+    staff_turning_over = estimated_staff * CURRENT_TURNOVER_RATE
+    current_cost = staff_turning_over * AVERAGE_RCM_SALARY * REPLACEMENT_COST_MULTIPLIER
+    reduced_staff_turnover = estimated_staff * BEST_PRACTICE_TURNOVER
+    reduced_cost = reduced_staff_turnover * AVERAGE_RCM_SALARY * REPLACEMENT_COST_MULTIPLIER
+    potential_savings = current_cost - reduced_cost
+
+    break_even = np.full(len(beds), 999, dtype=np.int64)
+    positive = potential_savings > 0
+    break_even[positive] = _truncate(IMPLEMENTATION_COST / (potential_savings[positive] / 12))
+
+    return pd.DataFrame({
+        'hospital_beds': beds,
+        'estimated_rcm_staff': estimated_staff,
+        'current_turnover_cost': _truncate(current_cost),
+        'potential_savings': _truncate(potential_savings),
+        'reduced_cost': _truncate(reduced_cost),
+        'staff_turning_over_now': _truncate(staff_turning_over),
+        'staff_turning_over_optimized': _truncate(reduced_staff_turnover),
+        'productivity_loss': _truncate(potential_savings * PRODUCTIVITY_LOSS_FACTOR),
+        'quality_improvement': _truncate(potential_savings * QUALITY_IMPROVEMENT_FACTOR),
+        'total_impact': _truncate(potential_savings * TOTAL_IMPACT_FACTOR),
+        'cost_per_bed': _truncate(current_cost / beds),
+        'savings_per_bed': _truncate(potential_savings / beds),
+        'break_even_months': break_even
+    })
+
+
+def score_hospitals(hospitals: pd.DataFrame, beds_column: str = 'beds',
+                    state_column: str = 'state') -> pd.DataFrame:
+    """Add data-enhanced metric columns to a hospital DataFrame (e.g. the CMS list)
+
+    Rows keep their original index so the result can be sorted or filtered
+    and joined back to names before choosing which reports to render.
+    """
+    states = hospitals[state_column] if state_column in hospitals else None
+    metrics = data_enhanced_metrics(hospitals[beds_column].to_numpy(), states)
+    metrics.index = hospitals.index
+    return hospitals.join(metrics.drop(columns=['hospital_beds', 'state']))
+
+
+# Test the engine against the scalar report path
+def test_metrics_engine():
+    """Every hospital in a synthetic population must match the per-report numbers"""
+    import contextlib
+    import io
+    import time
+
+    from data_sources import HealthcareDataCollector
+    from generate_report_enhanced import EnhancedRCMReportGenerator, ReportContext
+    from generate_report_enhanced_v2 import DataEnhancedRCMReportGenerator
+
+    print("\n🚀 Testing Metrics Engine...\n")
+
+    rng = np.random.default_rng(7)
+    states = list(get_dataset().regional_cost_factors) + ['US', 'PR', '']
+    sample_beds = np.concatenate([[1, 39, 40, 99, 100, 299, 300, 301, 2500], rng.integers(1, 3000, 500)])
+    sample_states = [states[i] for i in rng.integers(0, len(states), len(sample_beds))]
+
+    vector = data_enhanced_metrics(sample_beds, sample_states)
+    vector_enhanced = enhanced_metrics(sample_beds)
+
+    collector = HealthcareDataCollector()
+    data_generator = DataEnhancedRCMReportGenerator()
+    enhanced_generator = EnhancedRCMReportGenerator()
+
+    # The scalar path prints progress for every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        for row, (beds, state) in enumerate(zip(sample_beds.tolist(), sample_states)):
+            analysis = collector.analyze_hospital_characteristics(beds, state or 'US')
+            context = ReportContext("Sample Hospital", beds, "", "", real_data={'analysis': analysis})
+            scalar = data_generator.calculate_metrics(beds, "Sample Hospital", context)
+            for column in vector.columns:
+                if column in scalar:
+                    assert vector.at[row, column] == scalar[column], (column, beds, state)
+            assert vector.at[row, 'hospital_size_category'] == analysis['hospital_size_category']
+
+            scalar = enhanced_generator.calculate_metrics(beds, "Sample Hospital")
+            for column in vector_enhanced.columns:
+                assert vector_enhanced.at[row, column] == scalar[column], (column, beds)
+
+    # Pre-scoring a CMS-sized list should take milliseconds
+    population = pd.DataFrame({
+        'beds': rng.integers(10, 2000, 6000),
+        'state': [states[i] for i in rng.integers(0, len(states), 6000)]
+    })
+    started = time.perf_counter()
+    scored = score_hospitals(population)
+    elapsed = time.perf_counter() - started
+    assert len(scored) == 6000 and 'potential_savings' in scored
+
+    print(f"✅ {len(sample_beds)} hospitals match the scalar path; scored 6,000 in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    test_metrics_engine()
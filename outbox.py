@@ -0,0 +1,288 @@
+# outbox.py
+# Durable outbox for webhook deliveries (Clay) so report requests never wait on them
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from http_client import async_http
+from instrumentation import clay_post_seconds
+
+
+# Outbox storage and delivery settings
+OUTBOX_DB_PATH = os.environ.get("OUTBOX_DB_PATH", "outbox.db")
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_SECONDS = float(os.environ.get("OUTBOX_BACKOFF_SECONDS", "5"))
+OUTBOX_MAX_BACKOFF_SECONDS = float(os.environ.get("OUTBOX_MAX_BACKOFF_SECONDS", "900"))
+OUTBOX_POLL_SECONDS = float(os.environ.get("OUTBOX_POLL_SECONDS", "2"))
+# How long a delivered (or abandoned) message keeps retries with the same key from sending again
+OUTBOX_DEDUPE_SECONDS = float(os.environ.get("OUTBOX_DEDUPE_SECONDS", "3600"))
+OUTBOX_PRUNE_SECONDS = float(os.environ.get("OUTBOX_PRUNE_SECONDS", "600"))
+
+
+def make_idempotency_key(*parts) -> str:
+    """Stable key for a delivery so retried requests don't send twice
+
+    Pass every input the message depends on - requests that differ in any
+    of them must get different keys.
+    """
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+
+
+class OutboxStore:
+    """SQLite queue of webhook messages awaiting delivery
+
+    Every method blocks on SQLite, so async callers run them with asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str = OUTBOX_DB_PATH, dedupe_seconds: float = OUTBOX_DEDUPE_SECONDS):
+        self.db_path = db_path
+        self.dedupe_seconds = dedupe_seconds
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    url TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    sent_at REAL,
+                    last_error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, url: str, payload: Dict, idempotency_key: str) -> bool:
+        """Store a message; returns False if this key is already queued or was sent recently
+
+        Keys only dedupe while the message is undelivered or within
+        dedupe_seconds of being queued. A message that was given up on
+        never blocks a new request for the same key.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM outbox WHERE idempotency_key = ? AND (status = 'dead' OR (status = 'sent' AND created_at < ?))",
+                (idempotency_key, now - self.dedupe_seconds)
+            )
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO outbox
+                    (idempotency_key, url, payload, status, next_attempt_at, created_at)
+                VALUES (?, ?, ?, 'pending', ?, ?)
+            """, (idempotency_key, url, json.dumps(payload), now, now))
+        return cursor.rowcount == 1
+
+    def claim_batch(self, limit: int) -> List[Dict]:
+        """Atomically take up to limit due messages for sending"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                UPDATE outbox SET status = 'sending'
+                WHERE id IN (
+                    SELECT id FROM outbox
+                    WHERE status = 'pending' AND next_attempt_at <= ?
+                    ORDER BY next_attempt_at LIMIT ?
+                )
+                RETURNING *
+            """, (time.time(), limit)).fetchall()
+        messages = [dict(row) for row in rows]
+        for message in messages:
+            message['payload'] = json.loads(message['payload'])
+        return messages
+
+    def mark_sent(self, message_id: int):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (time.time(), message_id)
+            )
+
+    def mark_failed(self, message: Dict, error: str):
+        """Schedule a retry with exponential backoff, or give up after the last attempt"""
+        attempts = message['attempts'] + 1
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            status, next_attempt_at = 'dead', message['next_attempt_at']
+        else:
+            delay = min(OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1)), OUTBOX_MAX_BACKOFF_SECONDS)
+            status, next_attempt_at = 'pending', time.time() + delay
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (status, attempts, next_attempt_at, error, message['id'])
+            )
+
+    def prune(self) -> int:
+        """Delete sent and dead messages older than the dedupe window"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM outbox WHERE status IN ('sent', 'dead') AND created_at < ?",
+                (time.time() - self.dedupe_seconds,)
+            )
+        return cursor.rowcount
+
+    def requeue_interrupted(self) -> int:
+        """Return messages that were mid-send when the process died to the queue"""
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending'")
+        return cursor.rowcount
+
+    def summary(self) -> Dict:
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            oldest = conn.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+        return {
+            "counts": counts,
+            "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0
+        }
+
+
+class OutboxDispatcher:
+    """Background task that delivers outbox messages in batches"""
+
+    def __init__(self, store: OutboxStore, batch_size: int = OUTBOX_BATCH_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self._wakeup = None
+        self._task = None
+        self._sent_times = deque(maxlen=1000)
+        self._counters = {"sent": 0, "failed_attempts": 0, "batches": 0, "pruned": 0}
+        self._last_delivery_latency = None
+        self._last_prune = 0.0
+
+    def start(self):
+        requeued = self.store.requeue_interrupted()
+        if requeued:
+            print(f"Requeued {requeued} interrupted outbox messages")
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        """Wake the dispatcher after a message is queued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _dispatch_loop(self):
+        while True:
+            try:
+                if time.monotonic() - self._last_prune >= OUTBOX_PRUNE_SECONDS:
+                    self._last_prune = time.monotonic()
+                    self._counters["pruned"] += await asyncio.to_thread(self.store.prune)
+                batch = await asyncio.to_thread(self.store.claim_batch, self.batch_size)
+                if batch:
+                    self._counters["batches"] += 1
+                    await asyncio.gather(*[self._deliver(message) for message in batch])
+                    # A full batch probably means more are due - go straight round again
+                    if len(batch) == self.batch_size:
+                        continue
+            except Exception as e:
+                print(f"Outbox dispatch error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, message: Dict):
+        started = time.perf_counter()
+        try:
+            response = await async_http.post(
+                message['url'],
+                json=message['payload'],
+                headers={"Idempotency-Key": message['idempotency_key']},
+                # The key makes a repeated POST safe, so timeouts and 5xx are retried too
+                retry_unsafe=True
+            )
+            outcome = "success" if 200 <= response.status_code < 300 else "http_error"
+            clay_post_seconds.observe(time.perf_counter() - started, outcome=outcome)
+            if outcome == "success":
+                await asyncio.to_thread(self.store.mark_sent, message['id'])
+                now = time.time()
+                self._sent_times.append(now)
+                self._counters["sent"] += 1
+                self._last_delivery_latency = now - message['created_at']
+                return
+            error = f"HTTP {response.status_code}"
+        except Exception as e:
+            clay_post_seconds.observe(time.perf_counter() - started, outcome="error")
+            error = str(e) or type(e).__name__
+
+        self._counters["failed_attempts"] += 1
+        await asyncio.to_thread(self.store.mark_failed, message, error)
+
+    def stats(self) -> Dict:
+        """Queue depth, delivery lag and recent throughput"""
+        now = time.time()
+        sent_last_minute = sum(1 for sent_at in self._sent_times if now - sent_at <= 60)
+        stats = self.store.summary()
+        stats.update(self._counters)
+        stats["sent_per_minute"] = sent_last_minute
+        stats["last_delivery_latency_seconds"] = (
+            round(self._last_delivery_latency, 3) if self._last_delivery_latency is not None else None
+        )
+        return stats
+
+
+# Test deduplication windows on a temporary database
+def test_outbox_store():
+    """Retries dedupe while queued or recently sent; old and dead messages free their key"""
+    import tempfile
+
+    print("\n🚀 Testing Outbox Store...\n")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = OutboxStore(os.path.join(temp_dir, "outbox.db"), dedupe_seconds=3600)
+        assert store.enqueue("http://clay", {"n": 1}, "key-a")
+        assert not store.enqueue("http://clay", {"n": 1}, "key-a"), "retry while queued must dedupe"
+        assert store.enqueue("http://clay", {"n": 2}, "key-b"), "different inputs must not collide"
+
+        sent, dead = store.claim_batch(10)
+        store.mark_sent(sent['id'])
+        assert not store.enqueue("http://clay", {"n": 1}, "key-a"), "retry inside the window must dedupe"
+
+        # Given up on after the last attempt: a new request for the same key is queued again
+        store.mark_failed(dict(dead, attempts=OUTBOX_MAX_ATTEMPTS - 1), "HTTP 500")
+        assert store.summary()['counts'].get('dead') == 1
+        assert store.enqueue("http://clay", {"n": 2}, "key-b")
+
+        # Outside the window the sent message is pruned and its key is free again
+        store.dedupe_seconds = 0
+        assert store.prune() == 1
+        assert store.enqueue("http://clay", {"n": 1}, "key-a")
+
+    print("✅ Outbox dedupes retries only inside the window")
+
+
+if __name__ == "__main__":
+    test_outbox_store()
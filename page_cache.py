@@ -0,0 +1,142 @@
+# page_cache.py
+# Prebuilt PDF pages for the static end of a report, merged onto each render
+#
+# The last pages of the enhanced report (roadmap, next steps and the call to
+# action) are the same for every hospital. Only the month in the header and
+# CTA and the page numbers in the footer change. Each render worker lays those
+# pages out once per template version, month and starting page, keeps the
+# PDF bytes, and merges them after the freshly rendered dynamic pages.
+#
+# Merging uses pypdf (pinned in requirements.txt). It is imported lazily so an
+# install without it, or STATIC_PAGE_CACHE=0, still renders reports in full.
+
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, Hashable, List
+
+# Cache settings
+STATIC_PAGE_CACHE = os.environ.get("STATIC_PAGE_CACHE", "1") == "1"
+# Entries are a few KB each; a worker normally needs one per starting page
+STATIC_PAGE_CACHE_ENTRIES = int(os.environ.get("STATIC_PAGE_CACHE_ENTRIES", "16"))
+
+_pypdf = None
+_pypdf_checked = False
+
+
+def _load_pypdf():
+    global _pypdf, _pypdf_checked
+    if not _pypdf_checked:
+        try:
+            import pypdf
+            _pypdf = pypdf
+        except ImportError:
+            print("pypdf not installed (see requirements.txt) - static report pages will be rendered with every report")
+        _pypdf_checked = True
+    return _pypdf
+
+
+def merge_pdfs(parts: List[bytes]) -> bytes:
+    """Concatenate PDFs page by page, keeping the first document's metadata"""
+    pypdf = _load_pypdf()
+    writer = pypdf.PdfWriter()
+    for index, part in enumerate(parts):
+        reader = pypdf.PdfReader(BytesIO(part))
+        writer.append(reader)
+        if index == 0 and reader.metadata:
+            writer.add_metadata(dict(reader.metadata))
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class StaticPageCache:
+    """LRU of rendered static pages (PDF bytes) keyed by what they depend on"""
+
+    def __init__(self, max_entries: int = STATIC_PAGE_CACHE_ENTRIES, enabled: bool = STATIC_PAGE_CACHE):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether reports should be assembled from cached pages"""
+        return self.enabled and self.max_entries > 0 and _load_pypdf() is not None
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """Return the cached pages for key, rendering them on a miss"""
+        with self._lock:
+            pages = self._pages.get(key)
+            if pages is not None:
+                self._pages.move_to_end(key)
+                self._counters['hits'] += 1
+                return pages
+            self._counters['misses'] += 1
+
+        # Rendered outside the lock - two threads may both render a new key once
+        pages = render()
+        with self._lock:
+            self._pages[key] = pages
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+                self._counters['evictions'] += 1
+        return pages
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters, entries=len(self._pages), enabled=self.available)
+
+
+# Per-process cache used by the report generators
+static_page_cache = StaticPageCache()
+
+
+# Test the cache and merge
+def test_page_cache():
+    """Pages render once per key and merge after the dynamic pages"""
+    print("\n🚀 Testing Static Page Cache...\n")
+
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    def pdf(*texts):
+        buffer = BytesIO()
+        canvas_obj = canvas.Canvas(buffer, pagesize=letter)
+        canvas_obj.setTitle(texts[0])
+        for text in texts:
+            canvas_obj.drawString(72, 720, text)
+            canvas_obj.showPage()
+        canvas_obj.save()
+        return buffer.getvalue()
+
+    cache = StaticPageCache(max_entries=1, enabled=True)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return pdf("Roadmap", "Next steps")
+
+    first = cache.get_or_render(('v1', '202501', 5), render)
+    assert cache.get_or_render(('v1', '202501', 5), render) is first
+    cache.get_or_render(('v1', '202501', 6), render)
+    assert len(renders) == 2
+    assert cache.stats()['evictions'] == 1
+
+    if not cache.available:
+        print("⚠️  pypdf not installed - skipping merge check")
+        return
+
+    merged = _load_pypdf().PdfReader(BytesIO(merge_pdfs([pdf("Cover", "Dashboard"), first])))
+    assert len(merged.pages) == 4
+    assert "Roadmap" in merged.pages[2].extract_text()
+    assert merged.metadata.title == "Cover"
+
+    print("✅ Static pages cached per key and merged in order")
+
+
+if __name__ == "__main__":
+    test_page_cache()
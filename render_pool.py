@@ -0,0 +1,185 @@
+# render_pool.py
+# Bounded process pool that renders PDF reports off the web server's event loop
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict
+
+from instrumentation import observe_report_timings, report_render_seconds
+
+
+# Pool sizing - override with environment variables on Railway
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", os.cpu_count() or 1))
+RENDER_QUEUE_LIMIT = int(os.environ.get("RENDER_QUEUE_LIMIT", RENDER_WORKERS * 4))
+# Start the workers in the background at server startup instead of on the first request
+RENDER_WARM_UP = os.environ.get("RENDER_WARM_UP", "1") == "1"
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render pool cannot accept another report"""
+
+
+def init_render_worker(preload_charts: bool = False):
+    """Pool initializer - import the report stack and warm this worker's generator
+
+    With preload_charts the raster chart stack (matplotlib) and the benchmark
+    dataset are loaded too, so the first report rendered pays no import cost.
+    """
+    from generate_report_enhanced_v2 import get_generator
+    # Build the static report sections now rather than during the first render
+    get_generator().template.compile()
+    if preload_charts:
+        from benchmark_dataset import get_dataset
+        from generate_report_enhanced import chart_figure
+        get_dataset()
+        chart_figure(figsize=(1, 1))
+
+
+def render_report_in_worker(report_kwargs: Dict):
+    """Render a single report inside a pool worker process
+
+    Returns the ReportResult along with a snapshot of the worker's cache
+    counters so the parent process can report them.
+    """
+    from chart_cache import chart_cache
+    from generate_report_enhanced_v2 import get_generator
+    from page_cache import static_page_cache
+
+    result = get_generator().build_report(**report_kwargs)
+    return result, {
+        "pid": os.getpid(),
+        "chart_cache": chart_cache.stats(),
+        "static_page_cache": static_page_cache.stats()
+    }
+
+
+class RenderPool:
+    """Process pool with admission control for report rendering
+
+    At most ``max_workers`` reports render at once and at most ``queue_limit``
+    more wait for a free worker. Anything beyond that is rejected with
+    RenderQueueFull so bursts fail fast instead of piling up on the server.
+    """
+
+    def __init__(self, max_workers: int = RENDER_WORKERS, queue_limit: int = RENDER_QUEUE_LIMIT):
+        self.max_workers = max(1, max_workers)
+        self.queue_limit = max(0, queue_limit)
+        self._executor = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._worker_stats = {}
+        self._warm = False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers don't inherit the server's event loop or threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_render_worker,
+                initargs=(True,)
+            )
+        return self._executor
+
+    async def warm_up(self):
+        """Start every worker process and let each load the report stack
+
+        Run as a background task once the server is accepting requests; the
+        executor spawns a worker for each task submitted while none is idle.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            pids = await asyncio.gather(*[
+                loop.run_in_executor(executor, os.getpid) for _ in range(self.max_workers)
+            ])
+        except BrokenProcessPool:
+            self._executor = None
+            raise
+        self._warm = True
+        print(f"Render pool warm: {len(set(pids))} workers ready in {time.perf_counter() - started:.1f}s")
+
+    async def submit(self, **report_kwargs):
+        """Render a report in the pool and return its ReportResult"""
+        if self._in_flight >= self.max_workers + self.queue_limit:
+            self._rejected += 1
+            raise RenderQueueFull(
+                f"Render queue is full ({self._in_flight} reports in flight)"
+            )
+
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                result, worker_stats = await loop.run_in_executor(
+                    self._get_executor(), render_report_in_worker, report_kwargs
+                )
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM) - replace the pool for later requests
+                self._executor = None
+                self._worker_stats = {}
+                raise
+            self._worker_stats[worker_stats["pid"]] = worker_stats
+            self._completed += 1
+            report_render_seconds.observe(time.perf_counter() - started)
+            observe_report_timings(result.timings)
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict:
+        """Current pool load and lifetime counters"""
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.max_workers),
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "warm": self._warm
+        }
+
+    def chart_cache_stats(self) -> Dict:
+        """Chart cache counters summed over the most recent snapshot from each worker"""
+        totals = {}
+        for worker_stats in self._worker_stats.values():
+            for name, value in worker_stats["chart_cache"].items():
+                if name != "hit_rate":
+                    totals[name] = totals.get(name, 0) + value
+        hits = totals.get("memory_hits", 0) + totals.get("disk_hits", 0)
+        lookups = hits + totals.get("misses", 0)
+        totals["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        totals["workers_reporting"] = len(self._worker_stats)
+        return totals
+
+    def static_page_cache_stats(self) -> Dict:
+        """Static page cache counters summed over the most recent snapshot from each worker"""
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "workers_enabled": 0}
+        for worker_stats in self._worker_stats.values():
+            pages = worker_stats["static_page_cache"]
+            for name in ("hits", "misses", "evictions", "entries"):
+                totals[name] += pages[name]
+            totals["workers_enabled"] += 1 if pages["enabled"] else 0
+        return totals
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared pool used by the web application
+render_pool = RenderPool()
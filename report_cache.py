@@ -0,0 +1,199 @@
+# report_cache.py
+# Whole-report memoization and coalescing of identical in-flight report requests
+
+import asyncio
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Tuple
+
+from benchmark_dataset import get_dataset
+from chart_profiles import DEFAULT_CHART_PROFILE
+from render_pool import render_pool
+
+if TYPE_CHECKING:
+    # ReportLab-heavy - results arrive already built from the render workers
+    from generate_report_enhanced import ReportResult
+
+
+REPORT_CACHE_SIZE = int(os.environ.get("REPORT_CACHE_SIZE", "256"))
+# Upper bound on PDF bytes held for in-memory (streamed) reports
+REPORT_CACHE_MEMORY_MB = int(os.environ.get("REPORT_CACHE_MEMORY_MB", "128"))
+
+
+def _file_signature(filename: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ReportCache:
+    """Remembers finished reports and shares renders between identical requests
+
+    A cached file-backed entry is only reused while the PDF on disk is the one
+    this cache saw written - if the file was deleted or overwritten by a
+    different render the request is treated as a miss. In-memory reports
+    carry their own bytes and are bounded by max_bytes.
+    """
+
+    def __init__(self, max_entries: int = REPORT_CACHE_SIZE,
+                 max_bytes: int = REPORT_CACHE_MEMORY_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._results = OrderedDict()
+        self._bytes = 0
+        self._in_flight = {}
+        self._counters = {'hits': 0, 'coalesced': 0, 'misses': 0}
+
+    @staticmethod
+    def make_key(hospital_name, hospital_beds, recipient_name, state=None,
+                 chart_backend='matplotlib', in_memory=False, chart_profile=DEFAULT_CHART_PROFILE,
+                 **_ignored) -> Tuple:
+        """Inputs that determine the rendered PDF (recipient email is not printed)
+
+        The benchmark dataset version is part of the key, so reports rendered
+        with older benchmark numbers stop matching as soon as new data loads.
+        """
+        report_date = datetime.now().strftime('%Y-%m-%d')
+        return (hospital_name, int(hospital_beds), recipient_name, state, chart_backend, chart_profile,
+                bool(in_memory), report_date, get_dataset().version)
+
+    def _lookup(self, key: Tuple) -> Optional['ReportResult']:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        result, signature = entry
+        if result.pdf_bytes is None and _file_signature(result.filename) != signature:
+            self._evict(key)
+            return None
+        self._results.move_to_end(key)
+        return result
+
+    def _evict(self, key: Tuple):
+        result, _ = self._results.pop(key)
+        self._bytes -= len(result.pdf_bytes or b'')
+
+    def _store(self, key: Tuple, result: 'ReportResult'):
+        if key in self._results:
+            self._evict(key)
+        signature = None if result.pdf_bytes is not None else _file_signature(result.filename)
+        self._results[key] = (result, signature)
+        self._bytes += len(result.pdf_bytes or b'')
+        while len(self._results) > self.max_entries or (self._bytes > self.max_bytes and len(self._results) > 1):
+            self._evict(next(iter(self._results)))
+
+    async def get_or_render(self, key: Tuple, render: Callable[[], Awaitable['ReportResult']]) -> 'ReportResult':
+        """Return a cached report, join an identical render in progress, or start one"""
+        result = self._lookup(key)
+        if result is not None:
+            self._counters['hits'] += 1
+            return result
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self._counters['coalesced'] += 1
+            return await asyncio.shield(pending)
+
+        self._counters['misses'] += 1
+        pending = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = pending
+        try:
+            result = await render()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                pending.cancel()
+            else:
+                pending.set_exception(e)
+                # Mark retrieved so a render nobody else joined doesn't log a warning
+                pending.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        # A worker that hasn't picked up a reload yet rendered with other data -
+        # share the result with this request's waiters but don't cache it
+        if result.data_sources.get('dataset_version') in (None, key[-1]):
+            self._store(key, result)
+        pending.set_result(result)
+        return result
+
+    def stats(self) -> Dict:
+        stats = dict(self._counters)
+        stats['entries'] = len(self._results)
+        stats['memory_bytes'] = self._bytes
+        stats['in_flight'] = len(self._in_flight)
+        return stats
+
+
+# Shared cache used by the web application
+report_cache = ReportCache()
+
+
+async def render_report_cached(**report_kwargs) -> 'ReportResult':
+    """Render a report in the pool unless an identical one exists or is underway"""
+    key = report_cache.make_key(**report_kwargs)
+    return await report_cache.get_or_render(key, lambda: render_pool.submit(**report_kwargs))
+
+
+# Test coalescing and version-keyed caching with a fake render
+def test_report_cache():
+    """Concurrent identical requests share one render; results from other data aren't cached"""
+    from types import SimpleNamespace
+
+    print("\n🚀 Testing Report Cache...\n")
+
+    renders = []
+
+    def fake_render(version):
+        async def render():
+            renders.append(version)
+            await asyncio.sleep(0.05)
+            return SimpleNamespace(filename="report.pdf", pdf_bytes=b"%PDF-", metrics={},
+                                   data_sources={'dataset_version': version})
+        return render
+
+    async def exercise():
+        cache = ReportCache()
+        key_v1 = ("General Hospital", 300, "Ann Lee", "TX", "matplotlib", "print", True, "2025-01-01", "v1")
+        key_v2 = key_v1[:-1] + ("v2",)
+
+        # Ten identical requests at once: one render, nine joiners
+        results = await asyncio.gather(*[cache.get_or_render(key_v1, fake_render("v1")) for _ in range(10)])
+        assert renders == ["v1"] and all(result is results[0] for result in results)
+        assert cache.stats()['coalesced'] == 9 and cache.stats()['in_flight'] == 0
+
+        # Finished reports are served from the cache
+        assert await cache.get_or_render(key_v1, fake_render("v1")) is results[0]
+        assert cache.stats()['hits'] == 1
+
+        # New benchmark data means a new key, so the old report is not reused
+        await cache.get_or_render(key_v2, fake_render("v2"))
+        assert renders == ["v1", "v2"]
+
+        # A worker still on the old data: its result is returned but not cached
+        key_v3 = key_v1[:-1] + ("v3",)
+        await cache.get_or_render(key_v3, fake_render("v2"))
+        await cache.get_or_render(key_v3, fake_render("v3"))
+        assert renders == ["v1", "v2", "v2", "v3"]
+
+        # A failed render reaches every waiter and is not cached
+        async def failing():
+            renders.append("failed")
+            await asyncio.sleep(0.05)
+            raise RuntimeError("render failed")
+
+        key_failed = key_v1[:2] + ("Someone Else",) + key_v1[3:]
+        outcomes = await asyncio.gather(*[cache.get_or_render(key_failed, failing) for _ in range(3)],
+                                        return_exceptions=True)
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+        assert renders.count("failed") == 1 and cache.stats()['entries'] == 3
+
+    asyncio.run(exercise())
+
+    print("✅ Identical renders coalesce and stale-data results are not cached")
+
+
+if __name__ == "__main__":
+    test_report_cache()
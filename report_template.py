@@ -0,0 +1,161 @@
+# report_template.py
+# Declarative report layouts whose static sections are built once per process
+#
+# A template is an ordered list of sections. Dynamic sections build their
+# flowables from the per-report data on every render. Static sections (fixed
+# headings, the roadmap table, next steps, the CTA) are built the first time
+# they are needed and every later story gets shallow copies, so parsed
+# paragraph markup and styled table cells are shared rather than rebuilt.
+# Copies keep layout state per render, so concurrent renders never share a
+# flowable that is being wrapped or drawn.
+#
+# When the template ends with static sections that start on a new page, those
+# pages can be rendered once on their own and merged onto each report (see
+# page_cache.py). static_pages_key() says which cached pages fit a report.
+
+import copy
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from reportlab.platypus import PageBreak
+
+
+@dataclass(frozen=True)
+class Section:
+    """One block of a report
+
+    Dynamic sections are called with the report data. Static sections are
+    called with their cache key (None unless cache_key is given) and rebuilt
+    only when that key changes, e.g. a reference code that changes monthly.
+    """
+    name: str
+    build: Callable
+    static: bool = False
+    cache_key: Optional[Callable[[Dict], Hashable]] = None
+
+
+class ReportTemplate:
+    """An ordered set of sections that assembles a story for each report"""
+
+    def __init__(self, version: str, sections: List[Section]):
+        self.version = version
+        self.sections = list(sections)
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+        # Trailing static sections - the pages every report ends with
+        split = len(self.sections)
+        while split and self.sections[split - 1].static:
+            split -= 1
+        self.dynamic_sections = self.sections[:split]
+        self.static_tail = self.sections[split:]
+
+    def _static_flowables(self, section: Section, data: Optional[Dict]) -> List:
+        key = section.cache_key(data) if section.cache_key else None
+        compiled = self._compiled.get(section.name)
+        if compiled is None or compiled[0] != key:
+            with self._lock:
+                compiled = self._compiled.get(section.name)
+                if compiled is None or compiled[0] != key:
+                    # Only the current key is kept - older months are never rendered again
+                    compiled = self._compiled[section.name] = (key, tuple(section.build(key)))
+        return compiled[1]
+
+    def compile(self, data: Optional[Dict] = None):
+        """Build every static section now (e.g. while a worker warms up)
+
+        Sections keyed on report data are skipped unless data is given.
+        """
+        for section in self.sections:
+            if section.static and (section.cache_key is None or data is not None):
+                self._static_flowables(section, data)
+
+    def story(self, data: Dict, sections: Optional[List[Section]] = None) -> List:
+        """The flowables for one report, optionally only the given sections"""
+        story = []
+        for section in self.sections if sections is None else sections:
+            if section.static:
+                story.extend(copy.copy(flowable) for flowable in self._static_flowables(section, data))
+            else:
+                story.extend(section.build(data))
+        return story
+
+    def static_pages_key(self, data: Dict) -> Optional[Tuple]:
+        """Identifies the static tail pages for this report, None if there are none
+
+        The tail only forms whole pages of its own when it opens with a page
+        break, so any other template always renders in full.
+        """
+        if not self.static_tail:
+            return None
+        first = self._static_flowables(self.static_tail[0], data)
+        if not first or not isinstance(first[0], PageBreak):
+            return None
+        keys = tuple(section.cache_key(data) if section.cache_key else None for section in self.static_tail)
+        return (self.version,) + keys
+
+    def static_pages_story(self, data: Dict) -> List:
+        """The static tail as a document of its own, without its opening page break"""
+        return self.story(data, self.static_tail)[1:]
+
+    def stats(self) -> Dict:
+        return {
+            'version': self.version,
+            'sections': len(self.sections),
+            'static_sections': sum(1 for section in self.sections if section.static),
+            'static_tail': [section.name for section in self.static_tail],
+            'compiled': len(self._compiled)
+        }
+
+
+# Test static sections are built once and copied per story
+def test_report_template():
+    """Static sections build once per key while dynamic sections build every time"""
+    print("\n🚀 Testing Report Template...\n")
+
+    builds = {'heading': 0, 'body': 0, 'footer': 0}
+
+    def heading(_):
+        builds['heading'] += 1
+        return [['Heading']]
+
+    def body(data):
+        builds['body'] += 1
+        return [data['text']]
+
+    def footer(month):
+        builds['footer'] += 1
+        return [f"Code {month}"]
+
+    template = ReportTemplate("test-1", [
+        Section('heading', heading, static=True),
+        Section('body', body),
+        Section('footer', footer, static=True, cache_key=lambda data: data['month'])
+    ])
+    template.compile()
+    first = template.story({'text': 'one', 'month': '202501'})
+    second = template.story({'text': 'two', 'month': '202501'})
+    assert first == [['Heading'], 'one', 'Code 202501'], first
+    assert second[1] == 'two'
+    assert first[0] is not second[0], "static flowables must be copied per story"
+    assert builds == {'heading': 1, 'body': 2, 'footer': 1}, builds
+
+    template.story({'text': 'three', 'month': '202502'})
+    assert builds['footer'] == 2 and builds['heading'] == 1, builds
+    assert template.stats()['compiled'] == 2
+
+    # The footer is a static tail but does not open a new page, so it is never cached as pages
+    assert [section.name for section in template.static_tail] == ['footer']
+    assert template.static_pages_key({'month': '202502'}) is None
+    paged = ReportTemplate("test-2", template.sections[:2] + [
+        Section('appendix', lambda _: [PageBreak(), 'Appendix'], static=True)
+    ])
+    assert paged.static_pages_key({}) == ("test-2", None)
+    assert paged.static_pages_story({}) == ['Appendix']
+
+    print("✅ Static sections compiled once, dynamic sections rebuilt per report")
+
+
+if __name__ == "__main__":
+    test_report_template()